@@ -0,0 +1,100 @@
+"""
+Compare two benchmark reports of benchmarks.run
+
+    cd packages/analyzer
+    python -m benchmarks.compare baseline.json current.json --threshold 0.1
+
+Metrics are matched by their path (benchmark/variant/metric). Keys ending in
+fps or speed are better when higher; keys ending in ms, seconds or rtf are
+better when lower; everything else (counts, agreement) is informational. A
+change beyond --threshold (relative) in the bad direction is a regression and
+makes the command exit with status 1. Skipped benchmarks are ignored.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+HIGHER_IS_BETTER = ("fps", "speed")
+LOWER_IS_BETTER = ("ms", "ms_per_scene", "seconds", "rtf")
+
+# Overall runtime of a benchmark, not a measurement of the code under test
+IGNORED_METRICS = ("wall_seconds",)
+
+def direction(metric: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None if not comparable"""
+    if metric in IGNORED_METRICS:
+        return None
+    if metric in HIGHER_IS_BETTER or metric.endswith(tuple(f"_{unit}" for unit in HIGHER_IS_BETTER)):
+        return 1
+    if metric in LOWER_IS_BETTER or metric.endswith(tuple(f"_{unit}" for unit in LOWER_IS_BETTER)):
+        return -1
+    return None
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a results tree keyed by their path; skipped entries are left out"""
+    values = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            if "skipped" not in value:
+                values.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = float(value)
+    return values
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """One row per metric present in both reports, with relative change and status"""
+    before = flatten(baseline.get("results", {}))
+    after = flatten(current.get("results", {}))
+
+    rows = []
+    for path in sorted(set(before) & set(after)):
+        sign = direction(path.rsplit("/", 1)[-1])
+        if sign is None:
+            continue
+        old, new = before[path], after[path]
+        change = (new - old) / old if old else 0.0
+        if sign * change < -threshold:
+            status = "regression"
+        elif sign * change > threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append({"metric": path, "baseline": old, "current": new, "change": round(change, 4), "status": status})
+    return rows
+
+def print_comparison(rows: List[Dict[str, Any]]):
+    width = max((len(row["metric"]) for row in rows), default=6)
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for row in rows:
+        marker = {"regression": "  ✗", "improvement": "  ✓"}.get(row["status"], "")
+        print(f"{row['metric']:<{width}}  {row['baseline']:>12g}  {row['current']:>12g}  {row['change']:>+8.1%}{marker}")
+
+    regressions = sum(1 for row in rows if row["status"] == "regression")
+    improvements = sum(1 for row in rows if row["status"] == "improvement")
+    print(f"{len(rows)} metrics, {regressions} regressions, {improvements} improvements")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Report of the reference run")
+    parser.add_argument("current", help="Report to check")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as regression")
+    parser.add_argument("--output", default=None, help="Write the comparison rows as JSON to this file")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current, args.threshold)
+    print_comparison(rows)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    if any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Reproducible benchmark suite for the analyzer hot paths
+
+    cd packages/analyzer
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --only saliency roi_search --compare baseline.json
+
+All inputs are generated locally (see benchmarks.synthetic) and cached in
+--workdir, so runs on different machines or commits measure the same work.
+Every benchmark reports throughput or latency with units in the key name
+(fps, speed and ms: see benchmarks.compare for which direction is better); the
+best of --repeat runs is kept to damp noise. Benchmarks whose dependencies or
+model weights are missing (SAM, whisper backends), or that fail, are reported
+as skipped and the report is written anyway.
+
+Transcription runs on the synthetic sine track unless --speech points to a file
+with speech; the realtime factor then reflects the real decoding workload.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks import synthetic
+
+class BenchmarkContext:
+    """Synthetic inputs shared by the benchmarks, created on first use"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = args.workdir
+        self._video = None
+        self._saliency = None
+        self._frames = None
+
+    @property
+    def video(self) -> Dict[str, Any]:
+        if self._video is None:
+            self._video = synthetic.make_video(self.workdir, duration=self.args.duration,
+                                               size=tuple(self.args.size), fps=self.args.fps,
+                                               scene_seconds=self.args.scene_seconds)
+        return self._video
+
+    @property
+    def saliency(self) -> Dict[str, Any]:
+        if self._saliency is None:
+            self._saliency = synthetic.make_saliency_data(self.workdir, self.video)
+        return self._saliency
+
+    @property
+    def frames(self) -> list:
+        """Sample frames for the per-frame benchmarks (one per scene, spread over the video)"""
+        if self._frames is None:
+            step = max(1, int(self.video["fps"] * self.video["duration"] / self.args.frames))
+            self._frames = synthetic.read_frames(self.video["path"], self.args.frames, step=step)
+        return self._frames
+
+    @property
+    def frame_count(self) -> int:
+        return int(round(self.video["duration"] * self.video["fps"]))
+
+    def scratch(self, name: str) -> str:
+        """Empty directory for outputs of one benchmark"""
+        path = os.path.join(self.workdir, "out", name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+def best_of(repeat: int, fn: Callable[[], Any]):
+    """Minimum wall time over repeat runs and the result of the last run"""
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def bench_scene_detection(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.services.scene_detector import DETECTION_MODES, SceneDetector
+    from benchmarks.scene_detection import agreement, benchmark_mode
+
+    detector = SceneDetector(threshold=30.0, workers=1)
+    tolerance = 1.5 / ctx.video["fps"]
+    results = {}
+    for mode in DETECTION_MODES:
+        runs = [benchmark_mode(detector, ctx.video["path"], mode) for _ in range(ctx.args.repeat)]
+        run = min(runs, key=lambda r: r["seconds"])
+        results[mode] = {
+            "fps": round(ctx.frame_count / run["seconds"], 2) if run["seconds"] else None,
+            "speed": run["speed"],
+            "scenes": run["scenes"],
+            **agreement(run["cuts"], ctx.video["cuts"], tolerance)
+        }
+    return results
+
+def bench_keyframes(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.services.keyframe_extractor import KeyframeExtractor
+
+    cuts = [0.0] + ctx.video["cuts"] + [ctx.video["duration"]]
+    scenes = list(zip(cuts, cuts[1:]))
+    extractor = KeyframeExtractor(storage_path=ctx.scratch("keyframes"))
+
+    seconds, keyframes = best_of(ctx.args.repeat,
+                                 lambda: extractor.extract_scene_keyframes(ctx.video["path"], scenes, "benchmark"))
+    return {
+        "scenes": len(scenes),
+        "extracted": sum(1 for path in keyframes if path),
+        "ms_per_scene": round(seconds * 1000 / len(scenes), 2)
+    }
+
+def _saliency_detectors() -> Dict[str, Callable[[], Any]]:
+    def sam():
+        from src.models.sam_wrapper import SAMSaliencyModel
+        return SAMSaliencyModel(model_type="vit_b")
+
+    def hybrid():
+        from src.models.hybrid_saliency import HybridSaliencyDetector
+        return HybridSaliencyDetector()
+
+    def robust():
+        from src.models.robust_saliency import RobustSaliencyDetector
+        return RobustSaliencyDetector()
+
+    return {"hybrid": hybrid, "robust": robust, "sam": sam}
+
+def bench_saliency(ctx: BenchmarkContext) -> Dict[str, Any]:
+    frames = ctx.frames
+    results = {}
+    for name, create in _saliency_detectors().items():
+        # Model weights may be missing (FileNotFoundError/OSError) or fail to load;
+        # one detector must not cost the others their numbers
+        try:
+            detector = create()
+            infer = getattr(detector, "generate_saliency_map", None) or detector.detect_saliency
+            infer(frames[0])  # warm-up (lazy model parts, allocations)
+        except Exception as e:
+            results[name] = {"skipped": f"unavailable: {type(e).__name__}: {e}"}
+            continue
+        seconds, _ = best_of(ctx.args.repeat, lambda: [infer(frame) for frame in frames])
+        results[name] = {"frames": len(frames), "fps": round(len(frames) / seconds, 2)}
+    return results
+
+def bench_roi_search(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.models.hybrid_saliency import HybridSaliencyDetector
+
+    detector = HybridSaliencyDetector()
+    maps = [detector.generate_saliency_map(frame) for frame in ctx.frames]
+    results = {}
+    for label, aspect_ratio in (("9x16", (9, 16)), ("1x1", (1, 1)), ("4x5", (4, 5))):
+        seconds, _ = best_of(ctx.args.repeat, lambda: [
+            detector.get_roi_suggestions(saliency_map, aspect_ratio=aspect_ratio, num_suggestions=3)
+            for saliency_map in maps
+        ])
+        results[label] = {"ms": round(seconds * 1000 / len(maps), 3)}
+    return results
+
+def bench_crop_path(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.services.smooth_reframing import SmoothReframer, _target_crop_size
+
+    width, height = ctx.video["size"]
+    roi_size = _target_crop_size(width, height, (9, 16))
+    results = {}
+    for label, zoom in (("pan", False), ("zoom", True)):
+        reframer = SmoothReframer(zoom=zoom)
+        seconds, crops = best_of(ctx.args.repeat, lambda: reframer.compute_crop_path(
+            ctx.saliency["data"], ctx.frame_count, (width, height), roi_size))
+        results[label] = {"frames": len(crops), "ms": round(seconds * 1000, 2),
+                          "fps": round(len(crops) / seconds, 1)}
+    return results
+
+def bench_reframe(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.services.smooth_reframing import SmoothReframer
+
+    output = os.path.join(ctx.scratch("reframe"), "reframed.mp4")
+    reframer = SmoothReframer()
+    seconds, _ = best_of(ctx.args.repeat, lambda: reframer.reframe_video_smooth(
+        ctx.video["path"], ctx.saliency["path"], output, (9, 16)))
+    return {"frames": ctx.frame_count, "fps": round(ctx.frame_count / seconds, 2)}
+
+def bench_heatmap(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.services.heatmap_generator import HeatmapGenerator
+    from src.services.heatmap_renderer import SaliencyMapStore
+
+    storage = ctx.scratch("heatmap")
+    generator = HeatmapGenerator(storage_dir=storage)
+    frames = ctx.saliency["data"]["frames"]
+    maps = SaliencyMapStore.from_frames(frames, tuple(ctx.video["size"]))
+    results = {}
+    for label, outputs in (("heatmap", ["heatmap"]), ("all", None)):
+        seconds, paths = best_of(ctx.args.repeat, lambda: generator.generate_all_visualizations(
+            ctx.video["path"], "benchmark", ctx.saliency["data"], outputs=outputs,
+            output_dir=os.path.join(storage, label), saliency_maps=maps))
+        results[label] = {"outputs": len(paths), "fps": round(ctx.frame_count / seconds, 2)}
+    return results
+
+def bench_transcription(ctx: BenchmarkContext) -> Dict[str, Any]:
+    from src.services.audio_extractor import audio_extractor
+    from src.services.transcription_backends import BACKENDS
+    from src.services.transcription_service import WHISPER_SAMPLE_RATE
+    from benchmarks.transcription_backends import benchmark_backend
+
+    source = ctx.args.speech or ctx.video["path"]
+    audio = audio_extractor.load(source).resampled(WHISPER_SAMPLE_RATE, mono=True)
+    results = {"input": "speech" if ctx.args.speech else "synthetic tone"}
+    for name in BACKENDS:
+        result = benchmark_backend(name, audio, ctx.args.model_size, "cpu")
+        results[name] = result if "skipped" in result else {
+            "rtf": result["rtf"], "load_seconds": result["load_seconds"], "audio_seconds": result["audio_seconds"]
+        }
+    return results
+
+BENCHMARKS = {
+    "scene_detection": bench_scene_detection,
+    "keyframes": bench_keyframes,
+    "saliency": bench_saliency,
+    "roi_search": bench_roi_search,
+    "crop_path": bench_crop_path,
+    "reframe": bench_reframe,
+    "heatmap": bench_heatmap,
+    "transcription": bench_transcription,
+}
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args, names: List[str]) -> Dict[str, Any]:
+    ctx = BenchmarkContext(args)
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            result = BENCHMARKS[name](ctx)
+        except ImportError as e:
+            result = {"skipped": f"not installed: {e}"}
+        except Exception as e:
+            # Report the failure and keep going, so the report is still written
+            traceback.print_exc(file=sys.stderr)
+            result = {"skipped": f"failed: {type(e).__name__}: {e}"}
+        result["wall_seconds"] = round(time.perf_counter() - start, 2)
+        print(json.dumps({name: result}), file=sys.stderr if args.quiet else sys.stdout)
+        results[name] = result
+
+    return {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "video": {key: value for key, value in ctx.video.items() if key != "path"} if ctx._video else None
+        },
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument("--duration", type=float, default=20.0, help="Length of the synthetic video (seconds)")
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 720], metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--scene-seconds", type=float, default=4.0, help="Distance of the hard cuts")
+    parser.add_argument("--frames", type=int, default=20, help="Frames sampled for the per-frame benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the fastest is kept")
+    parser.add_argument("--speech", default=None, help="Video or audio file with speech for the transcription RTF")
+    parser.add_argument("--model-size", default="tiny", help="Whisper model size for the transcription benchmark")
+    parser.add_argument("--workdir", default=synthetic.default_workdir(),
+                        help="Cache for the synthetic inputs and scratch outputs")
+    parser.add_argument("--output", default=None, help="Write the report as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Baseline report to compare against (exit 1 on regressions)")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as regression")
+    parser.add_argument("--quiet", action="store_true", help="Print the per-benchmark lines to stderr")
+    args = parser.parse_args()
+
+    report = run(args, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        from benchmarks.compare import compare_reports, print_comparison
+
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare_reports(baseline, report, args.threshold)
+        print_comparison(rows)
+        if any(row["status"] == "regression" for row in rows):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Speed and agreement of the scene detection modes on this machine
+
+    cd packages/analyzer
+    python -m benchmarks.scene_detection --input movie.mp4 --modes full fast hinted
+
+Each mode is timed on the same file; speed is video seconds per wall-clock
+second (> 1 is faster than realtime). Cuts are compared with the first mode
+(the reference, normally "full"): a cut matches if it lies within
+--tolerance-frames of a reference cut.
+"""
+import argparse
+import json
+import os
+import time
+
+from src.services.scene_detector import DETECTION_MODES, SceneDetector
+
+def cut_times(scenes):
+    return [start for start, _ in scenes[1:]]
+
+def agreement(cuts, reference, tolerance: float) -> dict:
+    matched = sum(1 for cut in cuts if any(abs(cut - ref) <= tolerance for ref in reference))
+    found = sum(1 for ref in reference if any(abs(cut - ref) <= tolerance for cut in cuts))
+    return {
+        "precision": round(matched / len(cuts), 4) if cuts else 1.0,
+        "recall": round(found / len(reference), 4) if reference else 1.0
+    }
+
+def benchmark_mode(detector: SceneDetector, video_path: str, mode: str) -> dict:
+    start = time.perf_counter()
+    scenes = detector.detect_scenes(video_path, mode=mode)
+    elapsed = time.perf_counter() - start
+    duration = scenes[-1][1] if scenes else 0.0
+    return {
+        "mode": mode,
+        "seconds": round(elapsed, 2),
+        "video_seconds": round(duration, 2),
+        "speed": round(duration / elapsed, 2) if elapsed else None,
+        "scenes": len(scenes),
+        "cuts": cut_times(scenes)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Video file")
+    parser.add_argument("--modes", nargs="+", default=list(DETECTION_MODES), choices=list(DETECTION_MODES))
+    parser.add_argument("--threshold", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (parallel segments for long videos)")
+    parser.add_argument("--tolerance-frames", type=float, default=1.0)
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    detector = SceneDetector(threshold=args.threshold, workers=args.workers)
+    fps = detector._video_properties(args.input)[0]
+
+    results = []
+    for mode in args.modes:
+        result = benchmark_mode(detector, args.input, mode)
+        if results:
+            result.update(agreement(result["cuts"], results[0]["cuts"], (args.tolerance_frames + 0.5) / fps))
+        print(json.dumps({key: value for key, value in result.items() if key != "cuts"}))
+        results.append(result)
+
+    report = {"input": os.path.abspath(args.input), "fps": fps, "cpu_count": os.cpu_count(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
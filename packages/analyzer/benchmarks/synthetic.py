@@ -0,0 +1,142 @@
+"""
+Deterministic synthetic inputs for the benchmarks
+
+Videos are rendered from ffmpeg's test sources (one source per scene, hard
+cuts in between, a sine tone as audio), so every machine benchmarks the same
+content without shipping media files. Saliency data is a smooth moving
+Gaussian blob sampled like a saliency analysis would store it.
+"""
+import json
+import math
+import os
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Test sources cycled through for the scenes (all accept size and rate)
+SCENE_SOURCES = ("testsrc2", "mandelbrot", "smptehdbars", "rgbtestsrc", "testsrc")
+
+# Maximum keyframe interval (seconds), off the scene cadence; the encoder's
+# scene cut detection adds keyframes at the cuts like in real encodes
+GOP_SECONDS = 2.5
+
+# Size of the stored saliency maps (w, h)
+SALIENCY_MAP_SIZE = (96, 54)
+
+def default_workdir() -> str:
+    return os.path.join(tempfile.gettempdir(), "analyzer-benchmarks")
+
+def make_video(workdir: str, duration: float = 20.0, size: Tuple[int, int] = (1280, 720), fps: int = 25,
+               scene_seconds: float = 4.0, audio: bool = True) -> Dict[str, Any]:
+    """
+    Render (or reuse) a synthetic video with a hard cut every scene_seconds
+
+    Returns:
+        path, duration, fps, size and the expected cut times in seconds
+    """
+    os.makedirs(workdir, exist_ok=True)
+    width, height = size
+    name = f"synthetic_{width}x{height}_{fps}fps_{duration:g}s_{scene_seconds:g}s{'_audio' if audio else ''}.mp4"
+    path = os.path.join(workdir, name)
+
+    scene_count = max(1, int(math.ceil(duration / scene_seconds)))
+    lengths = [min(scene_seconds, duration - i * scene_seconds) for i in range(scene_count)]
+    cuts = [round(i * scene_seconds, 3) for i in range(1, scene_count)]
+
+    if not os.path.exists(path):
+        cmd = ["ffmpeg", "-v", "error", "-y"]
+        for i, length in enumerate(lengths):
+            source = SCENE_SOURCES[i % len(SCENE_SOURCES)]
+            cmd += ["-f", "lavfi", "-t", f"{length:g}", "-i", f"{source}=size={width}x{height}:rate={fps}"]
+        if audio:
+            cmd += ["-f", "lavfi", "-t", f"{duration:g}", "-i", "sine=frequency=440:sample_rate=48000"]
+
+        inputs = "".join(f"[{i}:v]format=yuv420p,setsar=1[v{i}];" for i in range(scene_count))
+        concat = "".join(f"[v{i}]" for i in range(scene_count)) + f"concat=n={scene_count}:v=1:a=0[v]"
+        cmd += ["-filter_complex", inputs + concat, "-map", "[v]"]
+        if audio:
+            cmd += ["-map", f"{scene_count}:a", "-c:a", "aac", "-b:a", "128k"]
+        cmd += [
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+            "-g", str(int(GOP_SECONDS * fps)),
+            "-movflags", "+faststart", path + ".part.mp4"
+        ]
+        subprocess.run(cmd, check=True)
+        os.replace(path + ".part.mp4", path)
+
+    return {"path": path, "duration": duration, "fps": fps, "size": [width, height], "cuts": cuts}
+
+def blob_center(frame_number: int, fps: float) -> Tuple[float, float]:
+    """Relative (0-1) position of the salient blob: a slow Lissajous path"""
+    t = frame_number / fps
+    return 0.5 + 0.35 * math.sin(0.4 * t), 0.5 + 0.25 * math.sin(0.7 * t + 1.0)
+
+def saliency_frames(frame_count: int, fps: float, size: Tuple[int, int], sample_rate: int = 5,
+                    aspect_ratio: Tuple[int, int] = (9, 16)) -> List[Dict[str, Any]]:
+    """Frame entries as stored by the saliency analysis (map, stats and one ROI suggestion)"""
+    width, height = size
+    map_width, map_height = SALIENCY_MAP_SIZE
+    xs = np.arange(map_width, dtype=np.float32)[None, :]
+    ys = np.arange(map_height, dtype=np.float32)[:, None]
+    sigma = map_height / 6.0
+
+    roi_width = min(width, int(height * aspect_ratio[0] / aspect_ratio[1]))
+    roi_height = min(height, int(roi_width * aspect_ratio[1] / aspect_ratio[0]))
+
+    frames = []
+    for frame_number in range(0, frame_count, sample_rate):
+        cx, cy = blob_center(frame_number, fps)
+        blob = np.exp(-((xs - cx * map_width) ** 2 + (ys - cy * map_height) ** 2) / (2 * sigma ** 2))
+        saliency_map = (blob * 255).astype(np.uint8)
+
+        x = int(np.clip(cx * width - roi_width / 2, 0, width - roi_width))
+        y = int(np.clip(cy * height - roi_height / 2, 0, height - roi_height))
+        frames.append({
+            "frame_number": frame_number,
+            "timestamp": frame_number / fps,
+            "saliency_data": saliency_map.tolist(),
+            "saliency_stats": {"mean": float(saliency_map.mean()), "max": int(saliency_map.max())},
+            "roi_suggestions": [{"x": x, "y": y, "width": roi_width, "height": roi_height, "score": 1.0}]
+        })
+    return frames
+
+def make_saliency_data(workdir: str, video: Dict[str, Any], sample_rate: int = 5) -> Dict[str, Any]:
+    """Write (or reuse) saliency_data.json for a synthetic video; returns path and data"""
+    name = os.path.splitext(os.path.basename(video["path"]))[0]
+    path = os.path.join(workdir, f"{name}_saliency_{sample_rate}.json")
+    frame_count = int(round(video["duration"] * video["fps"]))
+
+    if os.path.exists(path):
+        with open(path) as f:
+            return {"path": path, "data": json.load(f)}
+
+    data = {
+        "video_id": name,
+        "frames": saliency_frames(frame_count, video["fps"], tuple(video["size"]), sample_rate),
+        "metadata": {"video_info": {"width": video["size"][0], "height": video["size"][1], "fps": video["fps"],
+                                    "frame_count": frame_count}}
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    return {"path": path, "data": data}
+
+def read_frames(video_path: str, count: int, step: int = 1) -> List[np.ndarray]:
+    """Every step-th frame from the start of the video, up to count frames"""
+    import cv2
+
+    capture = cv2.VideoCapture(video_path)
+    frames = []
+    index = 0
+    try:
+        while len(frames) < count:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            if index % step == 0:
+                frames.append(frame)
+            index += 1
+    finally:
+        capture.release()
+    return frames
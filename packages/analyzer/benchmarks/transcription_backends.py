@@ -0,0 +1,73 @@
+"""
+Realtime factor of the transcription backends on this machine
+
+    cd packages/analyzer
+    python -m benchmarks.transcription_backends --input talk.mp4 --model-size base
+
+RTF = transcription time / audio duration (lower is faster; < 1 is faster than
+realtime). Model loading is reported separately. Backends whose packages are
+not installed are skipped.
+"""
+import argparse
+import json
+import os
+import time
+
+from src.services.audio_extractor import audio_extractor
+from src.services.transcription_backends import BACKENDS, get_backend
+from src.services.transcription_service import WHISPER_SAMPLE_RATE
+
+def benchmark_backend(name: str, audio, model_size: str, device: str, language: str = None) -> dict:
+    backend = get_backend(name, model_size=model_size, device=device)
+    duration = len(audio) / WHISPER_SAMPLE_RATE
+
+    try:
+        backend.load()
+    except ImportError as e:
+        return {"backend": name, "skipped": f"not installed: {e}"}
+
+    start = time.perf_counter()
+    result = backend.transcribe(audio, language=language)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "backend": name,
+        "model_size": model_size,
+        "device": device,
+        "audio_seconds": round(duration, 2),
+        "load_seconds": round(backend.load_time or 0.0, 2),
+        "transcribe_seconds": round(elapsed, 2),
+        "rtf": round(elapsed / duration, 4) if duration else None,
+        "segments": len(result["segments"]),
+        "words": sum(len(segment.get("words") or []) for segment in result["segments"]),
+        "language": result["language"]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="Video or audio file with speech")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--model-size", default="base")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Only use the first N seconds")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    audio = audio_extractor.load(args.input).resampled(WHISPER_SAMPLE_RATE, mono=True)
+    if args.max_seconds:
+        audio = audio[:int(args.max_seconds * WHISPER_SAMPLE_RATE)]
+
+    results = []
+    for name in args.backends:
+        result = benchmark_backend(name, audio, args.model_size, args.device, args.language)
+        print(json.dumps(result))
+        results.append(result)
+
+    report = {"input": os.path.abspath(args.input), "cpu_count": os.cpu_count(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
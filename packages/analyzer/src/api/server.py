@@ -1,10 +1,12 @@
 import os
 import asyncio
 import json
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+import threading
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+from starlette.background import BackgroundTask
+from typing import Dict, Any, Optional, List, Union
 import uvicorn
 from pathlib import Path
 import httpx
@@ -13,14 +15,22 @@ from ..services.scene_detector import SceneDetector
 from ..services.keyframe_extractor import KeyframeExtractor
 from ..services.vision_analyzer import VisionAnalyzer
 from ..services.transcription_service import TranscriptionService
+from ..services.transcription_backends import BACKENDS as TRANSCRIPTION_BACKENDS
+from ..services.transcription_jobs import TranscriptionJobManager
 from ..services.audio_separation_service import AudioSeparationService
 from ..services.audio_separator import AudioSeparatorService
 from ..services.spleeter_service import SpleeterService
-from ..services.saliency_detector import SaliencyDetector
-from ..services.heatmap_generator import HeatmapGenerator
+from ..services.demucs_engine import SeparationCancelled
+from ..services.saliency_detector import SaliencyDetector, PROGRESS_STAGES as SALIENCY_PROGRESS_STAGES
+from ..services.heatmap_generator import HeatmapGenerator, VISUALIZATION_OUTPUTS, is_visualization_output
 from ..services.reframing_service import ReframingService
 from ..database.client import DatabaseClient
 from ..utils.logger import logger, log_analysis_step, log_error
+from ..utils.progress import progress_channel
+from ..utils.model_registry import model_registry
+from ..utils.metrics import metrics
+from ..utils.tracing import tracer
+from ..utils.profiling import PROFILE_SUFFIX, profile_job, sampled
 
 app = FastAPI(
     title="PrismVid AI Hub API",
@@ -44,11 +54,32 @@ saliency_detector = SaliencyDetector(model_type="vit_b", use_coreml=False)
 heatmap_generator = HeatmapGenerator()
 reframing_service = ReframingService()
 db_client = DatabaseClient()
+transcription_jobs = TranscriptionJobManager(transcription_service, db_client)
+
+def running_jobs_by_pipeline() -> Dict[tuple, float]:
+    counts: Dict[tuple, float] = {}
+    for snapshot in progress_channel.active():
+        key = (snapshot["key"].split(":", 1)[0],)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+# Scrape-time gauges (read counters the services keep; cheap enough for frequent scrapes)
+metrics.gauge("analyzer_active_jobs", "Jobs currently running per pipeline", ("pipeline",), callback=running_jobs_by_pipeline)
+metrics.gauge("analyzer_active_frames_per_second", "Smoothed throughput of running jobs per pipeline and stage", ("pipeline", "stage"),
+              callback=lambda: {(s["key"].split(":", 1)[0], s["stage"]): s["fps"] for s in progress_channel.active()})
+metrics.gauge("analyzer_reframing_active_jobs", "Reframing jobs in progress", callback=lambda: reframing_service.get_active_jobs_count())
+metrics.gauge("analyzer_transcription_jobs", "Transcription jobs per status (QUEUED is the queue depth)", ("status",),
+              callback=lambda: {(status,): count for status, count in transcription_jobs.count_by_status().items()})
+metrics.gauge("analyzer_model_loaded", "Whether a registered model is loaded", ("model",),
+              callback=lambda: {(entry["name"],): int(entry["loaded"]) for entry in model_registry.stats()})
+metrics.gauge("analyzer_model_memory_megabytes", "Memory measured for a loaded model", ("model",),
+              callback=lambda: {(entry["name"],): entry["memory_mb"] or 0 for entry in model_registry.stats() if entry["loaded"]})
 
 # Models
 class AnalysisRequest(BaseModel):
     videoId: str
     videoPath: str
+    profile: bool = False  # Store a sampling profile (folded stacks) next to the keyframes
 
 class AnalysisResponse(BaseModel):
     message: str
@@ -57,6 +88,14 @@ class AnalysisResponse(BaseModel):
 
 class TranscriptionRequest(BaseModel):
     language: str = None
+    vad: Optional[bool] = None  # None = TRANSCRIPTION_VAD setting
+    backend: Optional[str] = None  # openai-whisper, faster-whisper, batched (None = TRANSCRIPTION_BACKEND setting)
+    workers: Optional[int] = None  # Worker processes for long audio (None = TRANSCRIPTION_WORKERS setting)
+
+class TranscriptionJobResponse(BaseModel):
+    jobId: str
+    videoId: str
+    status: str
 
 class TranscriptionResponse(BaseModel):
     transcription_id: str
@@ -69,6 +108,9 @@ class SceneAudioSeparationRequest(BaseModel):
     endTime: float
     stemTypes: list = ["vocals", "music", "original"]
 
+class SpleeterSeparationRequest(BaseModel):
+    mode: str = "scene"  # "scene": one separation per scene, "track": whole soundtrack once, sliced per scene
+
 class SceneAudioSeparationResponse(BaseModel):
     message: str
     videoId: str
@@ -81,6 +123,7 @@ class SaliencyRequest(BaseModel):
     sampleRate: int = 1
     aspectRatio: List[int] = [9, 16]
     maxFrames: Optional[int] = None
+    profile: bool = False  # Store a sampling profile (folded stacks) in the saliency directory
 
 class SaliencyResponse(BaseModel):
     message: str
@@ -102,6 +145,7 @@ class HeatmapRequest(BaseModel):
     opacity: float = 0.5
     showRoi: bool = True
     showInfo: bool = True
+    outputs: List[str] = ["heatmap"]
 
 class HeatmapResponse(BaseModel):
     message: str
@@ -117,6 +161,41 @@ class ReframingRequest(BaseModel):
     smoothingFactor: float = 0.3
     outputFormat: str = "mp4"
     reframedVideoId: Optional[str] = None
+    parallel: bool = False
+    maxWorkers: Optional[int] = None
+    sceneBoundaries: Optional[List[float]] = None
+    zoom: bool = False
+    profile: bool = False  # Store a sampling profile (folded stacks) next to the output video
+
+class CropPathRequest(BaseModel):
+    videoPath: str
+    saliencyDataPath: str
+    aspectRatio: Dict[str, int]
+    smoothingFactor: float = 0.3
+    changesOnly: bool = False
+    zoom: bool = False
+
+class CropPathResponse(BaseModel):
+    fps: float
+    frameCount: int
+    width: int
+    height: int
+    outputWidth: int
+    outputHeight: int
+    fields: List[str]
+    path: List[List[Union[int, float]]]
+    stats: Dict[str, Any]
+
+class PreviewRequest(BaseModel):
+    videoId: str
+    videoPath: str
+    saliencyDataPath: str
+    aspectRatio: Dict[str, int]
+    smoothingFactor: float = 0.3
+    startTime: float = 0.0
+    endTime: Optional[float] = None
+    previewHeight: int = 360
+    zoom: bool = False
 
 class ReframingResponse(BaseModel):
     message: str
@@ -124,17 +203,84 @@ class ReframingResponse(BaseModel):
     jobId: str
     status: str
 
+class ModelWarmupRequest(BaseModel):
+    models: Optional[List[str]] = None  # None = all registered models
+
 class StatusResponse(BaseModel):
     status: str
     progress: float
     message: Optional[str] = None
     completed: Optional[bool] = None
+    stage: Optional[str] = None
+    stageIndex: Optional[int] = None
+    stageProgress: Optional[float] = None
+    processedFrames: Optional[int] = None
+    totalFrames: Optional[int] = None
+    fps: Optional[float] = None
+    eta: Optional[float] = None
+
+def status_from_progress(snapshot: Dict[str, Any], running_status: str) -> StatusResponse:
+    """Build a StatusResponse (progress 0-1) from a progress channel snapshot"""
+    status = running_status if snapshot["status"] == "RUNNING" else snapshot["status"]
+    return StatusResponse(
+        status=status, progress=snapshot["progress"], message=snapshot.get("error"),
+        completed=snapshot["status"] != "RUNNING", stage=snapshot["stage"],
+        stageIndex=snapshot["stage_index"], stageProgress=snapshot["stage_progress"],
+        processedFrames=snapshot["processed"], totalFrames=snapshot["total"],
+        fps=snapshot["fps"], eta=snapshot["eta_seconds"]
+    )
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "prismvid-ai-hub"}
 
+@app.on_event("startup")
+async def warmup_models_on_startup():
+    """Preload the models listed in MODEL_WARMUP (comma separated, 'all') without blocking startup"""
+    names = [name.strip() for name in os.getenv('MODEL_WARMUP', '').split(",") if name.strip()]
+    if names:
+        threading.Thread(target=model_registry.warmup, args=(None if names == ["all"] else names,),
+                         name="model-warmup", daemon=True).start()
+
+@app.get("/models")
+async def list_models():
+    """Registered models with load state, load/idle time and memory, plus the memory budget"""
+    return {**model_registry.memory_stats(), "models": model_registry.stats()}
+
+@app.post("/models/warmup")
+async def warmup_models(request: Optional[ModelWarmupRequest] = None):
+    """Load models now instead of on the first request"""
+    names = request.models if request else None
+    unknown = [name for name in names or [] if not model_registry.is_registered(name)]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown models: {', '.join(unknown)}")
+    return {"models": await asyncio.to_thread(model_registry.warmup, names)}
+
+@app.get("/traces")
+async def list_traces(pipeline: Optional[str] = None, limit: int = 50):
+    """Per-stage timing summaries of the most recent jobs (running ones included)"""
+    return {"traces": [trace.summary() for trace in tracer.recent(pipeline, limit)]}
+
+@app.get("/traces/{pipeline}/{job_id}")
+async def get_trace(pipeline: str, job_id: str):
+    """Full trace of one job: stage totals, operations and span timeline"""
+    trace = tracer.get(pipeline, job_id)
+    if trace is None: raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.to_dict()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Throughput, latencies, active jobs, model and process metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/models/{name}/unload")
+async def unload_model(name: str):
+    """Free a model's memory (refused while a job uses it)"""
+    if not model_registry.is_registered(name):
+        raise HTTPException(status_code=404, detail=f"Unknown model '{name}'")
+    return {"name": name, "unloaded": await asyncio.to_thread(model_registry.unload, name)}
+
 # Original Analyzer Endpoints
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_video(request: AnalysisRequest, background_tasks: BackgroundTasks):
@@ -144,44 +290,48 @@ async def analyze_video(request: AnalysisRequest, background_tasks: BackgroundTa
     logger.info(f"Starting scene analysis for video {video_id}")
     await db_client.update_video_status(video_id, "ANALYZING")
     await db_client.create_analysis_log(video_id, "INFO", "Scene analysis started")
-    background_tasks.add_task(process_video_analysis, video_id, video_path)
+    background_tasks.add_task(process_video_analysis, video_id, video_path, request.profile)
     return AnalysisResponse(message="Video analysis started", videoId=video_id, status="ANALYZING")
 
-async def process_video_analysis(video_id: str, video_path: str):
-    try:
-        log_analysis_step(video_id, "scene_detection_start")
-        scenes = scene_detector.detect_scenes(video_path)
-        if not scenes:
-            log_error(video_id, "No scenes detected")
-            await db_client.update_video_status(video_id, "ERROR")
-            await db_client.create_analysis_log(video_id, "ERROR", "No scenes detected")
-            return
+async def process_video_analysis(video_id: str, video_path: str, profile: bool = False):
+    profile_path = os.path.join(keyframe_extractor.keyframes_dir, f"{video_id}{PROFILE_SUFFIX}")
+    with tracer.job("analyze", video_id) as trace, profile_job(profile_path, enabled=profile):
+        try:
+            log_analysis_step(video_id, "scene_detection_start")
+            scenes = scene_detector.detect_scenes(video_path)
+            if not scenes:
+                trace.fail("No scenes detected")
+                log_error(video_id, "No scenes detected")
+                await db_client.update_video_status(video_id, "ERROR")
+                await db_client.create_analysis_log(video_id, "ERROR", "No scenes detected")
+                return
         
-        log_analysis_step(video_id, "scene_detection_complete", {"scene_count": len(scenes)})
-        log_analysis_step(video_id, "keyframe_extraction_start")
-        keyframe_paths = keyframe_extractor.extract_scene_keyframes(video_path, scenes, video_id)
+            log_analysis_step(video_id, "scene_detection_complete", {"scene_count": len(scenes)})
+            log_analysis_step(video_id, "keyframe_extraction_start")
+            keyframe_paths = keyframe_extractor.extract_scene_keyframes(video_path, scenes, video_id)
         
-        for i, (start_time, end_time) in enumerate(scenes):
-            keyframe_path = keyframe_paths[i] if i < len(keyframe_paths) else None
-            scene_id = await db_client.create_scene(video_id, start_time, end_time, keyframe_path)
-            if keyframe_path:
-                try:
-                    await trigger_vision_analysis(scene_id, keyframe_path)
-                except Exception as vision_error:
-                    logger.error(f"Failed vision analysis for scene {scene_id}: {vision_error}")
-
-        await db_client.update_video_status(video_id, "ANALYZED")
-        await db_client.create_analysis_log(video_id, "INFO", "Scene detection completed")
+            for i, (start_time, end_time) in enumerate(scenes):
+                keyframe_path = keyframe_paths[i] if i < len(keyframe_paths) else None
+                scene_id = await db_client.create_scene(video_id, start_time, end_time, keyframe_path)
+                if keyframe_path:
+                    try:
+                        await trigger_vision_analysis(scene_id, keyframe_path)
+                    except Exception as vision_error:
+                        logger.error(f"Failed vision analysis for scene {scene_id}: {vision_error}")
+
+            await db_client.update_video_status(video_id, "ANALYZED")
+            await db_client.create_analysis_log(video_id, "INFO", "Scene detection completed")
         
-        # Trigger Qwen VL and indexing
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                await client.post(f"{BACKEND_URL}/api/videos/{video_id}/qwenVL/analyze", timeout=5.0)
-                await client.post(f"{BACKEND_URL}/api/videos/{video_id}/index", timeout=5.0)
-        except Exception: pass
-    except Exception as e:
-        log_error(video_id, f"Analysis failed: {str(e)}")
-        await db_client.update_video_status(video_id, "ERROR")
+            # Trigger Qwen VL and indexing
+            try:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    await client.post(f"{BACKEND_URL}/api/videos/{video_id}/qwenVL/analyze", timeout=5.0)
+                    await client.post(f"{BACKEND_URL}/api/videos/{video_id}/index", timeout=5.0)
+            except Exception: pass
+        except Exception as e:
+            trace.fail(str(e))
+            log_error(video_id, f"Analysis failed: {str(e)}")
+            await db_client.update_video_status(video_id, "ERROR")
 
 async def trigger_vision_analysis(scene_id: str, keyframe_path: str):
     vision_result = vision_analyzer.analyze_scene(keyframe_path, scene_id)
@@ -203,18 +353,76 @@ async def trigger_vision_analysis(scene_id: str, keyframe_path: str):
         )
 
 # Transcription Endpoints
+def submit_transcription_job(video_id: str, request: Optional[TranscriptionRequest]):
+    request = request or TranscriptionRequest()
+    if request.backend and request.backend not in TRANSCRIPTION_BACKENDS: raise HTTPException(status_code=400, detail=f"Invalid backend, choose from: {', '.join(TRANSCRIPTION_BACKENDS)}")
+    video = db_client.get_video(video_id)
+    if not video: raise HTTPException(status_code=404, detail="Video not found")
+    return transcription_jobs.submit(video_id, video["file_path"], language=request.language, vad=request.vad, backend=request.backend, workers=request.workers)
+
 @app.post("/api/transcribe/{video_id}", response_model=TranscriptionResponse)
 async def transcribe_video(video_id: str, request: TranscriptionRequest = None):
-    try:
-        video = db_client.get_video(video_id)
-        if not video: raise HTTPException(status_code=404, detail="Video not found")
-        result = transcription_service.transcribe_video(video["file_path"], language=request.language if request else None)
-        transcription_id = db_client.create_transcription(video_id=video_id, language=result["language"], segments=result["segments"])
-        db_client.update_video_status_sync(video_id, "TRANSCRIBED")
-        return TranscriptionResponse(transcription_id=transcription_id, language=result["language"], segment_count=len(result["segments"]), duration=result["duration"])
-    except Exception as e:
-        logger.error(f"Transcription failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """Transcribe and wait for the result (runs on the job pool, the event loop stays free)"""
+    job = submit_transcription_job(video_id, request)
+    await asyncio.wrap_future(job.future)
+    if job.status != "COMPLETED":
+        logger.error(f"Transcription failed: {job.error}")
+        raise HTTPException(status_code=500, detail=job.error)
+    return TranscriptionResponse(transcription_id=job.transcription_id, language=job.language, segment_count=len(job.segments), duration=job.duration)
+
+@app.post("/api/transcribe/{video_id}/jobs", response_model=TranscriptionJobResponse)
+async def create_transcription_job(video_id: str, request: TranscriptionRequest = None):
+    """Start a transcription and return its job ID immediately"""
+    job = submit_transcription_job(video_id, request)
+    return TranscriptionJobResponse(jobId=job.id, videoId=video_id, status=job.status)
+
+@app.get("/api/transcribe/jobs/{job_id}")
+async def get_transcription_job(job_id: str, since: int = 0):
+    """Job status, progress and the segments decoded so far (from index since on)"""
+    job = transcription_jobs.get(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Transcription job not found")
+    return job.snapshot(since=max(0, since))
+
+@app.get("/api/transcribe/jobs/{job_id}/stream")
+async def stream_transcription_job(job_id: str, since: int = 0, last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")):
+    """
+    Server-sent events: one "segment" event per decoded segment (event id = segment count),
+    "progress" events while running and a final "done" or "error" event.
+    Reconnecting clients resume after Last-Event-ID.
+    """
+    job = transcription_jobs.get(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Transcription job not found")
+    sent = max(0, int(last_event_id) if last_event_id and last_event_id.isdigit() else since)
+    return StreamingResponse(transcription_events(job, sent), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def transcription_events(job, sent: int, poll_interval: float = 0.25, heartbeat_interval: float = 15.0):
+    last_progress = None
+    idle = 0.0
+    while True:
+        finished = job.finished
+        segments = job.segments[sent:]
+        for segment in segments:
+            sent += 1
+            yield f"id: {sent}\nevent: segment\ndata: {json.dumps(segment)}\n\n"
+
+        progress = progress_channel.get(job.progress_key)
+        if progress and progress.get("updated_at") != (last_progress or {}).get("updated_at"):
+            last_progress = progress
+            yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+
+        if finished:
+            snapshot = job.snapshot(since=sent)
+            snapshot.pop("segments")
+            yield f"event: {'done' if job.status == 'COMPLETED' else 'error'}\ndata: {json.dumps(snapshot)}\n\n"
+            return
+
+        if segments:
+            idle = 0.0
+        elif idle >= heartbeat_interval:
+            idle = 0.0
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(poll_interval)
+        idle += poll_interval
 
 # Audio Separation Endpoints
 @app.post("/api/separate-audio-scene/{video_id}/{scene_id}", response_model=SceneAudioSeparationResponse)
@@ -245,86 +453,170 @@ async def separate_audio(request: AnalysisRequest, background_tasks: BackgroundT
     return AnalysisResponse(message="Audio separation started", videoId=video_id, status="ANALYZING")
 
 async def process_audio_separation(video_id: str, video_path: str):
-    try:
-        log_analysis_step(video_id, "audio_separation_start")
-        storage_path = os.getenv('STORAGE_PATH', '/app/storage')
-        output_dir = f"{storage_path}/audio_stems/{video_id}"
-        os.makedirs(output_dir, exist_ok=True)
-        stem_paths = audio_separator.separate_audio(video_path, output_dir, video_id)
-        for stem_type, file_path in stem_paths.items():
-            db_client.create_audio_stem(video_id=video_id, scene_id=None, stem_type=stem_type, file_path=file_path, file_size=os.path.getsize(file_path))
-        db_client.update_video_status_sync(video_id, "ANALYZED")
-        db_client.create_analysis_log_sync(video_id, "INFO", "Audio separation completed")
-    except Exception as e:
-        log_error(video_id, f"Audio separation failed: {str(e)}")
-        db_client.update_video_status_sync(video_id, "ERROR")
+    with tracer.job("audio_separation", video_id) as trace:
+        try:
+            log_analysis_step(video_id, "audio_separation_start")
+            storage_path = os.getenv('STORAGE_PATH', '/app/storage')
+            output_dir = f"{storage_path}/audio_stems/{video_id}"
+            os.makedirs(output_dir, exist_ok=True)
+            with tracer.span("separate_audio", "inference"):
+                stem_paths = audio_separator.separate_audio(video_path, output_dir, video_id)
+            for stem_type, file_path in stem_paths.items():
+                db_client.create_audio_stem(video_id=video_id, scene_id=None, stem_type=stem_type, file_path=file_path, file_size=os.path.getsize(file_path))
+            db_client.update_video_status_sync(video_id, "ANALYZED")
+            db_client.create_analysis_log_sync(video_id, "INFO", "Audio separation completed")
+        except Exception as e:
+            trace.fail(str(e))
+            log_error(video_id, f"Audio separation failed: {str(e)}")
+            db_client.update_video_status_sync(video_id, "ERROR")
+
+# Cancel flags of running whole-track separations
+spleeter_cancel_events: Dict[str, threading.Event] = {}
 
 @app.post("/api/spleeter-separate/{video_id}")
-async def spleeter_separate_audio(video_id: str, background_tasks: BackgroundTasks):
+async def spleeter_separate_audio(video_id: str, background_tasks: BackgroundTasks, request: Optional[SpleeterSeparationRequest] = None):
     """Separate audio using Spleeter (macOS-optimized)"""
+    mode = request.mode if request else "scene"
+    if mode not in ("scene", "track"): raise HTTPException(status_code=400, detail="Invalid mode, choose 'scene' or 'track'")
     try:
         video = db_client.get_video(video_id)
         if not video: raise HTTPException(status_code=404, detail="Video not found")
-        background_tasks.add_task(process_spleeter_separation, video_id, video["file_path"])
-        return {"videoId": video_id, "status": "SEPARATING", "message": "Spleeter separation started"}
+        background_tasks.add_task(process_spleeter_separation, video_id, video["file_path"], mode)
+        return {"videoId": video_id, "status": "SEPARATING", "mode": mode, "message": "Spleeter separation started"}
     except Exception as e:
         logger.error(f"Spleeter separation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def process_spleeter_separation(video_id: str, video_path: str):
+@app.post("/api/spleeter-separate/{video_id}/cancel")
+async def cancel_spleeter_separation(video_id: str):
+    """Cancel a running whole-track separation (takes effect after the current chunk)"""
+    cancel_event = spleeter_cancel_events.get(video_id)
+    if cancel_event is None: raise HTTPException(status_code=404, detail="No track separation running for this video")
+    cancel_event.set()
+    return {"videoId": video_id, "status": "CANCELLING"}
+
+@app.get("/api/spleeter-separate/{video_id}/status", response_model=StatusResponse)
+async def get_spleeter_status(video_id: str):
+    snapshot = progress_channel.get(f"spleeter:{video_id}")
+    if not snapshot:
+        return StatusResponse(status="NOT_STARTED", progress=0.0)
+    return status_from_progress(snapshot, "SEPARATING")
+
+async def process_spleeter_separation(video_id: str, video_path: str, mode: str = "scene"):
+    with tracer.job("spleeter", video_id) as trace:
+        try:
+            db_client.update_video_status_sync(video_id, "SEPARATING")
+            scenes = db_client.get_scenes_by_video_id(video_id)
+            if mode == "track":
+                await separate_track_by_scenes(video_id, video_path, scenes)
+            else:
+                for scene in scenes:
+                    with tracer.span("separate_scene", "inference"):
+                        stem_paths = spleeter_service.separate_audio_for_timerange(
+                            video_path=video_path, start_time=scene["start_time"], end_time=scene["end_time"],
+                            video_id=video_id, scene_id=scene["id"], stem_types=['vocals', 'accompaniment', 'original']
+                        )
+                    for stem_type, stem_path in stem_paths.items():
+                        db_client.create_audio_stem(video_id=video_id, scene_id=scene["id"], stem_type=stem_type, file_path=stem_path, file_size=os.path.getsize(stem_path), start_time=scene["start_time"], end_time=scene["end_time"])
+            db_client.update_video_status_sync(video_id, "ANALYZED")
+        except SeparationCancelled as e:
+            logger.info(f"Spleeter separation cancelled for video {video_id}: {e}")
+            db_client.create_analysis_log_sync(video_id, "WARNING", "Audio separation cancelled")
+            # Stems are incomplete, so the video must not count as analyzed
+            db_client.update_video_status_sync(video_id, "ERROR")
+        except Exception as e:
+            trace.fail(str(e))
+            log_error(video_id, f"Spleeter failed: {str(e)}")
+            db_client.update_video_status_sync(video_id, "ERROR")
+
+async def separate_track_by_scenes(video_id: str, video_path: str, scenes: List[Dict[str, Any]]):
+    """Separate the whole soundtrack once and register the stems per scene"""
+    cancel_event = spleeter_cancel_events.setdefault(video_id, threading.Event())
+    progress = progress_channel.open(f"spleeter:{video_id}", total=0, stage="separating")
+
+    def on_progress(done: int, total: int):
+        progress.total = total
+        progress.advance(done - progress.processed)
+
     try:
-        db_client.update_video_status_sync(video_id, "SEPARATING")
-        scenes = db_client.get_scenes_by_video_id(video_id)
-        for scene in scenes:
-            stem_paths = spleeter_service.separate_audio_for_timerange(
-                video_path=video_path, start_time=scene["start_time"], end_time=scene["end_time"],
-                video_id=video_id, scene_id=scene["id"], stem_types=['vocals', 'accompaniment', 'original']
+        with tracer.span("separate_track", "inference"):
+            scene_stems = await asyncio.to_thread(
+                spleeter_service.separate_track_by_scenes, video_path=video_path, video_id=video_id, scenes=scenes,
+                stem_types=['vocals', 'accompaniment', 'original'], cancel_event=cancel_event, on_progress=on_progress
             )
-            for stem_type, stem_path in stem_paths.items():
+        for scene in scenes:
+            for stem_type, stem_path in scene_stems.get(str(scene["id"]), {}).items():
                 db_client.create_audio_stem(video_id=video_id, scene_id=scene["id"], stem_type=stem_type, file_path=stem_path, file_size=os.path.getsize(stem_path), start_time=scene["start_time"], end_time=scene["end_time"])
-        db_client.update_video_status_sync(video_id, "ANALYZED")
+        progress.finish()
     except Exception as e:
-        log_error(video_id, f"Spleeter failed: {str(e)}")
-        db_client.update_video_status_sync(video_id, "ERROR")
+        progress.finish(error=str(e))
+        raise
+    finally:
+        spleeter_cancel_events.pop(video_id, None)
 
 # Saliency Endpoints
 @app.post("/saliency/analyze", response_model=SaliencyResponse)
 async def analyze_saliency(request: SaliencyRequest, background_tasks: BackgroundTasks):
     logger.info(f"Starting saliency analysis for video {request.videoId}")
-    background_tasks.add_task(process_saliency_analysis, request.videoId, request.videoPath, request.sampleRate, tuple(request.aspectRatio), request.maxFrames)
+    background_tasks.add_task(process_saliency_analysis, request.videoId, request.videoPath, request.sampleRate, tuple(request.aspectRatio), request.maxFrames, request.profile)
     return SaliencyResponse(message="Saliency analysis started", videoId=request.videoId, status="ANALYZING")
 
-async def process_saliency_analysis(video_id: str, video_path: str, sample_rate: int, aspect_ratio: tuple, max_frames: Optional[int]):
-    try:
-        result = saliency_detector.analyze_video(video_path=video_path, video_id=video_id, sample_rate=sample_rate, aspect_ratio=aspect_ratio, max_frames=max_frames)
-        roi_suggestions = []
-        for frame in result["frames"]:
-            if "roi_suggestions" in frame: roi_suggestions.extend(frame["roi_suggestions"])
-        await db_client.create_saliency_analysis(
-            video_id=video_id, scene_id=None, data_path=f"/Volumes/DOCKER_EXTERN/prismvid/storage/saliency/{video_id}/saliency_data.json",
-            heatmap_path=None, roi_data=json.dumps(roi_suggestions), frame_count=len(result["frames"]),
-            sample_rate=sample_rate, model_version=saliency_detector.model_type, processing_time=result["metadata"]["processing_stats"]["processing_time"]
-        )
-        logger.info(f"Saliency analysis complete for video {video_id}")
-    except Exception as e:
-        logger.error(f"Saliency analysis failed: {e}")
+async def process_saliency_analysis(video_id: str, video_path: str, sample_rate: int, aspect_ratio: tuple, max_frames: Optional[int], profile: bool = False):
+    profile_path = str(saliency_detector.storage_dir / video_id / f"saliency{PROFILE_SUFFIX}")
+    with tracer.job("saliency", video_id) as trace, profile_job(profile_path, enabled=profile):
+        progress = progress_channel.open(f"saliency:{video_id}", total=0, stage="starting", stages=SALIENCY_PROGRESS_STAGES)
+        try:
+            result = await asyncio.to_thread(sampled(saliency_detector.analyze_video), video_path=video_path, video_id=video_id, sample_rate=sample_rate, aspect_ratio=aspect_ratio, max_frames=max_frames, progress=progress)
+            roi_suggestions = []
+            for frame in result["frames"]:
+                if "roi_suggestions" in frame: roi_suggestions.extend(frame["roi_suggestions"])
+            await db_client.create_saliency_analysis(
+                video_id=video_id, scene_id=None, data_path=f"/Volumes/DOCKER_EXTERN/prismvid/storage/saliency/{video_id}/saliency_data.json",
+                heatmap_path=None, roi_data=json.dumps(roi_suggestions), frame_count=len(result["frames"]),
+                sample_rate=sample_rate, model_version=saliency_detector.model_type, processing_time=result["metadata"]["processing_stats"]["processing_time"]
+            )
+            progress.finish()
+            logger.info(f"Saliency analysis complete for video {video_id}")
+        except Exception as e:
+            trace.fail(str(e))
+            progress.finish(error=str(e))
+            logger.error(f"Saliency analysis failed: {e}")
 
 @app.post("/saliency/generate-heatmap", response_model=HeatmapResponse)
 async def generate_heatmap(request: HeatmapRequest, background_tasks: BackgroundTasks):
-    background_tasks.add_task(process_heatmap_generation, request.videoId, request.colormap, request.opacity, request.showRoi, request.showInfo)
+    unknown = [name for name in request.outputs if not is_visualization_output(name)]
+    if unknown or not request.outputs: raise HTTPException(status_code=400, detail=f"Invalid outputs, choose from: {', '.join(VISUALIZATION_OUTPUTS)} or roi_<w>x<h>")
+    background_tasks.add_task(process_heatmap_generation, request.videoId, request.colormap, request.opacity, request.showRoi, request.showInfo, request.outputs)
     return HeatmapResponse(message="Heatmap generation started", videoId=request.videoId, heatmapPath="")
 
-async def process_heatmap_generation(video_id: str, colormap: str, opacity: float, show_roi: bool, show_info: bool):
-    try:
-        saliency_data = saliency_detector.get_analysis_results(video_id)
-        video_info = db_client.get_video(video_id)
-        output_path = f"/Volumes/DOCKER_EXTERN/prismvid/storage/saliency/{video_id}/heatmap_video.mp4"
-        heatmap_generator.create_heatmap_video(video_path=video_info["file_path"], saliency_data=saliency_data, output_path=output_path, colormap=colormap, opacity=opacity, show_roi=show_roi, show_info=show_info)
-    except Exception as e:
-        logger.error(f"Heatmap generation failed: {e}")
+async def process_heatmap_generation(video_id: str, colormap: str, opacity: float, show_roi: bool, show_info: bool, outputs: List[str]):
+    with tracer.job("heatmap", video_id) as trace:
+        progress = progress_channel.open(f"heatmap:{video_id}", total=0, stage="starting")
+        try:
+            saliency_data = saliency_detector.get_analysis_results(video_id)
+            video_info = db_client.get_video(video_id)
+            output_dir = f"/Volumes/DOCKER_EXTERN/prismvid/storage/saliency/{video_id}"
+            with tracer.span("load_saliency", "io"):
+                saliency_maps = saliency_detector.get_saliency_maps(video_id)
+            await asyncio.to_thread(heatmap_generator.generate_all_visualizations, video_path=video_info["file_path"], video_id=video_id, saliency_data=saliency_data, outputs=outputs, output_dir=output_dir, colormap=colormap, opacity=opacity, show_roi=show_roi, show_info=show_info, saliency_maps=saliency_maps, progress=progress)
+            progress.finish()
+        except Exception as e:
+            trace.fail(str(e))
+            progress.finish(error=str(e))
+            logger.error(f"Heatmap generation failed: {e}")
+
+@app.get("/saliency/heatmap-status/{video_id}", response_model=StatusResponse)
+async def get_heatmap_status(video_id: str):
+    snapshot = progress_channel.get(f"heatmap:{video_id}")
+    if not snapshot:
+        return StatusResponse(status="NOT_STARTED", progress=0.0)
+    return status_from_progress(snapshot, "GENERATING")
 
 @app.get("/saliency/status/{video_id}", response_model=StatusResponse)
 async def get_saliency_status(video_id: str):
+    snapshot = progress_channel.get(f"saliency:{video_id}")
+    if snapshot and snapshot["status"] != "COMPLETED":
+        return status_from_progress(snapshot, "ANALYZING")
     data = await db_client.get_saliency_analysis(video_id)
     if not data:
         return StatusResponse(status="NOT_STARTED", progress=0.0)
@@ -333,14 +625,27 @@ async def get_saliency_status(video_id: str):
 # Reframing Endpoints
 @app.post("/reframe/video", response_model=ReframingResponse)
 async def reframe_video(request: ReframingRequest):
-    job_id = await reframing_service.reframe_video(video_id=request.videoId, video_path=request.videoPath, saliency_data_path=request.saliencyDataPath, aspect_ratio=request.aspectRatio, smoothing_factor=request.smoothingFactor, output_format=request.outputFormat, reframed_video_id=request.reframedVideoId)
+    job_id = await reframing_service.reframe_video(video_id=request.videoId, video_path=request.videoPath, saliency_data_path=request.saliencyDataPath, aspect_ratio=request.aspectRatio, smoothing_factor=request.smoothingFactor, output_format=request.outputFormat, reframed_video_id=request.reframedVideoId, parallel=request.parallel, max_workers=request.maxWorkers, scene_boundaries=request.sceneBoundaries, zoom=request.zoom, profile=request.profile)
     return ReframingResponse(message="Reframing started", videoId=request.videoId, jobId=job_id, status="PROCESSING")
 
 @app.get("/reframe/status/{job_id}", response_model=StatusResponse)
 async def get_reframing_status(job_id: str):
     status = reframing_service.get_job_status(job_id)
     if not status: raise HTTPException(status_code=404, detail="Job not found")
-    return StatusResponse(status=status["status"], progress=status["progress"], message=status.get("error"), completed=status["status"] in ["COMPLETED", "ERROR"])
+    return StatusResponse(status=status["status"], progress=status["progress"], message=status.get("error"), completed=status["status"] in ["COMPLETED", "ERROR"], processedFrames=status.get("processed_frames"), totalFrames=status.get("total_frames"), fps=status.get("fps"), eta=status.get("eta_seconds"))
+
+@app.post("/reframe/crop-path", response_model=CropPathResponse)
+async def get_crop_path(request: CropPathRequest):
+    if not os.path.exists(request.videoPath) or not os.path.exists(request.saliencyDataPath): raise HTTPException(status_code=404, detail="Video or saliency data not found")
+    result = await reframing_service.get_crop_path(video_path=request.videoPath, saliency_data_path=request.saliencyDataPath, aspect_ratio=request.aspectRatio, smoothing_factor=request.smoothingFactor, changes_only=request.changesOnly, zoom=request.zoom)
+    return CropPathResponse(fps=result["fps"], frameCount=result["frame_count"], width=result["width"], height=result["height"], outputWidth=result["output_width"], outputHeight=result["output_height"], fields=result["fields"], path=result["path"], stats=result["stats"])
+
+@app.post("/reframe/preview")
+async def render_reframe_preview(request: PreviewRequest):
+    if not os.path.exists(request.videoPath) or not os.path.exists(request.saliencyDataPath): raise HTTPException(status_code=404, detail="Video or saliency data not found")
+    preview_path = await reframing_service.render_preview(video_id=request.videoId, video_path=request.videoPath, saliency_data_path=request.saliencyDataPath, aspect_ratio=request.aspectRatio, smoothing_factor=request.smoothingFactor, start_time=request.startTime, end_time=request.endTime, preview_height=request.previewHeight, zoom=request.zoom)
+    # Previews are rendered per request; delete the file once it has been sent
+    return FileResponse(path=preview_path, media_type="video/mp4", filename=os.path.basename(preview_path), background=BackgroundTask(os.remove, preview_path))
 
 @app.get("/reframe/download/{job_id}")
 async def download_reframed(job_id: str):
@@ -6,6 +6,7 @@ import uuid
 import json
 import asyncio
 from ..utils.logger import logger
+from ..utils.tracing import tracer
 
 class DatabaseClient:
     def __init__(self):
@@ -30,6 +31,7 @@ class DatabaseClient:
             logger.error(f"Failed to connect to database: {e}")
             raise
 
+    @tracer.traced("db")
     def _update_video_status_sync(self, video_id: str, status: str) -> bool:
         """Update video status in database (synchronous implementation)"""
         try:
@@ -60,6 +62,7 @@ class DatabaseClient:
         """Update video status in database (synchronous, for backwards compatibility)"""
         return self._update_video_status_sync(video_id, status)
 
+    @tracer.traced("db")
     def _create_scene_sync(self, video_id: str, start_time: float, end_time: float, keyframe_path: Optional[str] = None) -> Optional[str]:
         """Create a new scene record (synchronous implementation)"""
         try:
@@ -85,6 +88,7 @@ class DatabaseClient:
         """Create a new scene record (async wrapper)"""
         return await asyncio.to_thread(self._create_scene_sync, video_id, start_time, end_time, keyframe_path)
 
+    @tracer.traced("db")
     def get_scenes_by_video_id(self, video_id: str) -> List[Dict[str, Any]]:
         """Get all scenes for a video"""
         try:
@@ -117,6 +121,7 @@ class DatabaseClient:
             logger.error(f"Failed to get scenes for video {video_id}: {e}")
             return []
 
+    @tracer.traced("db")
     def _create_analysis_log_sync(self, video_id: str, level: str, message: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Create analysis log entry (synchronous implementation)"""
         try:
@@ -145,6 +150,7 @@ class DatabaseClient:
         """Create analysis log entry (synchronous, for backwards compatibility)"""
         return self._create_analysis_log_sync(video_id, level, message, metadata)
 
+    @tracer.traced("db")
     def _get_video_info_sync(self, video_id: str) -> Optional[Dict[str, Any]]:
         """Get video information (synchronous implementation)"""
         try:
@@ -171,6 +177,7 @@ class DatabaseClient:
         """Get video information (async wrapper)"""
         return await asyncio.to_thread(self._get_video_info_sync, video_id)
 
+    @tracer.traced("db")
     def _save_vision_analysis_sync(self, scene_id: str, objects: str, object_count: int, 
                                   faces: str, face_count: int, processing_time: float, 
                                   vision_version: str, text_recognitions: str = None, 
@@ -227,6 +234,7 @@ class DatabaseClient:
             human_rectangles, human_count, human_body_poses, pose_count
         )
 
+    @tracer.traced("db")
     def create_transcription(self, video_id: str, language: str, segments: list) -> str:
         """Save transcription to database"""
         try:
@@ -246,13 +254,86 @@ class DatabaseClient:
             logger.error(f"❌ Failed to save transcription for video {video_id}: {e}")
             raise
 
+    @tracer.traced("db")
+    def start_transcription(self, video_id: str, language: Optional[str] = None) -> str:
+        """Create an empty transcription (status PROCESSING) that segments are appended to while decoding"""
+        try:
+            transcription_id = str(uuid.uuid4())
+            
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        INSERT INTO transcriptions (id, "videoId", language, segments, status, "createdAt", "updatedAt")
+                        VALUES (%s, %s, %s, '[]', 'PROCESSING', NOW(), NOW())
+                    """, (transcription_id, video_id, language or "unknown"))
+                    
+                    conn.commit()
+                    logger.info(f"✅ Transcription started with ID: {transcription_id}")
+                    return transcription_id
+        except Exception as e:
+            logger.error(f"❌ Failed to start transcription for video {video_id}: {e}")
+            raise
+
+    @tracer.traced("db")
+    def append_transcription_segments(self, transcription_id: str, segments: list, language: Optional[str] = None) -> bool:
+        """Append segments to a transcription (JSON array concatenation in the database)"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        UPDATE transcriptions
+                        SET segments = (segments::jsonb || %s::jsonb)::text,
+                            language = COALESCE(%s, language),
+                            "updatedAt" = NOW()
+                        WHERE id = %s
+                    """, (json.dumps(segments), language, transcription_id))
+                    
+                    conn.commit()
+                    return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"❌ Failed to append segments to transcription {transcription_id}: {e}")
+            raise
+
+    @tracer.traced("db")
+    def complete_transcription(self, transcription_id: str, language: str) -> bool:
+        """Set the detected language and mark the transcription COMPLETED, visible to readers"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        UPDATE transcriptions
+                        SET language = %s, status = 'COMPLETED', "updatedAt" = NOW()
+                        WHERE id = %s
+                    """, (language, transcription_id))
+                    
+                    conn.commit()
+                    logger.info(f"✅ Transcription completed with ID: {transcription_id}")
+                    return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"❌ Failed to complete transcription {transcription_id}: {e}")
+            raise
+
+    @tracer.traced("db")
+    def delete_transcription(self, transcription_id: str) -> bool:
+        """Delete a transcription (e.g. an incomplete one after a failed run)"""
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("DELETE FROM transcriptions WHERE id = %s", (transcription_id,))
+                    conn.commit()
+                    return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"❌ Failed to delete transcription {transcription_id}: {e}")
+            return False
+
+    @tracer.traced("db")
     def _get_transcription_sync(self, video_id: str):
         """Get transcription for video (synchronous implementation)"""
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                     cursor.execute("""
-                        SELECT * FROM transcriptions WHERE "videoId" = %s
+                        SELECT * FROM transcriptions WHERE "videoId" = %s AND status = 'COMPLETED'
                         ORDER BY "createdAt" DESC
                         LIMIT 1
                     """, (video_id,))
@@ -269,6 +350,7 @@ class DatabaseClient:
         """Get transcription for video (async wrapper)"""
         return await asyncio.to_thread(self._get_transcription_sync, video_id)
 
+    @tracer.traced("db")
     def get_video(self, video_id: str):
         """Get video info from database"""
         try:
@@ -290,6 +372,7 @@ class DatabaseClient:
             logger.error(f"❌ Failed to get video {video_id}: {e}")
             raise
 
+    @tracer.traced("db")
     def create_audio_stem(self, video_id: str, scene_id: Optional[str], stem_type: str, 
                           file_path: str, file_size: int, duration: Optional[float] = None,
                           start_time: Optional[float] = None, end_time: Optional[float] = None,
@@ -313,6 +396,7 @@ class DatabaseClient:
         except Exception as e:
             logger.error(f"❌ Failed to save audio stem for video {video_id}: {e}")
             raise
+    @tracer.traced("db")
     async def create_saliency_analysis(self, video_id: str, scene_id: Optional[str], data_path: str, 
                                      heatmap_path: Optional[str], roi_data: str, frame_count: int, 
                                      sample_rate: int, model_version: str, processing_time: float) -> Optional[str]:
@@ -339,6 +423,7 @@ class DatabaseClient:
             logger.error(f"Failed to create saliency analysis for video {video_id}: {e}")
             return None
 
+    @tracer.traced("db")
     async def get_saliency_analysis(self, video_id: str) -> Optional[Dict[str, Any]]:
         """Get saliency analysis for a video"""
         try:
@@ -355,6 +440,7 @@ class DatabaseClient:
             logger.error(f"Failed to get saliency analysis for {video_id}: {e}")
             return None
 
+    @tracer.traced("db")
     async def get_scene_saliency(self, scene_id: str) -> Optional[Dict[str, Any]]:
         """Get saliency analysis for a scene"""
         try:
@@ -371,6 +457,7 @@ class DatabaseClient:
             logger.error(f"Failed to get saliency analysis for scene {scene_id}: {e}")
             return None
 
+    @tracer.traced("db")
     async def create_reframed_video(self, video_id: str, saliency_id: str, aspect_ratio: str, 
                                    output_path: str, file_size: int, duration: float,
                                    custom_width: Optional[int] = None, custom_height: Optional[int] = None,
@@ -398,6 +485,7 @@ class DatabaseClient:
             logger.error(f"Failed to create reframed video: {e}")
             return None
 
+    @tracer.traced("db")
     async def update_reframed_video_status(self, reframed_id: str, status: str, progress: float = 1.0) -> bool:
         """Update reframed video status"""
         try:
@@ -3,34 +3,18 @@ SAM 2.1 Wrapper mit intelligenter Fallback-Logik für Apple Silicon M4
 Verwendet Segment Anything Model 2.1 wenn verfügbar, sonst SAM 1 als Fallback
 """
 import os
+import importlib.util
 import numpy as np
 import cv2
 from typing import List, Dict, Any, Optional, Tuple
-import torch
 import json
 from pathlib import Path
 import logging
 
-# Try to import SAM 2.1 first, fallback to SAM 1
-SAM2_AVAILABLE = False
-SAM1_AVAILABLE = False
-
-try:
-    # Try SAM 2.1 (requires Python 3.10+)
-    from sam2.build_sam import build_sam2
-    from sam2.sam2_image_predictor import SAM2ImagePredictor
-    SAM2_AVAILABLE = True
-    print("✅ SAM 2.1 successfully imported")
-except ImportError as e:
-    print(f"⚠️ SAM 2.1 not available: {e}")
-    try:
-        # Fallback to SAM 1
-        from segment_anything import sam_model_registry, SamPredictor
-        SAM1_AVAILABLE = True
-        print("✅ SAM 1 successfully imported as fallback")
-    except ImportError as e2:
-        print(f"❌ Neither SAM 2.1 nor SAM 1 available: {e2}")
-        raise RuntimeError("No SAM implementation available")
+# Nur prüfen, ob SAM 2.1 / SAM 1 installiert sind; torch und die Modelle
+# werden erst beim Laden importiert (SaliencyDetector lädt lazy)
+SAM2_AVAILABLE = importlib.util.find_spec("sam2") is not None
+SAM1_AVAILABLE = importlib.util.find_spec("segment_anything") is not None
 
 # Absolute imports für lokale Tests
 try:
@@ -71,6 +55,7 @@ class SAMSaliencyModel:
     
     def _get_device(self) -> str:
         """Bestimmt das beste Device für Apple Silicon M4"""
+        import torch
         if torch.backends.mps.is_available():
             logger.info("💻 Verwende MPS für Apple Silicon M4")
             return "mps"
@@ -112,6 +97,8 @@ class SAMSaliencyModel:
             model_cfg = "sam2.1_large.yaml" if "large" in self.model_type else "sam2.1_hiera_large.yaml"
             
             # Build SAM 2.1
+            from sam2.build_sam import build_sam2
+            from sam2.sam2_image_predictor import SAM2ImagePredictor
             self.model = build_sam2(model_cfg, sam2_checkpoint, device=self.device)
             self.predictor = SAM2ImagePredictor(self.model)
             
@@ -128,6 +115,7 @@ class SAMSaliencyModel:
             logger.info(f"Loading SAM 1 model: {self.model_type}")
             
             # SAM 1 Modell laden
+            from segment_anything import sam_model_registry, SamPredictor
             sam = sam_model_registry[self.model_type](checkpoint=self.model_path)
             sam.to(device=self.device)
             
@@ -6,28 +6,39 @@ import os
 import asyncio
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-import torch
-import torchaudio
-from demucs.api import separate_track
-from demucs.pretrained import get_model
+from .audio_extractor import audio_extractor
+from .demucs_engine import demucs_engine, get_engine
 from ..utils.logger import logger, log_separation_step, log_error
 
 class DemucsService:
     """Service für Demucs-basierte Audio-Trennung"""
     
-    def __init__(self):
-        self.model = None
+    def __init__(self, window_seconds: Optional[float] = None, batch_size: Optional[int] = None,
+                 num_threads: Optional[int] = None):
+        """
+        Args:
+            window_seconds: Fensterlänge der Streaming-Separierung (Default: Engine)
+            batch_size: Fenster pro Forward-Pass (Default: Engine)
+            num_threads: Torch-Threads dieses Service, pro Inferenz gesetzt (Default: Engine)
+        """
+        self.engine = demucs_engine
         self.model_loaded = False
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.window_seconds = window_seconds
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        
+    @property
+    def device(self) -> Optional[str]:
+        return self.engine.device
         
     async def load_model(self, model_name: str = "htdemucs") -> bool:
-        """Lädt das Demucs Modell"""
+        """Lädt das Demucs Modell (geteilt mit der Szenen-Separierung, wenn gleich)"""
         try:
             log_separation_step("Loading Demucs model", "", model_name=model_name, device=self.device)
             
             # Demucs Model laden
-            self.model = get_model(model_name)
-            self.model.to(self.device)
+            self.engine = get_engine(model_name)
+            await asyncio.to_thread(self.engine.load)
             self.model_loaded = True
             
             logger.info("Demucs model loaded successfully", model_name=model_name, device=self.device)
@@ -49,28 +60,28 @@ class DemucsService:
             # Output-Verzeichnis erstellen
             os.makedirs(output_dir, exist_ok=True)
             
-            # Audio trennen
-            stems = separate_track(
-                video_path,
-                self.model,
-                device=self.device,
-                shifts=1,
-                overlap=0.25,
-                split=True
+            # Audio einmal dekodieren, ggf. auf die Modell-Samplerate bringen
+            audio = audio_extractor.load(video_path)
+            sample_rate = self.engine.sample_rate
+            samples = audio.samples if audio.sample_rate == sample_rate else audio.resampled(sample_rate)
+            
+            # Audio fensterweise trennen, Stems werden laufend geschrieben
+            outputs = {
+                stem_name: os.path.join(output_dir, f"{stem_name}.wav")
+                for stem_name in self.engine.sources
+            }
+            await asyncio.to_thread(
+                self.engine.separate_track_to_wav, samples, sample_rate, outputs,
+                window_seconds=self.window_seconds, batch_size=self.batch_size, num_threads=self.num_threads
             )
             
-            # Stems speichern
+            # Stems erfassen
             saved_stems = {}
-            for stem_name, stem_audio in stems.items():
-                output_path = os.path.join(output_dir, f"{stem_name}.wav")
-                
-                # Audio als WAV speichern
-                torchaudio.save(output_path, stem_audio, 44100)
-                
+            for stem_name, output_path in outputs.items():
                 saved_stems[stem_name] = {
                     "path": output_path,
                     "size": os.path.getsize(output_path),
-                    "duration": stem_audio.shape[1] / 44100
+                    "duration": len(samples) / sample_rate
                 }
                 
                 log_separation_step(f"Saved {stem_name} stem", video_id,
@@ -81,7 +92,7 @@ class DemucsService:
             return {
                 "success": True,
                 "stems": saved_stems,
-                "model_type": "htdemucs",
+                "model_type": self.engine.model_name,
                 "device": self.device
             }
             
@@ -0,0 +1,327 @@
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict
+from contextlib import contextmanager
+from math import gcd
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Canonical decode format; every consumer derives its view from this
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+# Input samples per block when resampling (bounded memory for long videos)
+RESAMPLE_BLOCK_SECONDS = 60
+
+# Disk limit of the cache (PCM and derived views, MB; 0 = unlimited); least recently used videos go first
+AUDIO_CACHE_MAX_MB = float(os.getenv('AUDIO_CACHE_MAX_MB', '20480'))
+
+# Drop cached audio not used for this many seconds (0 = keep until the size limit applies)
+AUDIO_CACHE_TTL = float(os.getenv('AUDIO_CACHE_TTL', str(24 * 3600)))
+
+# Decoded videos kept mapped in memory
+MAX_OPEN_DECODES = int(os.getenv('AUDIO_CACHE_MAX_OPEN', '8'))
+
+class DecodedAudio:
+    """A video's soundtrack as memory-mapped 16-bit PCM (frames x channels)"""
+
+    def __init__(self, key: str, pcm_path: Path, sample_rate: int = SAMPLE_RATE, channels: int = CHANNELS,
+                 on_write=None):
+        self.key = key
+        self.on_write = on_write  # called with the key after a derived view was written to the cache
+        self.pcm_path = pcm_path
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+        frame_count = pcm_path.stat().st_size // (2 * channels)
+        if frame_count > 0:
+            self.samples = np.memmap(pcm_path, dtype=np.int16, mode="r", shape=(frame_count, channels))
+        else:
+            self.samples = np.zeros((0, channels), dtype=np.int16)
+
+        self._views: Dict[Tuple[int, bool], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate
+
+    def slice(self, start_time: float = 0.0, end_time: Optional[float] = None) -> np.ndarray:
+        """
+        Zero-copy view of a time range
+
+        Args:
+            start_time: Start in seconds
+            end_time: End in seconds (None = end of audio)
+
+        Returns:
+            int16 array (frames, channels) backed by the cache file
+        """
+        start = min(self.frame_count, max(0, int(round(start_time * self.sample_rate))))
+        end = self.frame_count if end_time is None else int(round(end_time * self.sample_rate))
+        end = min(self.frame_count, max(start, end))
+        return self.samples[start:end]
+
+    def resampled(self, sample_rate: int, mono: bool = False) -> np.ndarray:
+        """
+        float32 view at another sample rate (e.g. 16 kHz mono for Whisper)
+
+        The result is computed once and cached next to the PCM file, so repeated
+        requests (or other processes) only map it.
+        """
+        view_key = (sample_rate, mono)
+        with self._lock:
+            if view_key in self._views:
+                return self._views[view_key]
+
+            channels = 1 if mono else self.channels
+            view_path = self.pcm_path.with_name(f"{self.key}_{sample_rate}_{'mono' if mono else 'stereo'}.f32")
+
+            if not view_path.exists():
+                tmp_path = view_path.with_name(view_path.name + ".part")
+                with open(tmp_path, "wb") as f:
+                    for block in _resample_blocks(self.samples, self.sample_rate, sample_rate, mono):
+                        f.write(block.astype(np.float32).tobytes())
+                os.replace(tmp_path, view_path)
+                if self.on_write is not None:
+                    self.on_write(self.key)
+
+            frame_count = view_path.stat().st_size // (4 * channels)
+            shape = (frame_count,) if mono else (frame_count, channels)
+            # Copy-on-write mapping: writable for consumers (torch.from_numpy), never written back
+            view = np.memmap(view_path, dtype=np.float32, mode="c", shape=shape) if frame_count else np.zeros(shape, dtype=np.float32)
+            self._views[view_key] = view
+            return view
+
+    def write_wav(self, output_path: str, start_time: float = 0.0, end_time: Optional[float] = None) -> str:
+        """Write a time range as 16-bit PCM WAV at the decode rate (no ffmpeg involved)"""
+        return write_wav(output_path, self.slice(start_time, end_time), self.sample_rate)
+
+class AudioExtractor:
+    """
+    Decodes a video's audio once into a cached PCM file
+
+    Cache entries are keyed by path, mtime and size, so edits to the source
+    invalidate them. Transcription, full-track and per-scene separation all
+    read from the same decode. Entries unused for ttl seconds are deleted, and
+    least recently used ones while the cache exceeds max_mb; at most max_open
+    decodes stay mapped in memory. Arrays already handed out stay valid in this
+    process after their files are deleted (the mapping keeps the data); code
+    that passes cache file paths on (e.g. to worker processes) holds the entry
+    with use() so pruning skips it.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_mb: float = AUDIO_CACHE_MAX_MB,
+                 ttl: float = AUDIO_CACHE_TTL, max_open: int = MAX_OPEN_DECODES):
+        storage_path = os.getenv('STORAGE_PATH', '/app/storage')
+        self.cache_dir = Path(cache_dir or os.getenv('AUDIO_CACHE_DIR', f"{storage_path}/temp/audio_cache"))
+        self.max_mb = max_mb
+        self.ttl = ttl
+        self.max_open = max_open
+        self._decoded: "OrderedDict[str, DecodedAudio]" = OrderedDict()
+        self._pins: Dict[str, int] = {}  # key -> holders inside use()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def load(self, video_path: str) -> DecodedAudio:
+        """Return the decoded audio of a video, decoding it on first use"""
+        key = self.cache_key(video_path)
+
+        pcm_path = self.cache_dir / f"{key}.pcm"
+
+        with self._lock:
+            if key in self._decoded:
+                self._decoded.move_to_end(key)
+                self._touch(pcm_path)
+                return self._decoded[key]
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        # One decode per video even with concurrent callers
+        with key_lock:
+            with self._lock:
+                if key in self._decoded:
+                    return self._decoded[key]
+
+            if pcm_path.exists():
+                logger.info(f"🎵 Using cached audio for {video_path}")
+                self._touch(pcm_path)
+            else:
+                self._decode(video_path, pcm_path)
+
+            decoded = DecodedAudio(key, pcm_path, on_write=self.prune)
+            with self._lock:
+                self._decoded[key] = decoded
+                while len(self._decoded) > max(1, self.max_open):
+                    self._decoded.popitem(last=False)
+            self.prune(keep=key)
+            return decoded
+
+    @contextmanager
+    def use(self, video_path: str) -> Iterator[DecodedAudio]:
+        """load() and keep the entry's files on disk until the block exits"""
+        key = self.cache_key(video_path)
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+        try:
+            yield self.load(video_path)
+        finally:
+            with self._lock:
+                self._pins[key] -= 1
+                if self._pins[key] <= 0:
+                    del self._pins[key]
+
+    def cache_key(self, video_path: str) -> str:
+        stat = os.stat(video_path)
+        identity = f"{os.path.abspath(video_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+        return hashlib.sha1(identity.encode()).hexdigest()[:20]
+
+    def evict(self, video_path: str):
+        """Drop a video's cached audio (memory and disk)"""
+        key = self.cache_key(video_path)
+        with self._lock:
+            self._decoded.pop(key, None)
+        for path in self.cache_dir.glob(f"{key}*"):
+            path.unlink(missing_ok=True)
+
+    def prune(self, keep: Optional[str] = None) -> int:
+        """
+        Apply ttl and size limit to the disk cache
+
+        Args:
+            keep: Key that is never deleted (the entry just loaded); entries
+                  held via use() are skipped as well
+
+        Returns:
+            Number of deleted cache entries (videos)
+        """
+        if not self.cache_dir.exists():
+            return 0
+
+        # Cache files grouped per video; the PCM file's mtime is its last use
+        entries: Dict[str, Dict] = {}
+        for path in self.cache_dir.iterdir():
+            if path.name.endswith(".part"):
+                continue
+            key = path.name.split(".", 1)[0].split("_", 1)[0]
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entry = entries.setdefault(key, {"size": 0, "used": 0.0})
+            entry["size"] += stat.st_size
+            entry["used"] = max(entry["used"], stat.st_mtime)
+
+        now = time.time()
+        total_mb = sum(entry["size"] for entry in entries.values()) / 1024 ** 2
+        with self._lock:
+            pinned = set(self._pins)
+        removed = []
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["used"]):
+            if key == keep or key in pinned:
+                continue
+            expired = self.ttl > 0 and now - entry["used"] > self.ttl
+            over_limit = self.max_mb > 0 and total_mb > self.max_mb
+            if not expired and not over_limit:
+                continue
+            with self._lock:
+                self._decoded.pop(key, None)
+            for path in self.cache_dir.glob(f"{key}*"):
+                path.unlink(missing_ok=True)
+            total_mb -= entry["size"] / 1024 ** 2
+            removed.append(key)
+
+        if removed:
+            logger.info(f"🧹 Removed {len(removed)} entries from the audio cache ({total_mb:.0f} MB left)")
+        return len(removed)
+
+    def _touch(self, pcm_path: Path):
+        try:
+            os.utime(pcm_path)
+        except OSError:
+            pass
+
+    def _decode(self, video_path: str, pcm_path: Path):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = pcm_path.with_name(pcm_path.name + ".part")
+
+        cmd = [
+            "ffmpeg", "-nostdin", "-i", video_path,
+            "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+            "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS),
+            str(tmp_path), "-y"
+        ]
+
+        logger.info(f"🎵 Decoding audio once: {video_path}")
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            logger.error(f"❌ FFmpeg audio decode failed: {e.stderr}")
+            tmp_path.unlink(missing_ok=True)
+            raise Exception(f"Audio extraction failed: {e.stderr}")
+
+        os.replace(tmp_path, pcm_path)
+        logger.info(f"✅ Audio decoded to cache: {pcm_path}")
+
+def write_wav(output_path: str, samples: np.ndarray, sample_rate: int) -> str:
+    """Write int16 (frames[, channels]) or float [-1, 1] samples as 16-bit PCM WAV"""
+    if samples.dtype != np.int16:
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+
+    with wave.open(str(output_path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.ascontiguousarray(samples).tobytes())
+    return str(output_path)
+
+def _resample_blocks(samples: np.ndarray, source_rate: int, target_rate: int, mono: bool):
+    """
+    Polyphase resampling in blocks with overlapping context
+
+    Blocks start on multiples of the decimation factor, so trimming the
+    context yields the same samples as resampling the whole signal at once.
+    """
+    from scipy.signal import resample_poly
+
+    divisor = gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+
+    # Context must cover the anti-aliasing filter (10 * max(up, down) taps per side on the upsampled grid)
+    filter_inputs = 10 * max(up, down) // up + 2
+    block = max(1, (RESAMPLE_BLOCK_SECONDS * source_rate) // down) * down
+    context = -(-filter_inputs // down) * down
+    total = len(samples)
+
+    for start in range(0, total, block):
+        end = min(total, start + block)
+        left = max(0, start - context)
+        right = min(total, end + context)
+
+        chunk = samples[left:right].astype(np.float32) / 32768.0
+        if mono and chunk.ndim == 2:
+            chunk = chunk.mean(axis=1)
+
+        if up == down:
+            out = chunk
+        else:
+            out = resample_poly(chunk, up, down, axis=0)
+
+        skip = (start - left) * up // down
+        keep = -(-(end - start) * up // down)
+        yield out[skip:skip + keep]
+
+audio_extractor = AudioExtractor()
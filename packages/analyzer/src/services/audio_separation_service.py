@@ -4,6 +4,8 @@ import logging
 from pathlib import Path
 import time
 
+from .audio_extractor import audio_extractor, write_wav
+
 logger = logging.getLogger(__name__)
 
 class AudioSeparationService:
@@ -13,40 +15,27 @@ class AudioSeparationService:
         
     def separate_audio(self, video_path: str, output_dir: str, video_id: str):
         """
-        Separate audio into vocals and music using FFmpeg-based approach
+        Separate audio into vocals and music (mid/side of the stereo track)
         Returns: dict with file paths
         """
         try:
-            logger.info(f"🎵 Starting FFmpeg-based audio separation for {video_id}")
+            logger.info(f"🎵 Starting mid/side audio separation for {video_id}")
             
             # Ensure output directory exists
             os.makedirs(output_dir, exist_ok=True)
             
-            # Extract audio from video
-            audio_path = Path(output_dir) / f"{video_id}_audio.wav"
-            subprocess.run([
-                "ffmpeg", "-y", "-i", video_path,
-                "-ac", "2", "-ar", "44100", str(audio_path)
-            ], check=True)
+            # Stereo PCM from the shared audio decode
+            audio = audio_extractor.load(video_path)
+            left = audio.samples[:, 0] >> 1
+            right = audio.samples[:, 1] >> 1
             
             # Create vocals track (center channel extraction)
             vocals_path = Path(output_dir) / f"{video_id}_vocals.wav"
-            subprocess.run([
-                "ffmpeg", "-y", "-i", str(audio_path),
-                "-af", "pan=mono|c0=0.5*c0+0.5*c1",
-                str(vocals_path)
-            ], check=True)
+            write_wav(str(vocals_path), left + right, audio.sample_rate)
             
             # Create music track (side channel extraction)
             music_path = Path(output_dir) / f"{video_id}_music.wav"
-            subprocess.run([
-                "ffmpeg", "-y", "-i", str(audio_path),
-                "-af", "pan=mono|c0=0.5*c0-0.5*c1",
-                str(music_path)
-            ], check=True)
-            
-            # Clean up intermediate audio file
-            os.remove(audio_path)
+            write_wav(str(music_path), left - right, audio.sample_rate)
             
             output_paths = {
                 "vocals": str(vocals_path),
@@ -55,7 +44,7 @@ class AudioSeparationService:
             
             logger.info(f"✅ Created vocals stem: {vocals_path}")
             logger.info(f"✅ Created music stem: {music_path}")
-            logger.info(f"🎵 FFmpeg-based audio separation completed for {video_id}")
+            logger.info(f"🎵 Mid/side audio separation completed for {video_id}")
             
             return output_paths
             
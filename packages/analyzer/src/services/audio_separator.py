@@ -1,9 +1,11 @@
 import os
-import subprocess
 import logging
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from .audio_extractor import audio_extractor
+from .demucs_engine import demucs_engine
+
 logger = logging.getLogger(__name__)
 
 class AudioSeparatorService:
@@ -57,22 +59,19 @@ class AudioSeparatorService:
         results = {}
         
         try:
-            # Extrahiere Audio-Segment zuerst
-            audio_segment_path = self._extract_audio_segment(
-                video_path, start_time, end_time, output_dir
-            )
-            
             # Generiere verschiedene Stems
-            for stem_type in stem_types:
-                if stem_type == 'original':
-                    # Original-Audio Segment
-                    results[stem_type] = audio_segment_path
-                else:
-                    # Separierte Stems mit Demucs
-                    stem_path = self._separate_stem(
-                        audio_segment_path, stem_type, output_dir, video_id, scene_id
-                    )
-                    results[stem_type] = stem_path
+            if 'original' in stem_types:
+                # Original-Audio Segment
+                results['original'] = self._extract_audio_segment(
+                    video_path, start_time, end_time, output_dir
+                )
+            
+            # Separierte Stems mit Demucs (alle aus einem Forward-Pass)
+            separated_stems = [stem_type for stem_type in stem_types if stem_type != 'original']
+            if separated_stems:
+                results.update(self._separate_stems(
+                    video_path, start_time, end_time, separated_stems, output_dir, video_id, scene_id
+                ))
                     
             logger.info(f"Audio separation completed. Generated {len(results)} stems")
             return results
@@ -88,85 +87,44 @@ class AudioSeparatorService:
         end_time: float, 
         output_dir: Path
     ) -> str:
-        """Extrahiert Audio-Segment mit FFmpeg"""
+        """Schreibt Audio-Segment aus dem einmal dekodierten Audio des Videos"""
         
-        duration = end_time - start_time
         audio_segment_path = output_dir / f"segment_{start_time:.3f}_{end_time:.3f}.wav"
         
-        cmd = [
-            "ffmpeg", "-i", video_path,
-            "-ss", str(start_time),
-            "-t", str(duration),
-            "-vn", "-acodec", "pcm_s16le",
-            "-ar", "44100", "-ac", "2",
-            str(audio_segment_path), "-y"
-        ]
-        
-        logger.info(f"Extracting audio segment: {' '.join(cmd)}")
-        
-        try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            logger.info("Audio segment extraction successful")
-            return str(audio_segment_path)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg error: {e.stderr}")
-            raise
+        audio_extractor.load(video_path).write_wav(str(audio_segment_path), start_time, end_time)
+        logger.info(f"Audio segment extracted: {audio_segment_path}")
+        return str(audio_segment_path)
             
-    def _separate_stem(
+    def _separate_stems(
         self, 
-        audio_path: str, 
-        stem_type: str, 
+        video_path: str, 
+        start_time: float, 
+        end_time: float, 
+        stem_types: List[str], 
         output_dir: Path,
         video_id: str,
         scene_id: Optional[str]
-    ) -> str:
-        """Separiert spezifischen Stem mit Demucs"""
+    ) -> Dict[str, str]:
+        """Separiert Stems mit dem residenten Demucs-Modell (ein Forward-Pass für alle Stems)"""
         
-        # Output-Pfad für diesen Stem
-        if scene_id:
-            stem_filename = f"{video_id}_{scene_id}_{stem_type}.wav"
-        else:
-            stem_filename = f"{video_id}_full_{stem_type}.wav"
-            
-        stem_path = output_dir / stem_filename
+        outputs = {}
+        for stem_type in stem_types:
+            # Output-Pfad für diesen Stem
+            if scene_id:
+                stem_filename = f"{video_id}_{scene_id}_{stem_type}.wav"
+            else:
+                stem_filename = f"{video_id}_full_{stem_type}.wav"
+            outputs[stem_type] = str(output_dir / stem_filename)
         
-        # Demucs Command
-        cmd = [
-            "python", "-m", "demucs.separate",
-            "--out", str(output_dir),
-            "--two-stems", stem_type,
-            audio_path
-        ]
+        audio = audio_extractor.load(video_path)
+        segment = audio.slice(start_time, end_time)
         
-        logger.info(f"Separating {stem_type} stem: {' '.join(cmd)}")
+        logger.info(f"Separating stems {stem_types} for {start_time:.3f}-{end_time:.3f}s")
         
-        try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            
-            # Demucs erstellt Unterverzeichnisse, finde die generierte Datei
-            demucs_output_dir = output_dir / "separated" / Path(audio_path).stem
-            if demucs_output_dir.exists():
-                # Suche nach der generierten Stem-Datei
-                for file in demucs_output_dir.glob(f"*{stem_type}.wav"):
-                    # Kopiere zur finalen Position
-                    subprocess.run([
-                        "cp", str(file), str(stem_path)
-                    ], check=True)
-                    break
-                else:
-                    raise FileNotFoundError(f"No {stem_type} stem found in {demucs_output_dir}")
-            else:
-                raise FileNotFoundError(f"Demucs output directory not found: {demucs_output_dir}")
-                
-            logger.info(f"Stem separation successful: {stem_path}")
-            return str(stem_path)
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Demucs error: {e.stderr}")
-            raise
-        except FileNotFoundError as e:
-            logger.error(f"Stem file not found: {e}")
-            raise
+        stem_paths = demucs_engine.separate_to_files(segment, audio.sample_rate, outputs)
+        
+        logger.info(f"Stem separation successful: {list(stem_paths.values())}")
+        return stem_paths
             
     def get_available_stems(self, video_id: str, scene_id: Optional[str] = None) -> Dict[str, str]:
         """Gibt verfügbare Stems für eine Scene zurück"""
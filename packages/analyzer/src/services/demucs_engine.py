@@ -0,0 +1,390 @@
+import logging
+import os
+import threading
+import wave
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .audio_extractor import write_wav
+from ..utils.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Stem names that mean "everything except vocals"
+ACCOMPANIMENT_STEMS = {"music", "no_vocals", "accompaniment", "instrumental"}
+
+# Streaming separation: window length, crossfade between windows, windows per forward pass
+WINDOW_SECONDS = float(os.getenv('DEMUCS_WINDOW_SECONDS', '10'))
+WINDOW_OVERLAP_SECONDS = float(os.getenv('DEMUCS_WINDOW_OVERLAP_SECONDS', '1'))
+BATCH_SIZE = int(os.getenv('DEMUCS_BATCH_SIZE', '4'))
+
+# Torch intra-op threads during inference (0 = torch default)
+NUM_THREADS = int(os.getenv('DEMUCS_THREADS', '0'))
+
+# Model of the shared engine
+DEFAULT_MODEL = os.getenv('DEMUCS_MODEL', 'htdemucs')
+
+# Approximate resident memory per model (MB) until the first load has been measured
+MODEL_SIZE_MB = {"htdemucs": 400, "htdemucs_6s": 450, "htdemucs_ft": 1500, "mdx_extra": 1100}
+
+class SeparationCancelled(Exception):
+    """Raised when a streaming separation is interrupted via its cancel event"""
+
+class DemucsEngine:
+    """
+    In-process Demucs separation with a resident model
+
+    The model is loaded through the model registry on first use and kept in
+    memory (subject to the registry's idle TTL and memory budget). A single
+    forward pass yields all sources, so every requested stem of a segment
+    comes from the same inference. Use get_engine() for a shared engine per
+    model; a second instance for the same model would replace the registry entry.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, device: Optional[str] = None,
+                 shifts: int = 1, overlap: float = 0.25,
+                 window_seconds: float = WINDOW_SECONDS,
+                 window_overlap_seconds: float = WINDOW_OVERLAP_SECONDS,
+                 batch_size: int = BATCH_SIZE, num_threads: int = NUM_THREADS):
+        self.model_name = model_name or DEFAULT_MODEL
+        self.device = device
+        self.shifts = shifts
+        self.overlap = overlap
+        self.window_seconds = window_seconds
+        self.window_overlap_seconds = window_overlap_seconds
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self._inference_lock = threading.Lock()
+        model_registry.register(self.model_key, self._load, size_mb=MODEL_SIZE_MB.get(self.model_name))
+
+    @property
+    def model_key(self) -> str:
+        return f"demucs:{self.model_name}"
+
+    def load(self):
+        """The Demucs model, loaded on first use"""
+        return model_registry.get(self.model_key, self._load)
+
+    def _load(self):
+        import torch
+        from demucs.pretrained import get_model
+
+        if self.device is None:
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+        model = get_model(self.model_name)
+        model.to(self.device)
+        model.eval()
+        logger.info(f"✅ Demucs model loaded: {self.model_name} on {self.device}")
+        return model
+
+    @property
+    def sample_rate(self) -> int:
+        return self.load().samplerate
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self.load().sources)
+
+    def separate(self, samples: np.ndarray, sample_rate: int, stems: List[str],
+                 num_threads: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Separate audio into the requested stems with one forward pass
+
+        Args:
+            samples: int16 or float PCM, shape (frames, channels) or (frames,)
+            sample_rate: Sample rate of samples
+            stems: Model sources (e.g. "vocals", "drums") or "music"/"no_vocals"
+                   for the sum of all non-vocal sources
+            num_threads: Torch threads for this inference (None = engine default)
+
+        Returns:
+            Dict stem -> float32 array (frames, channels) at the model sample rate
+        """
+        import torch
+        from demucs.audio import convert_audio
+
+        with model_registry.use(self.model_key, self._load) as model:
+            self._check_stems(stems)
+
+            wav = _to_float(samples)
+            mix = torch.from_numpy(np.ascontiguousarray(wav.T))
+            mix = convert_audio(mix, sample_rate, model.samplerate, model.audio_channels)
+
+            # Normalisation as in demucs.separate
+            ref = mix.mean(0)
+            mean, std = float(ref.mean()), float(ref.std()) + 1e-8
+
+            estimates = self._infer(mix[None], mean, std, stems, num_threads=num_threads)
+            return {stem: wav[0] for stem, wav in estimates.items()}
+
+    def iter_separated(self, samples: np.ndarray, sample_rate: int, stems: List[str],
+                       window_seconds: Optional[float] = None,
+                       overlap_seconds: Optional[float] = None,
+                       batch_size: Optional[int] = None,
+                       cancel_event: Optional[threading.Event] = None,
+                       on_progress=None,
+                       num_threads: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """
+        Stream a separation window by window
+
+        Fixed-length windows overlap by overlap_seconds and are crossfaded
+        linearly (overlap-add); batch_size windows share one forward pass.
+        Peak memory depends on window length and batch size only, not on the
+        length of samples.
+
+        Args:
+            samples: int16 or float PCM (frames, channels) at the model sample rate,
+                     e.g. a memory-mapped DecodedAudio.samples
+            stems: Requested stems (see separate)
+            window_seconds / overlap_seconds / batch_size / num_threads: Override the engine defaults
+            cancel_event: Checked before each batch; raises SeparationCancelled when set
+            on_progress: Optional callback(processed_frames, total_frames)
+
+        Yields:
+            (start_frame, Dict stem -> float32 (frames, channels)) for consecutive,
+            finished blocks of the track
+        """
+        # Pinned for the whole stream, so neither TTL nor memory budget evicts it mid-track
+        with model_registry.use(self.model_key, self._load) as model:
+            self._check_stems(stems)
+            if sample_rate != model.samplerate:
+                raise ValueError(f"Streaming separation needs {model.samplerate} Hz input, got {sample_rate} Hz")
+
+            total = len(samples)
+            if total == 0:
+                return
+
+            channels = model.audio_channels
+            window = max(1, int((window_seconds or self.window_seconds) * sample_rate))
+            overlap_seconds = self.window_overlap_seconds if overlap_seconds is None else overlap_seconds
+            overlap = min(window - 1, max(0, int(overlap_seconds * sample_rate)))
+            hop = window - overlap
+            batch_size = max(1, batch_size or self.batch_size)
+
+            starts = [0]
+            while starts[-1] + window < total:
+                starts.append(starts[-1] + hop)
+
+            # Normalisation over the whole track, as in demucs.separate
+            mean, std = _mono_stats(samples)
+
+            fade_in = np.linspace(0.0, 1.0, overlap + 2, dtype=np.float32)[1:-1]
+            fade_out = fade_in[::-1, None]
+            carry: Dict[str, np.ndarray] = {}
+
+            for first in range(0, len(starts), batch_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise SeparationCancelled(f"Separation cancelled at {starts[first] / sample_rate:.1f}s")
+
+                batch_starts = starts[first:first + batch_size]
+                batch = np.zeros((len(batch_starts), channels, window), dtype=np.float32)
+                for i, start in enumerate(batch_starts):
+                    chunk = _to_float(samples[start:start + window])
+                    if chunk.shape[1] != channels:
+                        chunk = np.repeat(chunk.mean(axis=1, keepdims=True), channels, axis=1)
+                    batch[i, :, :len(chunk)] = chunk.T
+
+                estimates = self._infer(batch, mean, std, stems, num_threads=num_threads)
+
+                for i, start in enumerate(batch_starts):
+                    is_last = start + window >= total
+                    block = {}
+                    for stem in stems:
+                        estimate = estimates[stem][i, :total - start]
+
+                        # Crossfade with the tail of the previous window
+                        if stem in carry:
+                            tail = carry.pop(stem)
+                            estimate[:len(tail)] *= fade_in[:len(tail), None]
+                            estimate[:len(tail)] += tail
+
+                        if is_last:
+                            block[stem] = estimate
+                        else:
+                            block[stem] = estimate[:hop]
+                            carry[stem] = estimate[hop:] * fade_out
+
+                    yield start, block
+
+                    if on_progress is not None:
+                        on_progress(total if is_last else start + hop, total)
+
+    def separate_track(self, samples: np.ndarray, sample_rate: int, outputs: Dict[str, str],
+                       cancel_event: Optional[threading.Event] = None,
+                       on_progress=None, **stream_options) -> Dict[str, np.ndarray]:
+        """
+        Separate a whole soundtrack into raw stem files
+
+        Stems are written as raw int16 PCM (frames x channels) while streaming
+        and returned memory-mapped, ready to be sliced per scene.
+
+        Args:
+            outputs: Dict stem -> raw output path
+            stream_options: window_seconds, overlap_seconds, batch_size, num_threads (see iter_separated)
+
+        Returns:
+            Dict stem -> read-only int16 memmap (frames, channels)
+        """
+        total = len(samples)
+        channels = self.load().audio_channels
+
+        sinks = {
+            stem: np.memmap(path, dtype=np.int16, mode="w+", shape=(max(total, 1), channels))
+            for stem, path in outputs.items()
+        }
+        try:
+            for start, block in self.iter_separated(samples, sample_rate, list(outputs), cancel_event=cancel_event,
+                                                    on_progress=on_progress, **stream_options):
+                for stem, wav in block.items():
+                    sinks[stem][start:start + len(wav)] = _to_int16(wav)
+
+            for sink in sinks.values():
+                sink.flush()
+        finally:
+            sinks.clear()
+
+        return {
+            stem: np.memmap(path, dtype=np.int16, mode="r", shape=(max(total, 1), channels))[:total]
+            for stem, path in outputs.items()
+        }
+
+    def separate_track_to_wav(self, samples: np.ndarray, sample_rate: int, outputs: Dict[str, str],
+                              cancel_event: Optional[threading.Event] = None,
+                              on_progress=None, **stream_options) -> Dict[str, str]:
+        """
+        Separate a whole soundtrack and append each finished block to WAV files
+
+        Args:
+            outputs: Dict stem -> WAV output path
+            stream_options: window_seconds, overlap_seconds, batch_size, num_threads (see iter_separated)
+
+        Returns:
+            Dict stem -> written path
+        """
+        channels = self.load().audio_channels
+        writers = {}
+        try:
+            for stem, path in outputs.items():
+                writer = wave.open(str(path), "wb")
+                writer.setnchannels(channels)
+                writer.setsampwidth(2)
+                writer.setframerate(sample_rate)
+                writers[stem] = writer
+
+            for _, block in self.iter_separated(samples, sample_rate, list(outputs), cancel_event=cancel_event,
+                                                on_progress=on_progress, **stream_options):
+                for stem, wav in block.items():
+                    writers[stem].writeframes(_to_int16(wav).tobytes())
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        return {stem: str(path) for stem, path in outputs.items()}
+
+    def _check_stems(self, stems: List[str]):
+        sources = self.sources
+        unknown = [s for s in stems if s not in sources and s not in ACCOMPANIMENT_STEMS]
+        if unknown:
+            raise ValueError(f"Unknown stems {unknown}, model provides {sources}")
+
+    def _infer(self, mix, mean: float, std: float, stems: List[str],
+               num_threads: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Run the model on a (batch, channels, frames) tensor or array; stems come back as (batch, frames, channels)"""
+        import torch
+        from demucs.apply import apply_model
+
+        mix = (torch.as_tensor(mix) - mean) / std
+        threads = self.num_threads if num_threads is None else num_threads
+
+        with model_registry.use(self.model_key, self._load) as model, self._inference_lock, \
+                _torch_threads(threads), torch.no_grad():
+            estimates = apply_model(
+                model, mix, device=self.device, shifts=self.shifts,
+                split=True, overlap=self.overlap, progress=False
+            )
+        estimates = estimates * std + mean
+
+        by_source = {name: estimates[:, i] for i, name in enumerate(model.sources)}
+        results = {}
+        for stem in stems:
+            if stem in by_source:
+                tensor = by_source[stem]
+            else:
+                tensor = sum(t for name, t in by_source.items() if name != "vocals")
+            results[stem] = tensor.cpu().numpy().transpose(0, 2, 1).astype(np.float32)
+
+        return results
+
+    def separate_to_files(self, samples: np.ndarray, sample_rate: int,
+                          outputs: Dict[str, str]) -> Dict[str, str]:
+        """
+        Separate and write each stem directly as WAV
+
+        Args:
+            outputs: Dict stem -> output path
+
+        Returns:
+            Dict stem -> written path
+        """
+        stems = self.separate(samples, sample_rate, list(outputs))
+        model_rate = self.sample_rate
+        return {stem: write_wav(outputs[stem], audio, model_rate) for stem, audio in stems.items()}
+
+@contextmanager
+def _torch_threads(num_threads: int):
+    """Torch intra-op threads for the block (0 = leave as is), restored afterwards"""
+    if num_threads <= 0:
+        yield
+        return
+    import torch
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+def _to_float(samples: np.ndarray) -> np.ndarray:
+    """PCM (frames[, channels]) as float32 in [-1, 1], always 2-D"""
+    wav = np.asarray(samples)
+    if wav.dtype == np.int16:
+        wav = wav.astype(np.float32) / 32768.0
+    else:
+        wav = wav.astype(np.float32, copy=False)
+    if wav.ndim == 1:
+        wav = wav[:, None]
+    return wav
+
+def _to_int16(wav: np.ndarray) -> np.ndarray:
+    return (np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16)
+
+def _mono_stats(samples: np.ndarray, block: int = 1 << 20):
+    """Mean and std of the mono mix, computed blockwise over a (memory-mapped) track"""
+    count, total, total_sq = 0, 0.0, 0.0
+    for start in range(0, len(samples), block):
+        mono = _to_float(samples[start:start + block]).mean(axis=1, dtype=np.float64)
+        count += len(mono)
+        total += float(mono.sum())
+        total_sq += float(np.square(mono).sum())
+    if count == 0:
+        return 0.0, 1.0
+    mean = total / count
+    std = max(total_sq / count - mean * mean, 0.0) ** 0.5
+    return mean, std + 1e-8
+
+_engines: Dict[str, DemucsEngine] = {}
+_engines_lock = threading.Lock()
+
+def get_engine(model_name: Optional[str] = None) -> DemucsEngine:
+    """Shared engine per model, so every caller of a model uses the same registry entry"""
+    name = model_name or DEFAULT_MODEL
+    with _engines_lock:
+        if name not in _engines:
+            _engines[name] = DemucsEngine(model_name=name)
+        return _engines[name]
+
+demucs_engine = get_engine()
@@ -3,6 +3,7 @@ Heatmap Generator für Debug-Visualisierung
 Erstellt Heatmap-Videos und Vergleichsvideos für Saliency Detection
 """
 import os
+import re
 import cv2
 import numpy as np
 import json
@@ -12,6 +13,9 @@ from pathlib import Path
 import tempfile
 from tqdm import tqdm
 
+from .heatmap_renderer import HeatmapRenderer, SaliencyMapStore, VideoSink, load_saliency_maps, render_to_sinks
+from .media_info import media_info
+
 # Absolute imports für lokale Tests
 try:
     from ..utils.logger import logger, log_performance
@@ -22,6 +26,27 @@ except ImportError:
     def log_performance(*args, **kwargs):
         pass
 
+# Standard-ROI-Previews und ihre Seitenverhältnisse (weitere als "roi_<w>x<h>")
+ROI_PREVIEW_ASPECT_RATIOS = {
+    "roi_16x9": (16, 9),
+    "roi_9x16": (9, 16),
+    "roi_4x3": (4, 3),
+    "roi_1x1": (1, 1)
+}
+
+# Standard-Visualisierungen eines Durchlaufs
+VISUALIZATION_OUTPUTS = ["heatmap", "comparison"] + list(ROI_PREVIEW_ASPECT_RATIOS)
+
+def roi_preview_aspect_ratio(name: str) -> Optional[Tuple[int, int]]:
+    """Seitenverhältnis einer ROI-Preview-Ausgabe "roi_<w>x<h>" (beliebige positive Werte), sonst None"""
+    match = re.fullmatch(r"roi_(\d+)x(\d+)", name)
+    if not match or int(match.group(1)) == 0 or int(match.group(2)) == 0:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+def is_visualization_output(name: str) -> bool:
+    return name in ("heatmap", "comparison") or roi_preview_aspect_ratio(name) is not None
+
 class HeatmapGenerator:
     """Generiert Heatmap-Videos für Debugging und Visualisierung"""
     
@@ -52,7 +77,9 @@ class HeatmapGenerator:
                             colormap: str = "jet",
                             opacity: float = 0.5,
                             show_roi: bool = True,
-                            show_info: bool = True) -> str:
+                            show_info: bool = True,
+                            progress=None,
+                            saliency_maps: Optional[SaliencyMapStore] = None) -> str:
         """
         Erstellt Heatmap-Overlay Video
         
@@ -64,66 +91,22 @@ class HeatmapGenerator:
             opacity: Transparenz der Heatmap (0.0-1.0)
             show_roi: Ob ROI-Boxen angezeigt werden sollen
             show_info: Ob Frame-Info angezeigt werden soll
+            progress: Optionaler ProgressReporter, wird pro dekodiertem Frame aktualisiert
+            saliency_maps: Kompakte Saliency Maps (Default: aus saliency_data erzeugt)
             
         Returns:
             Pfad zum erstellten Heatmap-Video
         """
-        start_time = time.time()
-        
         try:
             logger.info(f"Creating heatmap video: {output_path}")
             
-            # Video öffnen
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video: {video_path}")
-            
-            # Video-Eigenschaften
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # Video Writer erstellen
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            
-            # Colormap
-            cmap = self.colormaps.get(colormap, cv2.COLORMAP_JET)
-            
-            # Frame-Daten indexieren für schnellen Zugriff
-            frames_data = {frame["frame_number"]: frame for frame in saliency_data["frames"]}
-            
-            logger.info(f"Processing {total_frames} frames for heatmap video")
-            
-            frame_number = 0
-            with tqdm(total=total_frames, desc="Creating heatmap video") as pbar:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    # Heatmap für dieses Frame erstellen
-                    heatmap_frame = self._create_heatmap_frame(
-                        frame, frame_number, frames_data, cmap, opacity, show_roi, show_info
-                    )
-                    
-                    out.write(heatmap_frame)
-                    frame_number += 1
-                    pbar.update(1)
-            
-            cap.release()
-            out.release()
-            
-            processing_time = time.time() - start_time
+            self.render_visualizations(
+                video_path, saliency_data, {"heatmap": output_path},
+                colormap=colormap, opacity=opacity, show_roi=show_roi, show_info=show_info,
+                saliency_maps=saliency_maps, progress=progress
+            )
             
             logger.info(f"Heatmap video created: {output_path}")
-            log_performance("heatmap_generation", "create_heatmap_video", processing_time, {
-                "total_frames": total_frames,
-                "colormap": colormap,
-                "opacity": opacity
-            })
-            
             return output_path
             
         except Exception as e:
@@ -147,65 +130,14 @@ class HeatmapGenerator:
         Returns:
             Pfad zum erstellten Vergleichsvideo
         """
-        start_time = time.time()
-        
         try:
             logger.info(f"Creating comparison video: {output_path}")
             
-            # Video öffnen
-            cap = cv2.VideoCapture(original_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video: {original_path}")
-            
-            # Video-Eigenschaften
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # Neue Dimensionen für Side-by-Side (3 Spalten)
-            new_width = width * 3
-            new_height = height
-            
-            # Video Writer erstellen
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (new_width, new_height))
-            
-            # Colormap
-            cmap = self.colormaps.get(colormap, cv2.COLORMAP_JET)
-            
-            # Frame-Daten indexieren
-            frames_data = {frame["frame_number"]: frame for frame in saliency_data["frames"]}
-            
-            logger.info(f"Processing {total_frames} frames for comparison video")
-            
-            frame_number = 0
-            with tqdm(total=total_frames, desc="Creating comparison video") as pbar:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    # Vergleichs-Frame erstellen
-                    comparison_frame = self._create_comparison_frame(
-                        frame, frame_number, frames_data, cmap, width, height
-                    )
-                    
-                    out.write(comparison_frame)
-                    frame_number += 1
-                    pbar.update(1)
-            
-            cap.release()
-            out.release()
-            
-            processing_time = time.time() - start_time
+            self.render_visualizations(
+                original_path, saliency_data, {"comparison": output_path}, colormap=colormap
+            )
             
             logger.info(f"Comparison video created: {output_path}")
-            log_performance("comparison_generation", "create_comparison_video", processing_time, {
-                "total_frames": total_frames,
-                "colormap": colormap
-            })
-            
             return output_path
             
         except Exception as e:
@@ -231,140 +163,208 @@ class HeatmapGenerator:
         Returns:
             Pfad zum erstellten ROI-Preview-Video
         """
-        start_time = time.time()
-        
         try:
             logger.info(f"Creating ROI preview video: {output_path}")
             
-            # Video öffnen
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video: {video_path}")
-            
-            # Video-Eigenschaften
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            
-            # ROI-Dimensionen berechnen
-            roi_width = min(width, int(width * 0.8))
-            roi_height = int(roi_width * aspect_ratio[1] / aspect_ratio[0])
-            
-            if roi_height > height:
-                roi_height = min(height, int(height * 0.8))
-                roi_width = int(roi_height * aspect_ratio[0] / aspect_ratio[1])
-            
-            # Video Writer erstellen
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (roi_width, roi_height))
-            
-            # Frame-Daten indexieren
-            frames_data = {frame["frame_number"]: frame for frame in saliency_data["frames"]}
-            
-            logger.info(f"Processing {total_frames} frames for ROI preview video")
-            
-            frame_number = 0
-            current_roi = None
-            
-            with tqdm(total=total_frames, desc="Creating ROI preview video") as pbar:
-                while True:
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    # ROI für dieses Frame bestimmen
-                    if frame_number in frames_data:
-                        frame_data = frames_data[frame_number]
-                        if frame_data.get("roi_suggestions") and len(frame_data["roi_suggestions"]) > roi_index:
-                            current_roi = frame_data["roi_suggestions"][roi_index]
-                    
-                    # ROI-Crop erstellen
-                    if current_roi:
-                        roi_frame = self._create_roi_crop(frame, current_roi, roi_width, roi_height)
-                    else:
-                        # Fallback: Zentrale Crop
-                        roi_frame = self._create_center_crop(frame, roi_width, roi_height)
-                    
-                    out.write(roi_frame)
-                    frame_number += 1
-                    pbar.update(1)
-            
-            cap.release()
-            out.release()
-            
-            processing_time = time.time() - start_time
+            output_name = f"roi_{aspect_ratio[0]}x{aspect_ratio[1]}"
+            self.render_visualizations(
+                video_path, saliency_data, {output_name: output_path}, roi_index=roi_index
+            )
             
             logger.info(f"ROI preview video created: {output_path}")
-            log_performance("roi_preview_generation", "create_roi_preview_video", processing_time, {
-                "total_frames": total_frames,
-                "roi_index": roi_index,
-                "aspect_ratio": aspect_ratio
-            })
-            
             return output_path
             
         except Exception as e:
             logger.error(f"Error creating ROI preview video: {e}")
             raise
     
-    def _create_heatmap_frame(self, frame: np.ndarray, frame_number: int, 
-                            frames_data: Dict[int, Dict], cmap: int, opacity: float,
-                            show_roi: bool, show_info: bool) -> np.ndarray:
-        """Erstellt Heatmap-Frame mit Overlay"""
-        height, width = frame.shape[:2]
+    def render_visualizations(self,
+                              video_path: str,
+                              saliency_data: Dict[str, Any],
+                              outputs: Dict[str, str],
+                              colormap: str = "jet",
+                              opacity: float = 0.5,
+                              show_roi: bool = True,
+                              show_info: bool = True,
+                              roi_index: int = 0,
+                              saliency_maps: Optional[SaliencyMapStore] = None,
+                              progress=None) -> Dict[str, str]:
+        """
+        Rendert mehrere Visualisierungen aus einem einzigen Decode-Durchlauf
         
-        # Original-Frame kopieren
-        heatmap_frame = frame.copy()
+        Jede Ausgabe rendert und kodiert in einem eigenen Thread.
         
-        # Saliency-Daten für dieses Frame
-        if frame_number in frames_data:
-            frame_data = frames_data[frame_number]
+        Args:
+            video_path: Pfad zum Original-Video
+            saliency_data: Saliency-Analyse-Daten
+            outputs: Ausgabe-Name -> Pfad ("heatmap", "comparison", "roi_<w>x<h>", z.B. "roi_9x16")
+            colormap: Colormap für Heatmap
+            opacity: Transparenz der Heatmap im Heatmap-Video
+            show_roi: Ob ROI-Boxen im Heatmap-Video angezeigt werden sollen
+            show_info: Ob Frame-Info im Heatmap-Video angezeigt werden soll
+            roi_index: Index des ROI-Vorschlags für ROI-Previews (0 = bester)
+            saliency_maps: Kompakte Saliency Maps (Default: aus saliency_data erzeugt)
+            progress: Optionaler ProgressReporter, wird pro dekodiertem Frame aktualisiert
             
-            # Saliency Map erstellen
-            saliency_map = np.array(frame_data.get("saliency_data", []))
-            if saliency_map.size > 0:
-                # Reshape zu 2D
-                if len(saliency_map.shape) == 1:
-                    saliency_map = saliency_map.reshape((height, width))
+        Returns:
+            Die geschriebenen Ausgaben (Name -> Pfad)
+        """
+        start_time = time.time()
+        
+        unknown = [name for name in outputs if not is_visualization_output(name)]
+        if unknown:
+            raise ValueError(f"Unknown visualization outputs: {', '.join(unknown)}")
+        
+        # Video öffnen
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        
+        try:
+            # Video-Eigenschaften (gecachter Probe)
+            info = media_info.probe(video_path)
+            fps, width, height, total_frames = info.fps, info.width, info.height, info.frame_count
+            
+            # Colormap
+            cmap = self.colormaps.get(colormap, cv2.COLORMAP_JET)
+            
+            # Frame-Daten indexieren für schnellen Zugriff
+            frames_data = {frame["frame_number"]: frame for frame in saliency_data["frames"]}
+            
+            # Kompakte Maps, zwischen den Samples interpoliert
+            if saliency_maps is None:
+                saliency_maps = SaliencyMapStore.from_frames(saliency_data["frames"], (width, height))
+            
+            sinks = []
+            try:
+                for name, output_path in outputs.items():
+                    size, render_frame = self._sink_renderer(
+                        name, (width, height), frames_data, saliency_maps, cmap,
+                        opacity, show_roi, show_info, roi_index
+                    )
+                    sinks.append(VideoSink(name, output_path, fps, size, render_frame))
+            except Exception:
+                for sink in sinks:
+                    sink.close()
+                raise
+            
+            logger.info(f"Processing {total_frames} frames for {', '.join(outputs)} "
+                        f"({len(saliency_maps)} saliency maps)")
+            
+            if progress is not None:
+                progress.set_stage("rendering", total_frames)
+            
+            with tqdm(total=total_frames, desc="Creating visualizations") as pbar:
+                if progress is not None:
+                    def on_frame(n):
+                        pbar.update(n)
+                        progress.advance(n)
+                else:
+                    on_frame = pbar.update
                 
-                # Sicherstellen dass es CV_8UC1 ist
-                if saliency_map.dtype != np.uint8:
-                    saliency_map = saliency_map.astype(np.uint8)
+                frame_count = render_to_sinks(cap, sinks, on_frame)
+        finally:
+            cap.release()
+        
+        processing_time = time.time() - start_time
+        
+        log_performance("visualization_generation", "render_visualizations", processing_time, {
+            "total_frames": frame_count,
+            "outputs": list(outputs),
+            "colormap": colormap
+        })
+        
+        return dict(outputs)
+    
+    def _sink_renderer(self, name: str, frame_size: Tuple[int, int], frames_data: Dict[int, Dict],
+                       saliency_maps: SaliencyMapStore, cmap: int, opacity: float,
+                       show_roi: bool, show_info: bool, roi_index: int):
+        """
+        Liefert Ausgabegröße und Render-Funktion für eine Ausgabe
+        
+        Die Render-Funktionen verändern das geteilte Eingabe-Frame nicht und
+        schreiben in eigene, einmal allokierte Puffer.
+        """
+        width, height = frame_size
+        
+        if name == "heatmap":
+            renderer = HeatmapRenderer(frame_size, cmap, opacity)
+            buffer = np.empty((height, width, 3), dtype=np.uint8)
+            
+            def render_heatmap(frame: np.ndarray, frame_number: int) -> np.ndarray:
+                saliency_map, map_key = saliency_maps.map_for_frame(frame_number)
+                heatmap_frame = renderer.render(frame, saliency_map, map_key)
+                if heatmap_frame is frame:
+                    np.copyto(buffer, frame)
+                    heatmap_frame = buffer
+                return self._draw_overlays(heatmap_frame, frame_number, frames_data, show_roi, show_info)
+            
+            return frame_size, render_heatmap
+        
+        if name == "comparison":
+            # Side-by-Side (3 Spalten): Original | Heatmap | ROI-Crop
+            renderer = HeatmapRenderer(frame_size, cmap, 0.5)
+            heatmap_buffer = np.empty((height, width, 3), dtype=np.uint8)
+            comparison = np.empty((height, width * 3, 3), dtype=np.uint8)
+            
+            def render_comparison(frame: np.ndarray, frame_number: int) -> np.ndarray:
+                saliency_map, map_key = saliency_maps.map_for_frame(frame_number)
+                heatmap_frame = renderer.render(frame, saliency_map, map_key)
+                if heatmap_frame is frame:
+                    np.copyto(heatmap_buffer, frame)
+                    heatmap_frame = heatmap_buffer
+                self._draw_overlays(heatmap_frame, frame_number, frames_data, True, False)
                 
-                # Heatmap generieren
-                heatmap = cv2.applyColorMap(saliency_map, cmap)
+                roi_frame = self._create_roi_crop_for_comparison(frame, frame_number, frames_data, width, height)
                 
-                # Overlay mit Original-Frame
-                heatmap_frame = cv2.addWeighted(heatmap_frame, 1-opacity, heatmap, opacity, 0)
+                comparison[:, :width] = frame
+                comparison[:, width:2 * width] = heatmap_frame
+                comparison[:, 2 * width:] = roi_frame
+                return comparison
             
-            # ROI-Boxen zeichnen
-            if show_roi and frame_data.get("roi_suggestions"):
-                heatmap_frame = self._draw_roi_boxes(heatmap_frame, frame_data["roi_suggestions"])
+            return (width * 3, height), render_comparison
         
-        # Frame-Info hinzufügen
-        if show_info:
-            heatmap_frame = self._draw_frame_info(heatmap_frame, frame_number, frames_data.get(frame_number, {}))
+        # ROI-Preview
+        aspect_ratio = roi_preview_aspect_ratio(name)
+        roi_width, roi_height = self._roi_preview_size(width, height, aspect_ratio)
+        state = {"roi": None}
+        
+        def render_roi_preview(frame: np.ndarray, frame_number: int) -> np.ndarray:
+            # ROI für dieses Frame bestimmen (bleibt bis zum nächsten Sample gültig)
+            frame_data = frames_data.get(frame_number)
+            if frame_data and frame_data.get("roi_suggestions") and len(frame_data["roi_suggestions"]) > roi_index:
+                state["roi"] = frame_data["roi_suggestions"][roi_index]
+            
+            if state["roi"]:
+                return self._create_roi_crop(frame, state["roi"], roi_width, roi_height)
+            # Fallback: Zentrale Crop
+            return self._create_center_crop(frame, roi_width, roi_height)
         
-        return heatmap_frame
+        return (roi_width, roi_height), render_roi_preview
     
-    def _create_comparison_frame(self, frame: np.ndarray, frame_number: int,
-                               frames_data: Dict[int, Dict], cmap: int,
-                               width: int, height: int) -> np.ndarray:
-        """Erstellt Side-by-Side Vergleichs-Frame"""
-        # Original-Frame (links)
-        original = frame.copy()
+    def _roi_preview_size(self, width: int, height: int, aspect_ratio: Tuple[int, int]) -> Tuple[int, int]:
+        """Berechnet die ROI-Dimensionen einer Preview"""
+        roi_width = min(width, int(width * 0.8))
+        roi_height = int(roi_width * aspect_ratio[1] / aspect_ratio[0])
         
-        # Heatmap-Frame (mitte)
-        heatmap_frame = self._create_heatmap_frame(frame, frame_number, frames_data, cmap, 0.5, True, False)
+        if roi_height > height:
+            roi_height = min(height, int(height * 0.8))
+            roi_width = int(roi_height * aspect_ratio[0] / aspect_ratio[1])
         
-        # ROI-Crop-Frame (rechts)
-        roi_frame = self._create_roi_crop_for_comparison(frame, frame_number, frames_data, width, height)
+        return roi_width, roi_height
+    
+    def _draw_overlays(self, frame: np.ndarray, frame_number: int, frames_data: Dict[int, Dict],
+                       show_roi: bool, show_info: bool) -> np.ndarray:
+        """Zeichnet ROI-Boxen und Frame-Info direkt in das Frame"""
+        frame_data = frames_data.get(frame_number)
+        
+        if show_roi and frame_data and frame_data.get("roi_suggestions"):
+            self._draw_roi_boxes(frame, frame_data["roi_suggestions"])
         
-        # Side-by-Side zusammenfügen
-        comparison = np.hstack([original, heatmap_frame, roi_frame])
+        if show_info:
+            self._draw_frame_info(frame, frame_number, frame_data or {})
         
-        return comparison
+        return frame
     
     def _create_roi_crop(self, frame: np.ndarray, roi: Dict[str, Any], 
                         target_width: int, target_height: int) -> np.ndarray:
@@ -463,14 +463,26 @@ class HeatmapGenerator:
         return frame
     
     def generate_all_visualizations(self, video_path: str, video_id: str, 
-                                  saliency_data: Dict[str, Any]) -> Dict[str, str]:
+                                  saliency_data: Dict[str, Any],
+                                  outputs: Optional[List[str]] = None,
+                                  output_dir: Optional[str] = None,
+                                  colormap: str = "jet",
+                                  opacity: float = 0.5,
+                                  show_roi: bool = True,
+                                  show_info: bool = True,
+                                  saliency_maps: Optional[SaliencyMapStore] = None,
+                                  progress=None) -> Dict[str, str]:
         """
-        Generiert alle Visualisierungen für ein Video
+        Generiert Visualisierungen für ein Video in einem Decode-Durchlauf
         
         Args:
             video_path: Pfad zum Original-Video
             video_id: Video-ID
             saliency_data: Saliency-Analyse-Daten
+            outputs: Auswahl aus VISUALIZATION_OUTPUTS oder "roi_<w>x<h>" (Default: VISUALIZATION_OUTPUTS)
+            output_dir: Ausgabe-Verzeichnis (Default: Saliency-Verzeichnis des Videos)
+            saliency_maps: Kompakte Saliency Maps (Default: gespeicherte Maps des Videos)
+            progress: Optionaler ProgressReporter
             
         Returns:
             Dictionary mit Pfaden zu generierten Videos
@@ -478,31 +490,29 @@ class HeatmapGenerator:
         try:
             video_dir = self.storage_dir / video_id
             video_dir.mkdir(exist_ok=True)
-            
-            results = {}
-            
-            # Heatmap-Video
-            heatmap_path = video_dir / "heatmap_video.mp4"
-            results["heatmap"] = self.create_heatmap_video(
-                video_path, saliency_data, str(heatmap_path)
+            target_dir = Path(output_dir) if output_dir else video_dir
+            target_dir.mkdir(parents=True, exist_ok=True)
+            
+            if saliency_maps is None:
+                saliency_maps = load_saliency_maps(video_dir)
+            
+            paths = {}
+            for name in outputs or VISUALIZATION_OUTPUTS:
+                if name == "heatmap":
+                    paths[name] = str(target_dir / "heatmap_video.mp4")
+                elif name == "comparison":
+                    paths[name] = str(target_dir / "comparison_video.mp4")
+                else:
+                    # ROI-Preview-Videos für verschiedene Aspect Ratios
+                    paths[name] = str(target_dir / f"roi_preview_{name[len('roi_'):]}.mp4")
+            
+            results = self.render_visualizations(
+                video_path, saliency_data, paths, colormap=colormap, opacity=opacity,
+                show_roi=show_roi, show_info=show_info, saliency_maps=saliency_maps,
+                progress=progress
             )
             
-            # Vergleichsvideo
-            comparison_path = video_dir / "comparison_video.mp4"
-            results["comparison"] = self.create_comparison_video(
-                video_path, saliency_data, str(comparison_path)
-            )
-            
-            # ROI-Preview-Videos für verschiedene Aspect Ratios
-            aspect_ratios = [(16, 9), (9, 16), (4, 3), (1, 1)]
-            for aspect_ratio in aspect_ratios:
-                ratio_name = f"{aspect_ratio[0]}x{aspect_ratio[1]}"
-                roi_path = video_dir / f"roi_preview_{ratio_name}.mp4"
-                results[f"roi_{ratio_name}"] = self.create_roi_preview_video(
-                    video_path, saliency_data, str(roi_path), aspect_ratio=aspect_ratio
-                )
-            
-            logger.info(f"All visualizations generated for video {video_id}")
+            logger.info(f"Visualizations generated for video {video_id}: {', '.join(results)}")
             return results
             
         except Exception as e:
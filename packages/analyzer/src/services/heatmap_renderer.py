@@ -0,0 +1,272 @@
+"""
+Heatmap Renderer für schnelle Overlay-Videos
+Rendert Heatmaps aus kompakten, niedrig aufgelösten Saliency Maps und
+schreibt mehrere Visualisierungen aus einem einzigen Decode-Durchlauf
+"""
+import bisect
+import queue
+import threading
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..utils.tracing import tracer
+
+# Längste Kante der gespeicherten Saliency Maps (Pixel)
+MAP_MAX_SIDE = 128
+
+# Zwischenstufen für die Interpolation zwischen zwei Samples
+INTERP_STEPS = 32
+
+# Dateiname der kompakten Maps im Saliency-Verzeichnis eines Videos
+MAPS_FILENAME = "saliency_maps.npz"
+
+def compact_map_size(frame_size: Tuple[int, int], max_side: int = MAP_MAX_SIDE) -> Tuple[int, int]:
+    """Größe (w, h) der kompakten Map mit gleichem Seitenverhältnis wie das Video"""
+    width, height = frame_size
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+class SaliencyMapStore:
+    """Kompakte Saliency Maps aller analysierten Frames in einem Array"""
+
+    def __init__(self, frame_numbers: np.ndarray, maps: np.ndarray):
+        order = np.argsort(frame_numbers, kind="stable")
+        self.frame_numbers = np.asarray(frame_numbers, dtype=np.int64)[order]
+        self.maps = np.ascontiguousarray(maps[order], dtype=np.uint8)
+        self._frames = self.frame_numbers.tolist()
+        self._blended = np.empty(self.maps.shape[1:], dtype=np.uint8) if len(self.maps) else None
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def map_size(self) -> Tuple[int, int]:
+        """Größe (w, h) der gespeicherten Maps"""
+        return (self.maps.shape[2], self.maps.shape[1]) if len(self.maps) else (0, 0)
+
+    @classmethod
+    def from_frames(cls, frames_data: List[Dict[str, Any]], frame_size: Tuple[int, int],
+                    max_side: int = MAP_MAX_SIDE) -> "SaliencyMapStore":
+        """
+        Erstellt den Store aus Frame-Daten mit vollen Saliency Maps ("saliency_data")
+
+        Args:
+            frames_data: Frame-Daten der Saliency-Analyse
+            frame_size: Video-Größe (w, h), für flach gespeicherte Maps
+            max_side: Längste Kante der kompakten Maps
+        """
+        width, height = frame_size
+        map_size = compact_map_size(frame_size, max_side)
+        frame_numbers = []
+        maps = []
+
+        for frame in frames_data:
+            data = frame.get("saliency_data")
+            if data is None or len(data) == 0:
+                continue
+
+            saliency_map = np.asarray(data)
+            if saliency_map.ndim == 1:
+                saliency_map = saliency_map.reshape((height, width))
+            if saliency_map.dtype != np.uint8:
+                saliency_map = saliency_map.astype(np.uint8)
+
+            if (saliency_map.shape[1], saliency_map.shape[0]) != map_size:
+                saliency_map = cv2.resize(saliency_map, map_size, interpolation=cv2.INTER_AREA)
+
+            frame_numbers.append(frame["frame_number"])
+            maps.append(saliency_map)
+
+        if not maps:
+            return cls(np.zeros(0, dtype=np.int64), np.zeros((0, map_size[1], map_size[0]), dtype=np.uint8))
+
+        return cls(np.asarray(frame_numbers), np.stack(maps))
+
+    @classmethod
+    def load(cls, path: str) -> Optional["SaliencyMapStore"]:
+        """Lädt kompakte Maps, None wenn nicht vorhanden"""
+        if not Path(path).exists():
+            return None
+        with np.load(path) as data:
+            return cls(data["frame_numbers"], data["maps"])
+
+    def save(self, path: str):
+        """Speichert die Maps komprimiert als eine Datei"""
+        np.savez_compressed(path, frame_numbers=self.frame_numbers, maps=self.maps)
+
+    def map_for_frame(self, frame_number: int) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int]]]:
+        """
+        Interpolierte Map für ein Frame
+
+        Zwischen zwei Samples wird linear überblendet, außerhalb des analysierten
+        Bereichs gibt es keine Map. Der Schlüssel ist für identische Maps gleich,
+        sodass Aufrufer unveränderte Overlays wiederverwenden können.
+
+        Returns:
+            (Map, Schlüssel) oder (None, None). Die Map kann ein interner Puffer sein.
+        """
+        if not self._frames or frame_number < self._frames[0] or frame_number > self._frames[-1]:
+            return None, None
+
+        k = bisect.bisect_right(self._frames, frame_number) - 1
+        prev_frame = self._frames[k]
+        if prev_frame == frame_number or k + 1 >= len(self._frames):
+            return self.maps[k], (k, k, 0)
+
+        next_frame = self._frames[k + 1]
+        step = int(round((frame_number - prev_frame) / (next_frame - prev_frame) * INTERP_STEPS))
+        if step <= 0:
+            return self.maps[k], (k, k, 0)
+        if step >= INTERP_STEPS:
+            return self.maps[k + 1], (k + 1, k + 1, 0)
+
+        t = step / INTERP_STEPS
+        cv2.addWeighted(self.maps[k], 1.0 - t, self.maps[k + 1], t, 0.0, dst=self._blended)
+        return self._blended, (k, k + 1, step)
+
+class HeatmapRenderer:
+    """
+    Legt Heatmaps über Frames
+
+    Colormap per 256er-LUT auf der kleinen Map, Skalierung und Überblendung
+    in einmal allokierte Puffer. Unveränderte Maps werden nicht neu eingefärbt
+    oder skaliert.
+    """
+
+    def __init__(self, frame_size: Tuple[int, int], cmap: int = cv2.COLORMAP_JET, opacity: float = 0.5):
+        self.frame_size = frame_size
+        self.opacity = opacity
+        self.lut = colormap_lut(cmap)
+
+        width, height = frame_size
+        self._heatmap = np.empty((height, width, 3), dtype=np.uint8)
+        self._output = np.empty((height, width, 3), dtype=np.uint8)
+        self._key = None
+
+    def colorize(self, saliency_map: np.ndarray, key=None) -> np.ndarray:
+        """Färbt eine kompakte Map ein und skaliert sie auf Frame-Größe (interner Puffer)"""
+        if key is None or key != self._key:
+            colored = self.lut[saliency_map]
+            cv2.resize(colored, self.frame_size, dst=self._heatmap, interpolation=cv2.INTER_LINEAR)
+            self._key = key
+        return self._heatmap
+
+    def render(self, frame: np.ndarray, saliency_map: Optional[np.ndarray], key=None,
+               opacity: Optional[float] = None) -> np.ndarray:
+        """
+        Overlay für ein Frame
+
+        Ohne Map wird das Frame selbst zurückgegeben (keine Kopie). Das Ergebnis
+        ist ein wiederverwendeter Puffer und nur bis zum nächsten Aufruf gültig.
+        """
+        if saliency_map is None:
+            return frame
+
+        alpha = self.opacity if opacity is None else opacity
+        heatmap = self.colorize(saliency_map, key)
+        cv2.addWeighted(frame, 1.0 - alpha, heatmap, alpha, 0, dst=self._output)
+        return self._output
+
+def colormap_lut(cmap: int) -> np.ndarray:
+    """256-Einträge-LUT (256, 3) einer OpenCV-Colormap"""
+    ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+    return cv2.applyColorMap(ramp, cmap).reshape(256, 3)
+
+def load_saliency_maps(video_dir: Path) -> Optional[SaliencyMapStore]:
+    """Lädt die kompakten Maps aus dem Saliency-Verzeichnis eines Videos"""
+    return SaliencyMapStore.load(str(Path(video_dir) / MAPS_FILENAME))
+
+# Maximale Anzahl gepufferter Frames pro Ausgabe
+SINK_QUEUE_SIZE = 8
+
+class VideoSink:
+    """
+    Eine Ausgabe des Multi-Sink-Renderers
+
+    Rendert und kodiert in einem eigenen Thread. Frames kommen über eine
+    begrenzte Queue vom gemeinsamen Decoder und dürfen nicht verändert werden.
+    """
+
+    def __init__(self, name: str, output_path: str, fps: float, size: Tuple[int, int],
+                 render_frame, fourcc: str = 'mp4v'):
+        """
+        Args:
+            name: Name der Ausgabe (z.B. "heatmap")
+            output_path: Ausgabe-Pfad
+            fps: Bildrate
+            size: Ausgabegröße (w, h)
+            render_frame: Callable(frame, frame_number) -> Ausgabe-Frame
+        """
+        self.name = name
+        self.output_path = output_path
+        self.render_frame = render_frame
+        self.error: Optional[BaseException] = None
+        self.frames_written = 0
+
+        self._writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self._writer.isOpened():
+            raise ValueError(f"Could not create video writer: {output_path}")
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=SINK_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name=f"sink-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, frame_number: int, frame: np.ndarray):
+        """Reicht ein dekodiertes Frame weiter (blockiert bei voller Queue)"""
+        self._queue.put((frame_number, frame))
+
+    def close(self):
+        """Wartet auf die restlichen Frames und schließt den Writer"""
+        self._queue.put(None)
+        self._thread.join()
+        self._writer.release()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                # Nach einem Fehler nur noch leeren, damit der Decoder nicht blockiert
+                continue
+            try:
+                frame_number, frame = item
+                self._writer.write(self.render_frame(frame, frame_number))
+                self.frames_written += 1
+            except BaseException as e:
+                self.error = e
+
+def render_to_sinks(cap: cv2.VideoCapture, sinks: List[VideoSink], on_frame=None) -> int:
+    """
+    Dekodiert das Video einmal und verteilt jedes Frame an alle Ausgaben
+
+    Returns:
+        Anzahl dekodierter Frames
+    """
+    frame_number = 0
+    try:
+        while True:
+            with tracer.span("read_frame", "decode"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+
+            # Blockiert, solange die Encoder-Threads hinterherhängen
+            with tracer.span("render_frame", "encode"):
+                for sink in sinks:
+                    sink.put(frame_number, frame)
+
+            frame_number += 1
+            if on_frame is not None:
+                on_frame(1)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    for sink in sinks:
+        if sink.error is not None:
+            raise RuntimeError(f"Rendering of '{sink.name}' failed: {sink.error}") from sink.error
+
+    return frame_number
@@ -4,6 +4,8 @@ import ffmpeg
 from typing import Optional
 from PIL import Image
 from ..utils.logger import logger
+from .media_info import media_info
+from ..utils.tracing import tracer
 
 class KeyframeExtractor:
     def __init__(self, storage_path: str = "/app/storage"):
@@ -43,13 +45,14 @@ class KeyframeExtractor:
             logger.info(f"Extracting keyframe for scene {scene_id} at {timestamp:.2f}s")
             
             # Use ffmpeg to extract frame
-            (
-                ffmpeg
-                .input(video_path, ss=timestamp)
-                .output(keyframe_path, vframes=1, format='image2', vcodec='mjpeg')
-                .overwrite_output()
-                .run(quiet=True)
-            )
+            with tracer.span("extract_keyframe", "decode"):
+                (
+                    ffmpeg
+                    .input(video_path, ss=timestamp)
+                    .output(keyframe_path, vframes=1, format='image2', vcodec='mjpeg')
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
             
             # Verify the keyframe was created
             if os.path.exists(keyframe_path) and os.path.getsize(keyframe_path) > 0:
@@ -93,9 +96,7 @@ class KeyframeExtractor:
     def get_video_duration(self, video_path: str) -> Optional[float]:
         """Get video duration in seconds"""
         try:
-            probe = ffmpeg.probe(video_path)
-            duration = float(probe['streams'][0]['duration'])
-            return duration
+            return media_info.probe(video_path, prober=ffmpeg.probe).duration
         except Exception as e:
             logger.error(f"Error getting video duration: {e}")
             return None
@@ -103,15 +104,16 @@ class KeyframeExtractor:
     def get_video_info(self, video_path: str) -> Optional[dict]:
         """Get basic video information"""
         try:
-            probe = ffmpeg.probe(video_path)
-            video_stream = next(stream for stream in probe['streams'] if stream['codec_type'] == 'video')
-            
+            info = media_info.probe(video_path, prober=ffmpeg.probe)
             return {
-                'duration': float(video_stream.get('duration', 0)),
-                'width': int(video_stream.get('width', 0)),
-                'height': int(video_stream.get('height', 0)),
-                'fps': eval(video_stream.get('r_frame_rate', '0/1')),
-                'codec': video_stream.get('codec_name', 'unknown')
+                'duration': info.duration,
+                'width': info.width,
+                'height': info.height,
+                'fps': info.fps,
+                'frame_count': info.frame_count,
+                'rotation': info.rotation,
+                'codec': info.codec,
+                'has_audio': info.has_audio
             }
         except Exception as e:
             logger.error(f"Error getting video info: {e}")
@@ -1,3 +1,4 @@
+import importlib.util
 import logging
 import cv2
 import numpy as np
@@ -5,16 +6,13 @@ import os
 import time
 from typing import List, Dict, Any, Optional, Tuple
 
-# Import ML libraries
-# Wrap in try-except to allow graceful degradation/mocking if libs are missing during build
-try:
-    from ultralytics import YOLO
-    import mediapipe as mp
-    import easyocr
-    ML_AVAILABLE = True
-except ImportError as e:
-    logging.warning(f"ML libraries not found: {e}. Vision features will be disabled.")
-    ML_AVAILABLE = False
+# ML libraries are only imported when the models are loaded (torch alone takes
+# seconds to import); here we just check that they are installed
+_ML_PACKAGES = ("ultralytics", "mediapipe", "easyocr")
+_MISSING = [name for name in _ML_PACKAGES if importlib.util.find_spec(name) is None]
+ML_AVAILABLE = not _MISSING
+if _MISSING:
+    logging.warning(f"ML libraries not found: {', '.join(_MISSING)}. Vision features will be disabled.")
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +43,10 @@ class LocalVisionBackend:
         logger.info("Initializing Local Vision Models...")
         
         try:
+            from ultralytics import YOLO
+            import mediapipe as mp
+            import easyocr
+            
             # 1. YOLOv8 for Object Detection (small, fast model)
             # Weights will auto-download to ~/.config/Ultralytics/ or current dir
             self.yolo_model = YOLO("yolov8n.pt") 
@@ -75,6 +77,16 @@ class LocalVisionBackend:
             logger.error(f"Failed to initialize local vision models: {e}")
             self._models_loaded = False
 
+    @classmethod
+    def reset(cls):
+        """Drop the shared instance and its models (next use loads them again)"""
+        instance, cls._instance = cls._instance, None
+        if instance is not None:
+            for detector in (getattr(instance, "face_detector", None), getattr(instance, "pose_detector", None)):
+                if detector is not None:
+                    detector.close()
+            instance.__dict__.clear()
+
     def analyze_image(self, image_path: str) -> Dict[str, Any]:
         """
         Run comprehensive analysis on an image.
@@ -0,0 +1,270 @@
+import logging
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Probed files kept in memory (metadata is small; packet lists are not)
+MAX_ENTRIES = 256
+MAX_PACKET_ENTRIES = 8
+
+Packet = Tuple[float, int, bool]
+
+class AudioStreamInfo:
+    """First audio stream of a media file"""
+
+    def __init__(self, codec: str, sample_rate: int, channels: int, duration: Optional[float]):
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.duration = duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"codec": self.codec, "sample_rate": self.sample_rate, "channels": self.channels, "duration": self.duration}
+
+class MediaInfo:
+    """
+    Container and stream metadata of one file
+
+    width/height are the displayed size (rotation applied), which is what
+    ffmpeg (autorotate) and OpenCV (auto orientation) decode to;
+    coded_width/coded_height are the size as stored.
+    """
+
+    def __init__(self, path: str, duration: float, fps: float, frame_count: int, coded_width: int, coded_height: int,
+                 rotation: int = 0, codec: str = "unknown", pix_fmt: Optional[str] = None,
+                 bit_rate: Optional[int] = None, format_name: Optional[str] = None,
+                 audio: Optional[AudioStreamInfo] = None):
+        self.path = path
+        self.duration = duration
+        self.fps = fps
+        self.frame_count = frame_count
+        self.coded_width = coded_width
+        self.coded_height = coded_height
+        self.rotation = rotation
+        self.codec = codec
+        self.pix_fmt = pix_fmt
+        self.bit_rate = bit_rate
+        self.format_name = format_name
+        self.audio = audio
+
+    @property
+    def width(self) -> int:
+        return self.coded_height if self.rotation in (90, 270) else self.coded_width
+
+    @property
+    def height(self) -> int:
+        return self.coded_width if self.rotation in (90, 270) else self.coded_height
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "duration": self.duration,
+            "fps": self.fps,
+            "frame_count": self.frame_count,
+            "width": self.width,
+            "height": self.height,
+            "rotation": self.rotation,
+            "codec": self.codec,
+            "pix_fmt": self.pix_fmt,
+            "bit_rate": self.bit_rate,
+            "format": self.format_name,
+            "audio": self.audio.to_dict() if self.audio else None
+        }
+
+class MediaInfoService:
+    """
+    Probes each media file once and shares the result
+
+    Entries are keyed by path, mtime and size, so a replaced file is probed
+    again. ffprobe is the source; if it is unavailable or fails, OpenCV's
+    container properties are used (no rotation or audio information then).
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._infos: "OrderedDict[tuple, MediaInfo]" = OrderedDict()
+        self._packets: "OrderedDict[tuple, List[Packet]]" = OrderedDict()
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def probe(self, path: str, prober: Optional[Callable[[str], Dict[str, Any]]] = None) -> MediaInfo:
+        """
+        Metadata of a file, probed on first use
+
+        Args:
+            path: Media file
+            prober: ffprobe function returning its JSON (default ffmpeg.probe)
+
+        Raises:
+            FileNotFoundError: if the file does not exist
+            ValueError: if neither ffprobe nor OpenCV can read it
+        """
+        key = self._cache_key(path)
+        with self._lock:
+            if key in self._infos:
+                self._infos.move_to_end(key)
+                return self._infos[key]
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._infos:
+                    return self._infos[key]
+
+            info = self._probe(path, prober)
+            with self._lock:
+                self._infos[key] = info
+                while len(self._infos) > self.max_entries:
+                    old_key, _ = self._infos.popitem(last=False)
+                    self._locks.pop(old_key, None)
+            return info
+
+    def packets(self, path: str) -> List[Packet]:
+        """
+        (pts seconds, size bytes, keyframe) of every video packet in display order
+
+        Reads the container only (no decoding); empty if ffprobe fails.
+        """
+        key = self._cache_key(path)
+        with self._lock:
+            if key in self._packets:
+                self._packets.move_to_end(key)
+                return self._packets[key]
+
+        packets = _probe_packets(path)
+        if packets:
+            with self._lock:
+                self._packets[key] = packets
+                while len(self._packets) > MAX_PACKET_ENTRIES:
+                    self._packets.popitem(last=False)
+        return packets
+
+    def invalidate(self, path: str):
+        with self._lock:
+            for cache in (self._infos, self._packets):
+                for key in [key for key in cache if key[0] == os.path.realpath(path)]:
+                    cache.pop(key, None)
+
+    def _cache_key(self, path: str) -> tuple:
+        stat = os.stat(path)
+        return (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+
+    def _probe(self, path: str, prober: Optional[Callable[[str], Dict[str, Any]]]) -> MediaInfo:
+        if prober is None:
+            import ffmpeg
+            prober = ffmpeg.probe
+        try:
+            return parse_probe(path, prober(path))
+        except Exception as e:
+            logger.warning(f"ffprobe failed for {path} ({e}), using OpenCV properties")
+            return _opencv_info(path)
+
+def parse_frame_rate(value: Optional[str]) -> float:
+    """'30000/1001' -> 29.97; 0.0 for missing or invalid rates"""
+    try:
+        rate = Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return 0.0
+    return float(rate) if rate > 0 else 0.0
+
+def parse_probe(path: str, probe: Dict[str, Any]) -> MediaInfo:
+    """MediaInfo from ffprobe JSON (format and streams)"""
+    streams = probe.get("streams") or []
+    fmt = probe.get("format") or {}
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        # Untyped streams (minimal probe output): take the first one
+        video = streams[0] if streams and "codec_type" not in streams[0] else None
+    if video is None:
+        raise ValueError(f"No video stream in {path}")
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    fps = parse_frame_rate(video.get("avg_frame_rate")) or parse_frame_rate(video.get("r_frame_rate"))
+    duration = _float(video.get("duration")) or _float(fmt.get("duration")) or 0.0
+    frame_count = int(_float(video.get("nb_frames")) or round(duration * fps))
+
+    return MediaInfo(
+        path=path,
+        duration=duration,
+        fps=fps,
+        frame_count=frame_count,
+        coded_width=int(video.get("width", 0)),
+        coded_height=int(video.get("height", 0)),
+        rotation=_rotation(video),
+        codec=video.get("codec_name", "unknown"),
+        pix_fmt=video.get("pix_fmt"),
+        bit_rate=int(_float(video.get("bit_rate")) or _float(fmt.get("bit_rate")) or 0) or None,
+        format_name=fmt.get("format_name"),
+        audio=AudioStreamInfo(
+            codec=audio.get("codec_name", "unknown"),
+            sample_rate=int(_float(audio.get("sample_rate")) or 0),
+            channels=int(audio.get("channels", 0)),
+            duration=_float(audio.get("duration"))
+        ) if audio else None
+    )
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _rotation(stream: Dict[str, Any]) -> int:
+    """Clockwise display rotation (0/90/180/270) from the rotate tag or display matrix"""
+    rotation = _float((stream.get("tags") or {}).get("rotate"))
+    if rotation is None:
+        for side_data in stream.get("side_data_list") or []:
+            if "rotation" in side_data:
+                # Display matrix rotation is counter-clockwise
+                rotation = -_float(side_data["rotation"])
+                break
+    return int(round(rotation or 0)) % 360
+
+def _opencv_info(path: str) -> MediaInfo:
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video: {path}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+    finally:
+        capture.release()
+    return MediaInfo(path=path, duration=frame_count / fps if fps > 0 else 0.0, fps=fps,
+                     frame_count=frame_count, coded_width=width, coded_height=height)
+
+def _probe_packets(path: str) -> List[Packet]:
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,size,flags", "-of", "csv=p=0", path
+    ]
+    try:
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        logger.warning(f"ffprobe packet scan failed: {e}")
+        return []
+
+    packets = []
+    for line in result.stdout.splitlines():
+        fields = line.strip().split(",")
+        if len(fields) < 3 or fields[0] in ("", "N/A"):
+            continue
+        try:
+            packets.append((float(fields[0]), int(fields[1]), "K" in fields[2]))
+        except ValueError:
+            continue
+    packets.sort(key=lambda packet: packet[0])
+    return packets
+
+media_info = MediaInfoService()
@@ -10,7 +10,7 @@ import json
 import uuid
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, List
 import cv2
 import numpy as np
 from datetime import datetime
@@ -20,6 +20,9 @@ import subprocess
 # from smooth_reframing import SmoothReframer
 from .smooth_reframing import SmoothReframer
 from ..utils.logger import logger
+from ..utils.progress import progress_channel
+from ..utils.tracing import tracer
+from ..utils.profiling import PROFILE_SUFFIX, profile_job, sampled
 
 class ReframingService:
     """
@@ -30,6 +33,8 @@ class ReframingService:
         self.storage_base_dir = Path(storage_base_dir or os.getenv('STORAGE_PATH', '/app/storage'))
         self.backend_url = backend_url or os.getenv('BACKEND_URL', 'http://backend:4001')
         self.active_jobs: Dict[str, Dict[str, Any]] = {}
+        # Seconds between progress pushes to the backend (0 disables pushes)
+        self.progress_push_interval = float(os.getenv('PROGRESS_PUSH_INTERVAL', '5'))
         self.output_dir = self.storage_base_dir / "reframed_videos"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -43,7 +48,12 @@ class ReframingService:
         aspect_ratio: Dict[str, int],
         smoothing_factor: float = 0.3,
         output_format: str = "mp4",
-        reframed_video_id: Optional[str] = None
+        reframed_video_id: Optional[str] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        scene_boundaries: Optional[List[float]] = None,
+        zoom: bool = False,
+        profile: bool = False
     ) -> str:
         """
         Reframes a video based on saliency data
@@ -55,6 +65,11 @@ class ReframingService:
             aspect_ratio: Target aspect ratio {"width": 9, "height": 16}
             smoothing_factor: Smoothing factor for transitions
             output_format: Output video format
+            parallel: Render segments in a process pool instead of a single thread
+            max_workers: Worker processes for parallel mode (default: all cores)
+            scene_boundaries: Optional scene boundaries in seconds used as split points
+            zoom: Let the crop size follow the subject size (zoom) instead of a fixed crop
+            profile: Store a sampling profile of the job next to the output video
             
         Returns:
             Job ID for tracking progress
@@ -70,6 +85,12 @@ class ReframingService:
             "smoothing_factor": smoothing_factor,
             "output_format": output_format,
             "reframed_video_id": reframed_video_id,
+            "parallel": parallel,
+            "max_workers": max_workers,
+            "scene_boundaries": scene_boundaries,
+            "zoom": zoom,
+            "profile": profile,
+            "profile_path": None,
             "status": "PROCESSING",
             "progress": 0.0,
             "started_at": datetime.now(),
@@ -88,103 +109,174 @@ class ReframingService:
         """
         Processes a reframing job in the background
         """
-        try:
-            job = self.active_jobs[job_id]
-            
-            # Generate output path
-            aspect_str = f"{job['aspect_ratio']['width']}_{job['aspect_ratio']['height']}"
-            output_filename = f"{job['video_id']}_reframed_{aspect_str}_{job_id[:8]}.{job['output_format']}"
-            output_path = self.output_dir / output_filename
-            
-            job["output_path"] = str(output_path)
-            
-            # Update progress
-            job["progress"] = 10.0
-            
-            # Initialize SmoothReframer
-            reframer = SmoothReframer(
-                smoothing_factor=job["smoothing_factor"],
-                max_movement_per_frame=15.0
-            )
-            
-            # Update progress
-            job["progress"] = 20.0
-            
-            # Perform reframing
-            logger.info(f"Starting reframing for job {job_id}")
-            
-            # Convert aspect ratio to tuple
-            aspect_tuple = (job["aspect_ratio"]["width"], job["aspect_ratio"]["height"])
-            
-            # Run reframing (this is CPU intensive, so we run it in a thread)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._run_reframing,
-                reframer,
-                job["video_path"],
-                job["saliency_data_path"],
-                str(output_path),
-                aspect_tuple
-            )
-            
-            # Update progress
-            job["progress"] = 90.0
-            
-            # Verify output file
-            if output_path.exists():
-                # Re-encode to H.264 for browser compatibility
-                logger.info(f"🔄 Re-encoding video to H.264 for browser compatibility...")
-                h264_output = self._reencode_to_h264(str(output_path))
+        job = self.active_jobs[job_id]
+        profile_path = str(self.output_dir / f"{job['video_id']}_reframed_{job_id[:8]}{PROFILE_SUFFIX}")
+        if job.get("profile"):
+            job["profile_path"] = profile_path
+        
+        with tracer.job("reframe", job_id) as trace, profile_job(profile_path, enabled=job.get("profile", False)):
+            progress = None
+            try:
+                # Generate output path
+                aspect_str = f"{job['aspect_ratio']['width']}_{job['aspect_ratio']['height']}"
+                output_filename = f"{job['video_id']}_reframed_{aspect_str}_{job_id[:8]}.{job['output_format']}"
+                output_path = self.output_dir / output_filename
                 
-                if h264_output and Path(h264_output).exists():
-                    # Replace the original file with H.264 version
-                    import shutil
-                    shutil.move(h264_output, str(output_path))
-                    logger.info(f"✅ Video re-encoded to H.264 successfully")
+                job["output_path"] = str(output_path)
                 
-                file_size = output_path.stat().st_size
-                job["file_size"] = file_size
-                job["progress"] = 100.0
-                job["status"] = "COMPLETED"
-                job["completed_at"] = datetime.now()
+                # Update progress
+                job["progress"] = 10.0
                 
-                logger.info(f"Reframing job {job_id} completed successfully. Output: {output_path}")
+                # Initialize SmoothReframer
+                reframer = SmoothReframer(
+                    smoothing_factor=job["smoothing_factor"],
+                    max_movement_per_frame=15.0,
+                    zoom=job.get("zoom", False)
+                )
                 
-                # Update database via backend API
-                if job.get("reframed_video_id"):
-                    await self._update_database(job["reframed_video_id"], str(output_path), file_size)
-            else:
-                raise Exception("Output file was not created")
+                # Update progress
+                job["progress"] = 20.0
                 
-        except Exception as e:
-            logger.error(f"Reframing job {job_id} failed: {e}")
-            job["status"] = "ERROR"
-            job["error"] = str(e)
-            job["completed_at"] = datetime.now()
+                # Perform reframing
+                logger.info(f"Starting reframing for job {job_id}")
+                
+                # Convert aspect ratio to tuple
+                aspect_tuple = (job["aspect_ratio"]["width"], job["aspect_ratio"]["height"])
+                
+                # Run reframing (this is CPU intensive, so we run it in a thread)
+                loop = asyncio.get_event_loop()
+                progress = self._open_progress(job_id, job, loop)
+                await loop.run_in_executor(
+                    None,
+                    tracer.wrap(self._run_reframing),
+                    reframer,
+                    job["video_path"],
+                    job["saliency_data_path"],
+                    str(output_path),
+                    aspect_tuple,
+                    job["parallel"],
+                    job["max_workers"],
+                    job["scene_boundaries"],
+                    progress
+                )
+                progress.finish()
+                
+                # Update progress
+                job["progress"] = 90.0
+                
+                # Verify output file
+                if output_path.exists():
+                    # Re-encode to H.264 for browser compatibility
+                    logger.info(f"🔄 Re-encoding video to H.264 for browser compatibility...")
+                    h264_output = self._reencode_to_h264(str(output_path))
+                
+                    if h264_output and Path(h264_output).exists():
+                        # Replace the original file with H.264 version
+                        import shutil
+                        shutil.move(h264_output, str(output_path))
+                        logger.info(f"✅ Video re-encoded to H.264 successfully")
+                
+                    file_size = output_path.stat().st_size
+                    job["file_size"] = file_size
+                    job["progress"] = 100.0
+                    job["status"] = "COMPLETED"
+                    job["completed_at"] = datetime.now()
+                
+                    logger.info(f"Reframing job {job_id} completed successfully. Output: {output_path}")
+                
+                    # Update database via backend API
+                    if job.get("reframed_video_id"):
+                        await self._update_database(job["reframed_video_id"], str(output_path), file_size)
+                else:
+                    raise Exception("Output file was not created")
+                
+            except Exception as e:
+                trace.fail(str(e))
+                logger.error(f"Reframing job {job_id} failed: {e}")
+                if progress is not None:
+                    progress.finish(error=str(e))
+                job["status"] = "ERROR"
+                job["error"] = str(e)
+                job["completed_at"] = datetime.now()
     
+    @tracer.traced("encode", "reframe_render")
+    @sampled
     def _run_reframing(
         self,
         reframer: SmoothReframer,
         video_path: str,
         saliency_data_path: str,
         output_path: str,
-        aspect_ratio: Tuple[int, int]
+        aspect_ratio: Tuple[int, int],
+        parallel: bool = False,
+        max_workers: Optional[int] = None,
+        scene_boundaries: Optional[List[float]] = None,
+        progress=None
     ):
         """
         Runs the actual reframing process (blocking operation)
         """
         try:
-            reframer.reframe_video_smooth(
-                video_path=video_path,
-                saliency_data_path=saliency_data_path,
-                output_path=output_path,
-                target_aspect_ratio=aspect_ratio
-            )
+            if parallel:
+                reframer.reframe_video_parallel(
+                    video_path=video_path,
+                    saliency_data_path=saliency_data_path,
+                    output_path=output_path,
+                    target_aspect_ratio=aspect_ratio,
+                    max_workers=max_workers,
+                    scene_boundaries=scene_boundaries,
+                    progress=progress
+                )
+            else:
+                reframer.reframe_video_smooth(
+                    video_path=video_path,
+                    saliency_data_path=saliency_data_path,
+                    output_path=output_path,
+                    target_aspect_ratio=aspect_ratio,
+                    progress=progress
+                )
         except Exception as e:
             logger.error(f"Reframing process failed: {e}")
             raise
     
+    def _open_progress(self, job_id: str, job: Dict[str, Any], loop: asyncio.AbstractEventLoop):
+        """
+        Opens the progress reporter for a job; rendering maps onto 20-90% of the job progress
+        """
+        progress = progress_channel.open(f"reframe:{job_id}", total=0, stage="preparing")
+        last_push = [0.0]
+        
+        def on_update(snapshot: Dict[str, Any]):
+            if snapshot["stage"] != "rendering" or snapshot["status"] != "RUNNING":
+                return
+            job["progress"] = round(20.0 + 70.0 * snapshot["progress"], 1)
+            
+            # Throttled push to the backend, scheduled on the event loop so rendering never waits on HTTP
+            reframed_video_id = job.get("reframed_video_id")
+            if reframed_video_id and self.progress_push_interval > 0:
+                if snapshot["updated_at"] - last_push[0] >= self.progress_push_interval:
+                    last_push[0] = snapshot["updated_at"]
+                    asyncio.run_coroutine_threadsafe(
+                        self._push_progress(reframed_video_id, job["progress"]), loop
+                    )
+        
+        progress.add_listener(on_update)
+        return progress
+    
+    async def _push_progress(self, reframed_video_id: str, progress: float):
+        """
+        Pushes intermediate progress to the backend
+        """
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                await client.patch(
+                    f"{self.backend_url}/api/reframed-videos/{reframed_video_id}",
+                    json={"status": "PROCESSING", "progress": progress}
+                )
+        except Exception as e:
+            logger.debug(f"Progress push failed for reframed video {reframed_video_id}: {e}")
+    
+    @tracer.traced("io", "backend_update")
     async def _update_database(self, reframed_video_id: str, output_path: str, file_size: int):
         """
         Updates the database via backend API when reframing is complete
@@ -209,6 +301,7 @@ class ReframingService:
         except Exception as e:
             logger.error(f"❌ Error updating database for reframed video {reframed_video_id}: {e}")
     
+    @tracer.traced("encode")
     def _reencode_to_h264(self, video_path: str) -> Optional[str]:
         """
         Re-encodes a video to H.264 format for browser compatibility
@@ -243,6 +336,82 @@ class ReframingService:
             logger.error(f"❌ Error during H.264 re-encoding: {e}")
             return None
     
+    async def get_crop_path(
+        self,
+        video_path: str,
+        saliency_data_path: str,
+        aspect_ratio: Dict[str, int],
+        smoothing_factor: float = 0.3,
+        changes_only: bool = False,
+        zoom: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Computes the crop trajectory and movement statistics without rendering
+        
+        Args:
+            changes_only: Only emit rows where the crop window changes
+            zoom: Compute a zoom-aware path with variable crop size
+            
+        Returns:
+            Crop path as rows [t_ms, x, y, w, h] plus movement stats
+        """
+        reframer = SmoothReframer(smoothing_factor=smoothing_factor, max_movement_per_frame=15.0, zoom=zoom)
+        aspect_tuple = (aspect_ratio["width"], aspect_ratio["height"])
+        
+        return await asyncio.to_thread(
+            reframer.export_crop_path,
+            video_path,
+            saliency_data_path,
+            aspect_tuple,
+            changes_only
+        )
+    
+    async def render_preview(
+        self,
+        video_id: str,
+        video_path: str,
+        saliency_data_path: str,
+        aspect_ratio: Dict[str, int],
+        smoothing_factor: float = 0.3,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None,
+        preview_height: int = 360,
+        zoom: bool = False
+    ) -> str:
+        """
+        Renders a low-resolution proxy preview of a time range
+        
+        Each call writes a new file; the caller deletes it once it has been served.
+        
+        Returns:
+            Path to the preview video
+        """
+        reframer = SmoothReframer(smoothing_factor=smoothing_factor, max_movement_per_frame=15.0, zoom=zoom)
+        aspect_tuple = (aspect_ratio["width"], aspect_ratio["height"])
+        
+        preview_dir = self.output_dir / "previews"
+        preview_dir.mkdir(parents=True, exist_ok=True)
+        aspect_str = f"{aspect_tuple[0]}_{aspect_tuple[1]}"
+        output_path = preview_dir / f"{video_id}_preview_{aspect_str}_{uuid.uuid4().hex[:8]}.mp4"
+        
+        try:
+            await asyncio.to_thread(
+                reframer.render_preview,
+                video_path,
+                saliency_data_path,
+                str(output_path),
+                aspect_tuple,
+                start_time,
+                end_time,
+                preview_height
+            )
+        except Exception:
+            output_path.unlink(missing_ok=True)
+            raise
+        
+        logger.info(f"Rendered reframing preview for video {video_id}: {output_path}")
+        return str(output_path)
+    
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Gets the status of a reframing job
@@ -261,6 +430,15 @@ class ReframingService:
         # Remove internal fields that shouldn't be exposed
         job.pop("video_path", None)
         job.pop("saliency_data_path", None)
+        job.pop("scene_boundaries", None)
+        
+        # Live throughput from the progress channel
+        snapshot = progress_channel.get(f"reframe:{job_id}")
+        if snapshot:
+            job["fps"] = snapshot["fps"]
+            job["eta_seconds"] = snapshot["eta_seconds"]
+            job["processed_frames"] = snapshot["processed"]
+            job["total_frames"] = snapshot["total"]
         
         return job
     
@@ -17,10 +17,18 @@ import psutil
 # Absolute imports für lokale Tests
 try:
     from ..models.sam_wrapper import SAMSaliencyModel
+    from .heatmap_renderer import SaliencyMapStore, load_saliency_maps, MAPS_FILENAME
+    from .media_info import media_info
     from ..utils.logger import logger, log_analysis_step, log_performance, log_error
+    from ..utils.model_registry import model_registry
+    from ..utils.tracing import tracer
 except ImportError:
     # Fallback für lokale Tests
     from models.sam_wrapper import SAMSaliencyModel
+    from services.heatmap_renderer import SaliencyMapStore, load_saliency_maps, MAPS_FILENAME
+    from services.media_info import media_info
+    from utils.model_registry import model_registry
+    from utils.tracing import tracer
     import logging
     logger = logging.getLogger(__name__)
     def log_analysis_step(*args, **kwargs):
@@ -30,6 +38,12 @@ except ImportError:
     def log_error(*args, **kwargs):
         pass
 
+# Ungefährer Speicherbedarf der SAM Modelle (MB) für das Memory-Budget der Model-Registry
+SAM_SIZE_MB = {"vit_b": 450, "vit_l": 1400, "vit_h": 2700, "sam2.1_large": 1000, "sam2.1_hiera_large": 1000}
+
+# Anteile der Phasen am Gesamtfortschritt (Dekodieren aller Frames, SAM auf den gesampelten Frames)
+PROGRESS_STAGES = {"decoding": 0.2, "analyzing": 0.8}
+
 class SaliencyDetector:
     """Video Saliency Detection Service"""
     
@@ -44,7 +58,10 @@ class SaliencyDetector:
         """
         self.model_type = model_type
         self.use_coreml = use_coreml
-        self.sam_model = SAMSaliencyModel(model_type=model_type, use_coreml=use_coreml)
+        
+        # SAM wird erst beim ersten Frame geladen (oder per Warmup), nicht beim Serverstart
+        self.model_key = f"sam:{model_type}"
+        model_registry.register(self.model_key, self._load_sam_model, size_mb=SAM_SIZE_MB.get(model_type))
         
         # Storage-Verzeichnisse erstellen
         base_storage = Path(storage_base_dir or os.getenv('STORAGE_PATH', '/app/storage'))
@@ -53,11 +70,20 @@ class SaliencyDetector:
         
         logger.info(f"SaliencyDetector initialized with {model_type}")
     
+    @property
+    def sam_model(self) -> SAMSaliencyModel:
+        """SAM Modell aus der Model-Registry (lädt beim ersten Zugriff)"""
+        return model_registry.get(self.model_key)
+    
+    def _load_sam_model(self) -> SAMSaliencyModel:
+        return SAMSaliencyModel(model_type=self.model_type, use_coreml=self.use_coreml)
+    
     def analyze_video(self, video_path: str, 
                      video_id: str,
                      sample_rate: int = 1,
                      aspect_ratio: Tuple[int, int] = (9, 16),
-                     max_frames: Optional[int] = None) -> Dict[str, Any]:
+                     max_frames: Optional[int] = None,
+                     progress=None) -> Dict[str, Any]:
         """
         Analysiert Video Frame-by-Frame für Saliency Detection
         
@@ -67,6 +93,7 @@ class SaliencyDetector:
             sample_rate: Jedes N-te Frame analysieren (Performance-Optimierung)
             aspect_ratio: Ziel-Seitenverhältnis für ROI-Vorschläge
             max_frames: Maximale Anzahl Frames (für Testing)
+            progress: Optionaler ProgressReporter für Live-Fortschritt (Frames, FPS, ETA)
             
         Returns:
             Dictionary mit Frame-Daten und Metadaten
@@ -88,20 +115,22 @@ class SaliencyDetector:
             logger.info(f"Analyzing video: {video_info['frame_count']} frames, "
                        f"{video_info['fps']:.1f} FPS, {video_info['duration']:.1f}s")
             
-            # Frames extrahieren und analysieren (sicherer Modus nach Crash)
-            try:
-                # Versuche zuerst den sicheren Batch-Modus
-                frames_data = self._analyze_frames(
-                    video_path, video_info, sample_rate, aspect_ratio, max_frames
-                )
-                logger.info("✅ Sichere Batch-Verarbeitung erfolgreich")
-            except Exception as e:
-                logger.warning(f"Batch-Verarbeitung fehlgeschlagen: {e}")
-                logger.info("🔄 Fallback zu sequenzieller Verarbeitung...")
-                # Fallback zu einfacher sequenzieller Verarbeitung
-                frames_data = self._analyze_frames_simple(
-                    video_path, video_info, sample_rate, aspect_ratio, max_frames
-                )
+            # Frames extrahieren und analysieren (sicherer Modus nach Crash);
+            # das Modell bleibt während der Analyse geladen
+            with model_registry.use(self.model_key):
+                try:
+                    # Versuche zuerst den sicheren Batch-Modus
+                    frames_data = self._analyze_frames(
+                        video_path, video_info, sample_rate, aspect_ratio, max_frames, progress
+                    )
+                    logger.info("✅ Sichere Batch-Verarbeitung erfolgreich")
+                except Exception as e:
+                    logger.warning(f"Batch-Verarbeitung fehlgeschlagen: {e}")
+                    logger.info("🔄 Fallback zu sequenzieller Verarbeitung...")
+                    # Fallback zu einfacher sequenzieller Verarbeitung
+                    frames_data = self._analyze_frames_simple(
+                        video_path, video_info, sample_rate, aspect_ratio, max_frames, progress
+                    )
             
             # Metadaten zusammenstellen
             processing_time = time.time() - start_time
@@ -270,27 +299,18 @@ class SaliencyDetector:
             raise
     
     def _get_video_info(self, video_path: str) -> Optional[Dict[str, Any]]:
-        """Extrahiert Video-Informationen"""
+        """Extrahiert Video-Informationen (gecachter Probe, geteilt mit den anderen Services)"""
         try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                return None
-            
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            duration = frame_count / fps if fps > 0 else 0
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            cap.release()
+            info = media_info.probe(video_path)
             
             return {
-                "frame_count": frame_count,
-                "fps": fps,
-                "duration": duration,
-                "width": width,
-                "height": height,
-                "resolution": f"{width}x{height}"
+                "frame_count": info.frame_count,
+                "fps": info.fps,
+                "duration": info.duration,
+                "width": info.width,
+                "height": info.height,
+                "rotation": info.rotation,
+                "resolution": f"{info.width}x{info.height}"
             }
             
         except Exception as e:
@@ -299,7 +319,7 @@ class SaliencyDetector:
     
     def _analyze_frames(self, video_path: str, video_info: Dict[str, Any], 
                        sample_rate: int, aspect_ratio: Tuple[int, int],
-                       max_frames: Optional[int]) -> List[Dict[str, Any]]:
+                       max_frames: Optional[int], progress=None) -> List[Dict[str, Any]]:
         """Analysiert Frames des Videos mit Batch Processing für M4 Optimierung"""
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
@@ -318,7 +338,10 @@ class SaliencyDetector:
         frames_to_process = []
         frame_numbers_to_process = []
         
-        with tqdm(total=total_frames, desc="Collecting frames") as pbar:
+        if progress is not None:
+            progress.set_stage("decoding", total_frames)
+        
+        with tracer.span("collect_frames", "decode"), tqdm(total=total_frames, desc="Collecting frames") as pbar:
             while frame_number < total_frames:
                 ret, frame = cap.read()
                 if not ret:
@@ -334,12 +357,17 @@ class SaliencyDetector:
                 
                 frame_number += 1
                 pbar.update(1)
+                if progress is not None:
+                    progress.advance()
         
         cap.release()
         
         # Sicherere Batch Processing für M4
         logger.info(f"🛡️  Sichere Batch-Verarbeitung: {len(frames_to_process)} frames")
         
+        if progress is not None:
+            progress.set_stage("analyzing", len(frames_to_process))
+        
         batch_size = 2  # Sicherere Batch-Größe nach Crash
         for i in tqdm(range(0, len(frames_to_process), batch_size), desc="Analyzing batches"):
             batch_frames = frames_to_process[i:i + batch_size]
@@ -347,11 +375,14 @@ class SaliencyDetector:
             
             # Batch verarbeiten
             for frame, frame_num in zip(batch_frames, batch_frame_numbers):
-                frame_data = self._analyze_single_frame(
-                    frame, frame_num, video_info["fps"], aspect_ratio
-                )
+                with tracer.span("saliency_frame", "inference"):
+                    frame_data = self._analyze_single_frame(
+                        frame, frame_num, video_info["fps"], aspect_ratio
+                    )
                 frames_data.append(frame_data)
                 frames_analyzed += 1
+                if progress is not None:
+                    progress.advance()
         
         logger.info(f"🛡️  Sichere Batch-Analyse abgeschlossen: {frames_analyzed} frames analyzed")
         return frames_data
@@ -475,7 +506,7 @@ class SaliencyDetector:
     
     def _analyze_frames_simple(self, video_path: str, video_info: Dict[str, Any], 
                               sample_rate: int, aspect_ratio: Tuple[int, int],
-                              max_frames: Optional[int]) -> List[Dict[str, Any]]:
+                              max_frames: Optional[int], progress=None) -> List[Dict[str, Any]]:
         """Einfache sequenzielle Frame-Analyse (Crash-sicher)"""
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
@@ -490,17 +521,22 @@ class SaliencyDetector:
         
         logger.info(f"🛡️  Sichere sequenzielle Analyse: {frames_to_analyze} frames, sample rate {sample_rate}")
         
+        if progress is not None:
+            progress.set_stage("analyzing", total_frames)
+        
         with tqdm(total=total_frames, desc="Sequential analysis") as pbar:
             while frame_number < total_frames:
-                ret, frame = cap.read()
+                with tracer.span("read_frame", "decode"):
+                    ret, frame = cap.read()
                 if not ret:
                     break
                 
                 # Nur jedes N-te Frame analysieren
                 if frame_number % sample_rate == 0:
-                    frame_data = self._analyze_single_frame(
-                        frame, frame_number, video_info["fps"], aspect_ratio
-                    )
+                    with tracer.span("saliency_frame", "inference"):
+                        frame_data = self._analyze_single_frame(
+                            frame, frame_number, video_info["fps"], aspect_ratio
+                        )
                     frames_data.append(frame_data)
                     frames_analyzed += 1
                     
@@ -512,6 +548,8 @@ class SaliencyDetector:
                 
                 frame_number += 1
                 pbar.update(1)
+                if progress is not None:
+                    progress.advance()
                 
                 # Optional: Early stopping für Testing
                 if max_frames and frames_analyzed >= max_frames:
@@ -568,6 +606,7 @@ class SaliencyDetector:
         
         return str(temp_path)
     
+    @tracer.traced("io")
     def _save_analysis_results(self, video_id: str, results: Dict[str, Any]):
         """Speichert Analyse-Ergebnisse (optimiert für Größe)"""
         try:
@@ -609,40 +648,41 @@ class SaliencyDetector:
                 json.dump(roi_suggestions, f, separators=(',', ':'))
             
             # Saliency Maps als separate komprimierte Dateien speichern
-            self._save_saliency_maps_compressed(video_id, results["frames"])
+            video_info = results["metadata"]["video_info"]
+            self._save_saliency_maps_compressed(
+                video_id, results["frames"], (video_info["width"], video_info["height"])
+            )
             
             logger.info(f"Optimized analysis results saved for video {video_id}")
             
         except Exception as e:
             logger.error(f"Error saving analysis results: {e}")
     
-    def _save_saliency_maps_compressed(self, video_id: str, frames_data: List[Dict[str, Any]]):
-        """Speichert Saliency Maps als komprimierte Binärdateien"""
+    def _save_saliency_maps_compressed(self, video_id: str, frames_data: List[Dict[str, Any]],
+                                       frame_size: Tuple[int, int]):
+        """Speichert alle Saliency Maps niedrig aufgelöst in einer komprimierten Datei"""
         try:
-            import numpy as np
-            import gzip
-            import base64
+            store = SaliencyMapStore.from_frames(frames_data, frame_size)
+            if len(store) == 0:
+                return
             
-            video_dir = self.storage_dir / video_id
-            maps_dir = video_dir / "saliency_maps"
-            maps_dir.mkdir(exist_ok=True)
-            
-            for frame in frames_data:
-                if "saliency_data" in frame and len(frame["saliency_data"]) > 0:
-                    frame_num = frame["frame_number"]
-                    
-                    # Saliency Map als numpy Array
-                    saliency_map = np.array(frame["saliency_data"], dtype=np.uint8)
-                    
-                    # Komprimiert speichern
-                    map_path = maps_dir / f"frame_{frame_num:05d}.npz"
-                    np.savez_compressed(map_path, saliency_map=saliency_map)
+            map_path = self.storage_dir / video_id / MAPS_FILENAME
+            store.save(str(map_path))
             
-            logger.info(f"Compressed saliency maps saved for video {video_id}")
+            logger.info(f"Compressed saliency maps saved for video {video_id} "
+                        f"({len(store)} maps, {store.map_size[0]}x{store.map_size[1]})")
             
         except Exception as e:
             logger.error(f"Error saving compressed saliency maps: {e}")
     
+    def get_saliency_maps(self, video_id: str) -> Optional[SaliencyMapStore]:
+        """Lädt die kompakten Saliency Maps eines Videos"""
+        try:
+            return load_saliency_maps(self.storage_dir / video_id)
+        except Exception as e:
+            logger.error(f"Error loading saliency maps: {e}")
+            return None
+    
     def _save_scene_results(self, video_id: str, scene_id: str, results: Dict[str, Any]):
         """Speichert Scene-spezifische Ergebnisse"""
         try:
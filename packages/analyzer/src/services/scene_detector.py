@@ -1,29 +1,79 @@
 import cv2
 import os
-from typing import List, Tuple
+import subprocess
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
 from scenedetect import VideoManager, SceneManager
 from scenedetect.detectors import ContentDetector
 import logging
+from .media_info import media_info
+from ..utils.tracing import tracer
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# "full" = PySceneDetect on every frame, "fast" = downscaled decode with frame skipping,
+# "hinted" = decode only around cut candidates found in the packet metadata
+DETECTION_MODES = ("full", "fast", "hinted")
+DETECTION_MODE = os.getenv('SCENE_DETECTION_MODE', 'full')
+
+# Fast mode: width frames are decoded at, frames skipped between analysed frames
+FAST_WIDTH = int(os.getenv('SCENE_DETECTION_WIDTH', '320'))
+FRAME_SKIP = int(os.getenv('SCENE_DETECTION_FRAME_SKIP', '2'))
+
+# Minimum scene length in frames (PySceneDetect default)
+MIN_SCENE_LEN = 15
+
+# Parallel detection: worker processes, minimum video length, segment length and overlap (seconds)
+WORKERS = int(os.getenv('SCENE_DETECTION_WORKERS', str(os.cpu_count() or 1)))
+PARALLEL_MIN_SECONDS = float(os.getenv('SCENE_DETECTION_PARALLEL_MIN_SECONDS', '600'))
+SEGMENT_SECONDS = float(os.getenv('SCENE_DETECTION_SEGMENT_SECONDS', '300'))
+SEGMENT_OVERLAP_SECONDS = 2.0
+
+# Hinted mode: packet size (vs. its neighbourhood) that marks a candidate, decode
+# window around candidates (seconds), share of the video above which a dense pass is cheaper
+HINT_SIZE_RATIO = float(os.getenv('SCENE_HINT_SIZE_RATIO', '2.5'))
+HINT_WINDOW_SECONDS = float(os.getenv('SCENE_HINT_WINDOW_SECONDS', '1.0'))
+HINT_MAX_COVERAGE = 0.5
+
+# PySceneDetect's auto-downscale target width (used for full mode in parallel segments)
+FULL_MODE_WIDTH = 256
+
 class SceneDetector:
-    def __init__(self, threshold: float = 30.0):
+    def __init__(self, threshold: float = 30.0, mode: str = DETECTION_MODE,
+                 fast_width: int = FAST_WIDTH, frame_skip: int = FRAME_SKIP, workers: int = WORKERS):
         """
         Initialize scene detector
         
         Args:
             threshold: Threshold for scene detection (lower = more sensitive)
+            mode: "full", "fast" or "hinted" (see detect_scenes)
+            fast_width: Decode width in fast mode
+            frame_skip: Frames skipped between analysed frames in fast mode
+            workers: Processes for segment-wise detection of long videos (1 = off)
         """
         self.threshold = threshold
+        self.mode = mode
+        self.fast_width = fast_width
+        self.frame_skip = frame_skip
+        self.workers = workers
 
-    def detect_scenes(self, video_path: str) -> List[Tuple[float, float]]:
+    def detect_scenes(self, video_path: str, mode: Optional[str] = None) -> List[Tuple[float, float]]:
         """
         Detect scenes in video file
         
         Args:
             video_path: Path to video file
+            mode: "full" runs PySceneDetect on every frame; "fast" lets ffmpeg
+                  decode at fast_width, scores every (frame_skip + 1)th frame
+                  and refines each cut to the exact frame; "hinted" finds cut
+                  candidates in the packet metadata (ffprobe) and decodes only
+                  around them (default: self.mode).
+                  Videos longer than PARALLEL_MIN_SECONDS are split into
+                  overlapping segments that are detected in parallel.
             
         Returns:
             List of tuples (start_time, end_time) for each scene
@@ -31,13 +81,46 @@ class SceneDetector:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
-        logger.info(f"Starting scene detection for {video_path}")
+        mode = mode or self.mode
+        if mode not in DETECTION_MODES:
+            raise ValueError(f"Unknown scene detection mode: {mode}")
+
+        logger.info(f"Starting scene detection for {video_path} ({mode} mode)")
+
+        try:
+            with tracer.span("scene_detection", "decode", mode=mode):
+                properties = self._parallel_properties(video_path) if mode != "hinted" else None
+                if mode == "hinted":
+                    scenes = self._detect_hinted(video_path)
+                elif properties:
+                    scenes = self._detect_parallel(video_path, mode, properties)
+                elif mode == "fast":
+                    scenes = self._detect_fast(video_path)
+                else:
+                    scenes = self._detect_full(video_path)
+        except Exception as e:
+            logger.error(f"Error during scene detection: {e}")
+            raise
+
+        for i, (start_seconds, end_seconds) in enumerate(scenes):
+            logger.info(f"Scene {i+1}: {start_seconds:.2f}s - {end_seconds:.2f}s")
+
+        if not scenes:
+            logger.warning("No scenes detected, falling back to single-scene coverage")
+            duration = self._fallback_duration(video_path)
+            scenes.append((0.0, duration))
+            logger.info(f"Fallback scene: 0.00s - {duration:.2f}s")
+
+        logger.info(f"Detected {len(scenes)} scenes (including fallbacks if applied)")
+        return scenes
+
+    def _detect_full(self, video_path: str) -> List[Tuple[float, float]]:
+        """PySceneDetect ContentDetector on every frame"""
+        # Create video manager and scene manager
+        video_manager = VideoManager([video_path])
+        scene_manager = SceneManager()
         
         try:
-            # Create video manager and scene manager
-            video_manager = VideoManager([video_path])
-            scene_manager = SceneManager()
-            
             # Add content detector
             scene_manager.add_detector(ContentDetector(threshold=self.threshold))
             
@@ -47,56 +130,316 @@ class SceneDetector:
             # Detect scenes
             scene_manager.detect_scenes(frame_source=video_manager)
             
-            # Get scene list
-            scene_list = scene_manager.get_scene_list()
-            
-            # Convert to list of tuples
-            scenes = []
-            for i, (start_time, end_time) in enumerate(scene_list):
-                start_seconds = start_time.get_seconds()
-                end_seconds = end_time.get_seconds()
-                scenes.append((start_seconds, end_seconds))
-                
-                logger.info(f"Scene {i+1}: {start_seconds:.2f}s - {end_seconds:.2f}s")
-            
-            if not scenes:
-                logger.warning("No scenes detected, falling back to single-scene coverage")
-                duration = None
-                try:
-                    import ffmpeg  # type: ignore
-                    probe = ffmpeg.probe(video_path)
-                    duration = float(probe["format"]["duration"])
-                except Exception as probe_error:  # pragma: no cover - fallback logic
-                    logger.warning(f"ffmpeg probe failed to determine duration: {probe_error}")
-
-                if duration is None or duration <= 0:
-                    try:
-                        capture = cv2.VideoCapture(video_path)
-                        fps = capture.get(cv2.CAP_PROP_FPS) or 0
-                        frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0
-                        capture.release()
-                        if fps > 0 and frame_count > 0:
-                            duration = frame_count / fps
-                    except Exception as cv_error:
-                        logger.warning(f"OpenCV fallback failed: {cv_error}")
-
-                if duration is None or duration <= 0:
-                    duration = 60.0  # Sensible default to avoid zero-length scenes
-                    logger.warning("Could not determine video duration, using default 60s fallback")
-
-                scenes.append((0.0, duration))
-                logger.info(f"Fallback scene: 0.00s - {duration:.2f}s")
-
-            logger.info(f"Detected {len(scenes)} scenes (including fallbacks if applied)")
-            return scenes
-            
-        except Exception as e:
-            logger.error(f"Error during scene detection: {e}")
-            raise
+            # Convert scene list to list of tuples
+            return [
+                (start_time.get_seconds(), end_time.get_seconds())
+                for start_time, end_time in scene_manager.get_scene_list()
+            ]
         finally:
             video_manager.release()
 
+    def _fallback_duration(self, video_path: str) -> float:
+        """Video duration for the single-scene fallback"""
+        duration = None
+        try:
+            duration = media_info.probe(video_path).duration
+        except Exception as probe_error:  # pragma: no cover - fallback logic
+            logger.warning(f"Media probe failed to determine duration: {probe_error}")
+
+        if duration is None or duration <= 0:
+            duration = 60.0  # Sensible default to avoid zero-length scenes
+            logger.warning("Could not determine video duration, using default 60s fallback")
+        return duration
+
+    def _detect_fast(self, video_path: str) -> List[Tuple[float, float]]:
+        """
+        Content detection on downscaled frames, scoring every (frame_skip + 1)th frame
+
+        ffmpeg still decodes every frame (inter frames cannot be skipped) but
+        scales them down before they reach Python; only the sampled frames are
+        scored. The frames since the last sampled one are kept, so a cut found
+        between two samples is moved to the frame with the largest change.
+        """
+        fps, _, width, height = self._video_properties(video_path)
+        out_width, out_height = _scaled_size(width, height, self.fast_width)
+
+        cuts, frame_count = self._detect_cuts(video_path, out_width, out_height, self.frame_skip)
+
+        logger.info(f"Fast scene detection: {frame_count} frames at {out_width}x{out_height}, "
+                    f"every {self.frame_skip + 1}. frame analysed")
+        return _scenes_from_cuts(cuts, frame_count, fps)
+
+    def _detect_parallel(self, video_path: str, mode: str,
+                         properties: Tuple[float, int, int, int]) -> List[Tuple[float, float]]:
+        """
+        Detect cuts in overlapping segments on a process pool and merge them
+
+        Every segment owns a frame range and decodes SEGMENT_OVERLAP_SECONDS
+        beyond it on both sides, so cuts near its edges see the same history
+        as in a single pass. Cuts are kept by the segment that owns them and
+        MIN_SCENE_LEN is applied again across segment borders.
+        """
+        fps, frame_count, width, height = properties
+        if mode == "fast":
+            out_width, out_height = _scaled_size(width, height, self.fast_width)
+            frame_skip = self.frame_skip
+        else:
+            # Same resolution PySceneDetect's auto-downscale would use, every frame
+            out_width, out_height = _scaled_size(width, height, width // max(1, width // FULL_MODE_WIDTH))
+            frame_skip = 0
+
+        overlap = max(int(SEGMENT_OVERLAP_SECONDS * fps), MIN_SCENE_LEN + frame_skip + 1)
+        segments = plan_segments(frame_count, int(SEGMENT_SECONDS * fps), self.workers)
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        logger.info(f"🧩 Scene detection in {len(segments)} segments on {self.workers} workers")
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(segments)),
+                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = []
+            for own_start, own_end in segments:
+                read_start = max(0, own_start - overlap)
+                read_count = None if own_end is None else own_end + overlap - read_start
+                futures.append(executor.submit(
+                    _detect_segment, video_path, self.threshold, frame_skip, out_width, out_height,
+                    fps, read_start, read_count, threads
+                ))
+            results = [future.result() for future in futures]
+
+        cuts = merge_segment_cuts(segments, [cuts for cuts, _ in results])
+        last_start = max(0, segments[-1][0] - overlap)
+        total_frames = last_start + results[-1][1]
+        return _scenes_from_cuts(cuts, total_frames, fps)
+
+    def _detect_hinted(self, video_path: str) -> List[Tuple[float, float]]:
+        """
+        Two-stage detection: cut candidates from packet metadata, content detection around them
+
+        Encoders start a new GOP at most cuts (keyframes off the regular
+        cadence) and the first frame after a cut is expensive to code (packet
+        size spike). Only windows around those candidates are decoded, at
+        fast_width and every frame, so the cost follows the number of cuts.
+        Falls back to a dense fast pass for intra-only material or when the
+        windows would cover most of the video.
+        """
+        fps, _, width, height = self._video_properties(video_path)
+        out_width, out_height = _scaled_size(width, height, self.fast_width)
+
+        packets = self._probe_packets(video_path)
+        keyframe_share = sum(1 for _, _, key in packets if key) / max(1, len(packets))
+        if not packets or keyframe_share > 0.5:
+            logger.info("No usable packet hints (intra-only or unreadable), running a dense pass")
+            cuts, frame_count = self._detect_cuts(video_path, out_width, out_height, 0)
+            return _scenes_from_cuts(cuts, frame_count, fps)
+
+        frame_count = len(packets)
+        candidates = candidate_frames(packets, fps)
+        before = max(int(HINT_WINDOW_SECONDS * fps), MIN_SCENE_LEN + 2)
+        windows = candidate_windows(candidates, frame_count, before=before, after=max(2, int(HINT_WINDOW_SECONDS * fps / 2)))
+        covered = sum(count for _, count in windows)
+        logger.info(f"Hinted scene detection: {len(candidates)} candidates, "
+                    f"{covered}/{frame_count} frames to decode in {len(windows)} windows")
+
+        if covered > HINT_MAX_COVERAGE * frame_count:
+            cuts, frame_count = self._detect_cuts(video_path, out_width, out_height, 0)
+            return _scenes_from_cuts(cuts, frame_count, fps)
+
+        cuts = []
+        for start, count in windows:
+            window_cuts, _ = self._detect_cuts(video_path, out_width, out_height, 0, start, count, fps)
+            cuts.extend(window_cuts)
+        return _scenes_from_cuts(merge_segment_cuts([(0, None)], [cuts]), frame_count, fps)
+
+    def _probe_packets(self, video_path: str) -> List[Tuple[float, int, bool]]:
+        """(pts in seconds, size in bytes, keyframe) per video packet, in display order; no decoding"""
+        return media_info.packets(video_path)
+
+    def _detect_cuts(self, video_path: str, width: int, height: int, frame_skip: int,
+                     start_frame: int = 0, frame_count: Optional[int] = None, fps: Optional[float] = None,
+                     threads: int = 0) -> Tuple[List[int], int]:
+        """Cut frame numbers (absolute) and number of frames read, for a frame range"""
+        step = frame_skip + 1
+        detector = ContentDetector(threshold=self.threshold, min_scene_len=MIN_SCENE_LEN)
+        recent = deque(maxlen=step + 1)
+        cuts = []
+        frames_read = 0
+
+        frames = self._read_frames(video_path, width, height, start_frame, frame_count, fps, threads)
+        for index, frame in enumerate(frames):
+            frame_num = start_frame + index
+            recent.append(frame)
+            frames_read = index + 1
+            if index % step:
+                continue
+            if detector.process_frame(frame_num, frame):
+                cuts.append(frame_num - len(recent) + 1 + _largest_change(list(recent)))
+
+        return cuts, frames_read
+
+    def _parallel_properties(self, video_path: str) -> Optional[Tuple[float, int, int, int]]:
+        """Video properties if the video is long enough for parallel detection, else None"""
+        if self.workers <= 1:
+            return None
+        try:
+            properties = self._video_properties(video_path)
+        except (ValueError, OSError):
+            return None
+        fps, frame_count = properties[:2]
+        return properties if frame_count / fps >= PARALLEL_MIN_SECONDS else None
+
+    def _video_properties(self, video_path: str) -> Tuple[float, int, int, int]:
+        """fps, frame count, width and height of the (displayed) video"""
+        info = media_info.probe(video_path)
+        fps, frame_count, width, height = info.fps, info.frame_count, info.width, info.height
+        if fps <= 0 or width <= 0 or height <= 0:
+            raise ValueError(f"Could not read video properties: {video_path}")
+        return fps, frame_count, width, height
+
+    def _read_frames(self, video_path: str, width: int, height: int, start_frame: int = 0,
+                     frame_count: Optional[int] = None, fps: Optional[float] = None,
+                     threads: int = 0) -> Iterator[np.ndarray]:
+        """
+        Frames of the video as width x height BGR images, decoded and scaled by ffmpeg
+
+        Args:
+            start_frame: First frame (needs fps); ffmpeg seeks to the keyframe
+                         before it and decodes from there
+            frame_count: Number of frames to read (None = until the end)
+            threads: ffmpeg decoder threads (0 = automatic)
+        """
+        cmd = ["ffmpeg", "-v", "error", "-threads", str(threads)]
+        if start_frame > 0:
+            # Half a frame early, so rounding never skips the first frame
+            cmd += ["-ss", f"{(start_frame - 0.5) / fps:.6f}"]
+        cmd += ["-i", video_path, "-an", "-sn", "-dn"]
+        if frame_count is not None:
+            cmd += ["-frames:v", str(frame_count)]
+        cmd += [
+            "-vf", f"scale={width}:{height}:flags=area", "-fps_mode", "passthrough",
+            "-pix_fmt", "bgr24", "-f", "rawvideo", "-"
+        ]
+        frame_size = width * height * 3
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=frame_size * 4)
+        try:
+            while True:
+                data = process.stdout.read(frame_size)
+                if len(data) < frame_size:
+                    break
+                yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+            stderr = process.stderr.read().decode(errors="replace")
+            if process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to decode {video_path}: {stderr.strip()}")
+        finally:
+            # Consumer stopped early or failed
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            process.stderr.close()
+
     def get_scene_count(self, video_path: str) -> int:
         """Get number of scenes without full detection"""
         scenes = self.detect_scenes(video_path)
         return len(scenes)
+
+def _largest_change(frames: List[np.ndarray]) -> int:
+    """Index of the frame that differs most from its predecessor (HSV, as ContentDetector)"""
+    hsv = [cv2.cvtColor(frame, cv2.COLOR_BGR2HSV).astype(np.int16) for frame in frames]
+    scores = [float(np.abs(hsv[i] - hsv[i - 1]).mean()) for i in range(1, len(hsv))]
+    return 1 + int(np.argmax(scores)) if scores else 0
+
+def _scaled_size(width: int, height: int, target_width: int) -> Tuple[int, int]:
+    """Even frame size with at most target_width, keeping the aspect ratio"""
+    out_width = max(2, min(target_width, width) // 2 * 2)
+    out_height = max(2, int(round(height * out_width / width / 2)) * 2)
+    return out_width, out_height
+
+def _scenes_from_cuts(cuts: List[int], frame_count: int, fps: float) -> List[Tuple[float, float]]:
+    boundaries = [0] + cuts + [frame_count]
+    return [
+        (start / fps, end / fps)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+
+def plan_segments(frame_count: int, segment_frames: int, workers: int) -> List[Tuple[int, Optional[int]]]:
+    """
+    Split a video into owned frame ranges (start, end); the last one is open-ended
+
+    At least one segment per worker, otherwise segments of about segment_frames.
+    The frame count from the container may be off, so the last segment reads
+    until the end of the stream.
+    """
+    count = max(workers, -(-frame_count // max(1, segment_frames)), 1)
+    size = max(1, -(-frame_count // count))
+    starts = list(range(0, max(1, frame_count), size))
+    return [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)]
+
+def merge_segment_cuts(segments: List[Tuple[int, Optional[int]]], segment_cuts: List[List[int]],
+                       min_scene_len: int = MIN_SCENE_LEN) -> List[int]:
+    """Keep each cut from the segment owning its frame, then enforce min_scene_len in order"""
+    owned = sorted({
+        cut
+        for (own_start, own_end), cuts in zip(segments, segment_cuts)
+        for cut in cuts
+        if own_start <= cut and (own_end is None or cut < own_end)
+    })
+    merged: List[int] = []
+    for cut in owned:
+        if not merged or cut - merged[-1] >= min_scene_len:
+            merged.append(cut)
+    return merged
+
+def candidate_frames(packets: List[Tuple[float, int, bool]], fps: float,
+                     size_ratio: float = HINT_SIZE_RATIO) -> List[int]:
+    """
+    Frame numbers that probably start a new shot, from (pts, size, keyframe) packets
+
+    Candidates are keyframes that break the regular GOP cadence (scene-cut
+    keyframes), keyframes much larger or smaller than their predecessor, and
+    inter frames much larger than the median of their neighbourhood.
+    """
+    if not packets:
+        return []
+    first_pts = packets[0][0]
+    frames = [int(round((pts - first_pts) * fps)) for pts, _, _ in packets]
+    sizes = np.array([size for _, size, _ in packets], dtype=np.float64)
+    keys = [i for i, (_, _, key) in enumerate(packets) if key]
+
+    candidates = set()
+    if len(keys) > 2:
+        intervals = np.diff([frames[i] for i in keys])
+        cadence = Counter(intervals.tolist()).most_common(1)[0][0]
+        for previous, key, interval in zip(keys, keys[1:], intervals):
+            if interval != cadence or not 0.5 < sizes[key] / max(1.0, sizes[previous]) < 2.0:
+                candidates.add(frames[key])
+
+    key_set = set(keys)
+    radius = max(4, int(fps))
+    inter = np.array([i not in key_set for i in range(len(packets))])
+    for i in range(1, len(packets)):
+        if not inter[i]:
+            continue
+        lo, hi = max(0, i - radius), min(len(packets), i + radius + 1)
+        neighbourhood = sizes[lo:hi][inter[lo:hi]]
+        if sizes[i] > size_ratio * max(1.0, float(np.median(neighbourhood))):
+            candidates.add(frames[i])
+
+    return sorted(candidates)
+
+def candidate_windows(candidates: List[int], frame_count: int, before: int, after: int) -> List[Tuple[int, int]]:
+    """Merged (start_frame, frame_count) decode windows around the candidates"""
+    windows: List[List[int]] = []
+    for frame in candidates:
+        start, end = max(0, frame - before), min(frame_count, frame + after + 1)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+    return [(start, end - start) for start, end in windows if end > start]
+
+def _detect_segment(video_path: str, threshold: float, frame_skip: int, width: int, height: int, fps: float,
+                    start_frame: int, frame_count: Optional[int], threads: int) -> Tuple[List[int], int]:
+    """Process pool entry point: cuts of one segment"""
+    detector = SceneDetector(threshold=threshold, frame_skip=frame_skip, workers=1)
+    return detector._detect_cuts(video_path, width, height, frame_skip, start_frame, frame_count, fps, threads)
@@ -7,26 +7,47 @@ Verwendet Interpolation und Smoothing für natürliche Bewegungen
 
 import cv2
 import json
+import os
+import shutil
+import subprocess
 import numpy as np
+import multiprocessing as mp
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
-import math
+from typing import List, Tuple, Dict, Any, Optional
+import bisect
+
+try:
+    from .media_info import media_info
+except ImportError:
+    # Als Skript / in lokalen Tests
+    from media_info import media_info
 
 class SmoothReframer:
     """
     Reframer mit sanften Übergängen zwischen ROI-Positionen
     """
     
-    def __init__(self, smoothing_factor: float = 0.3, max_movement_per_frame: float = 20.0):
+    def __init__(self, smoothing_factor: float = 0.3, max_movement_per_frame: float = 20.0,
+                 zoom: bool = False, min_scale: float = 0.6, zoom_padding: float = 1.3,
+                 max_zoom_change_per_frame: float = 0.01):
         """
         Initialisiert den Smooth Reframer
         
         Args:
             smoothing_factor: Wie stark das Smoothing ist (0.0 = kein Smoothing, 1.0 = sehr stark)
             max_movement_per_frame: Maximale Pixel-Bewegung pro Frame für Stabilität
+            zoom: Crop-Größe an die Motivgröße anpassen (Zoom) statt fester Ziel-Crop
+            min_scale: Kleinster Crop relativ zum vollen Ziel-Crop (begrenzt den Zoom)
+            zoom_padding: Rand um das Motiv, relativ zur Motivgröße
+            max_zoom_change_per_frame: Maximale Skalierungsänderung pro Frame
         """
         self.smoothing_factor = smoothing_factor
         self.max_movement_per_frame = max_movement_per_frame
+        self.zoom = zoom
+        self.min_scale = min_scale
+        self.zoom_padding = zoom_padding
+        self.max_zoom_change_per_frame = max_zoom_change_per_frame
         self.last_crop = None
         self.crop_history = []
         
@@ -55,26 +76,12 @@ class SmoothReframer:
         interpolated_crops = []
         
         for frame_idx in range(total_frames):
-            # Finde die beiden nächsten Crops
-            prev_crop = None
-            next_crop = None
-            prev_frame = None
-            next_frame = None
-            
-            # Suche vorherigen Crop
-            for i, frame_num in enumerate(frame_indices):
-                if frame_num <= frame_idx:
-                    prev_crop = crops[i]
-                    prev_frame = frame_num
-                else:
-                    break
-            
-            # Suche nächsten Crop
-            for i, frame_num in enumerate(frame_indices):
-                if frame_num > frame_idx:
-                    next_crop = crops[i]
-                    next_frame = frame_num
-                    break
+            # Finde die beiden nächsten Crops (frame_indices ist aufsteigend sortiert)
+            k = bisect.bisect_right(frame_indices, frame_idx)
+            prev_crop = crops[k - 1] if k > 0 else None
+            prev_frame = frame_indices[k - 1] if k > 0 else None
+            next_crop = crops[k] if k < len(crops) else None
+            next_frame = frame_indices[k] if k < len(crops) else None
             
             # Bestimme den Crop für diesen Frame
             if prev_crop is None and next_crop is None:
@@ -173,9 +180,13 @@ class SmoothReframer:
         return smoothed_crop
     
     def reframe_video_smooth(self, video_path: str, saliency_data_path: str, 
-                           output_path: str, target_aspect_ratio: Tuple[int, int] = (9, 16)):
+                           output_path: str, target_aspect_ratio: Tuple[int, int] = (9, 16),
+                           progress=None):
         """
         Reframed Video mit sanften Übergängen
+        
+        Args:
+            progress: Optionaler ProgressReporter, wird pro geschriebenem Frame aktualisiert
         """
         print(f"🎬 Smooth Reframing...")
         print(f"   Smoothing Factor: {self.smoothing_factor}")
@@ -190,36 +201,59 @@ class SmoothReframer:
         if not cap.isOpened():
             raise ValueError(f"Could not open video: {video_path}")
         
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps, width, height, total_frames = _read_video_props(video_path)
         
         # Berechne Crop-Größe für Ziel-Aspect Ratio
-        roi_width = int(height * target_aspect_ratio[0] / target_aspect_ratio[1])
-        roi_height = height
-        
-        if roi_width > width:
-            roi_width = width
-            roi_height = int(width * target_aspect_ratio[1] / target_aspect_ratio[0])
+        roi_width, roi_height = _target_crop_size(width, height, target_aspect_ratio)
         
         print(f"   Original: {width}x{height}")
         print(f"   Ziel-Crop: {roi_width}x{roi_height}")
         print(f"   Aspect Ratio: {roi_width/roi_height:.3f}")
         
         # Erstelle Video Writer
-        # Try H.264 first, fallback to mp4v
-        fourcc = cv2.VideoWriter_fourcc(*'H264')  # H.264 codec for browser compatibility
-        out = cv2.VideoWriter(output_path, fourcc, fps, (roi_width, roi_height))
+        out = _open_video_writer(output_path, fps, (roi_width, roi_height))
         
-        if not out.isOpened():
-            print(f"⚠️  Could not open H.264 codec, trying mp4v...")
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (roi_width, roi_height))
+        # Interpoliere Crops für alle Frames
+        interpolated_crops = self.compute_crop_path(data, total_frames, (width, height),
+                                                    (roi_width, roi_height))
         
-        if not out.isOpened():
-            raise ValueError(f"Could not create video writer: {output_path}")
+        # Verarbeite alle Frames
+        if progress is not None:
+            progress.set_stage("rendering", total_frames)
         
+        import tqdm
+        with tqdm.tqdm(total=total_frames, desc='Smooth reframing') as pbar:
+            if progress is not None:
+                def on_frame(n):
+                    pbar.update(n)
+                    progress.advance(n)
+            else:
+                on_frame = pbar.update
+            
+            _render_frames(cap, out, interpolated_crops, 0, total_frames,
+                           (width, height), (roi_width, roi_height), on_frame)
+        
+        cap.release()
+        out.release()
+        
+        # Analysiere Crop-Bewegung
+        self._analyze_crop_movement(interpolated_crops)
+        
+        self._report_output(output_path, roi_width, roi_height)
+        
+        return output_path
+    
+    def compute_crop_path(self, data: Dict[str, Any], total_frames: int,
+                          frame_size: Optional[Tuple[int, int]] = None,
+                          roi_size: Optional[Tuple[int, int]] = None) -> np.ndarray:
+        """
+        Berechnet den geglätteten Crop-Pfad (x, y, w, h) für alle Frames
+        
+        Der Pfad wird einmal global berechnet, da das Smoothing vom
+        vorherigen Crop abhängt und daher nicht pro Segment startbar ist.
+        Mit zoom=True (und frame_size/roi_size) entsteht ein Float-Pfad mit
+        variabler, am Ziel-Seitenverhältnis ausgerichteter Crop-Größe.
+        """
         # Sammle alle ROIs
         crops = []
         frame_indices = []
@@ -235,49 +269,163 @@ class SmoothReframer:
         
         print(f"   Verfügbare ROIs: {len(crops)}")
         
+        if self.zoom and frame_size is not None and roi_size is not None and crops:
+            print("   Berechne Zoom-Pfad...")
+            return self._compute_zoom_path(crops, frame_indices, total_frames, frame_size, roi_size)
+        
         # Interpoliere Crops für alle Frames
         print("   Interpoliere Crops...")
+        self.last_crop = None
+        self.crop_history = []
         interpolated_crops = self.interpolate_crops(crops, frame_indices, total_frames)
         
-        # Verarbeite alle Frames
-        frame_idx = 0
+        return np.asarray(interpolated_crops, dtype=np.int32).reshape(-1, 4)
+    
+    def _compute_zoom_path(self, crops: List[Tuple[int, int, int, int]], frame_indices: List[int],
+                           total_frames: int, frame_size: Tuple[int, int],
+                           roi_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Crop-Pfad aus Motiv-Mittelpunkt und geglätteter Skalierung
         
-        import tqdm
-        with tqdm.tqdm(total=total_frames, desc='Smooth reframing') as pbar:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Verwende interpolierten Crop
-                crop = interpolated_crops[frame_idx]
-                x, y, w, h = crop
-                
-                # Sicherheitsprüfung
-                x = max(0, min(x, width - w))
-                y = max(0, min(y, height - h))
-                w = min(w, width - x)
-                h = min(h, height - y)
-                
-                cropped_frame = frame[y:y+h, x:x+w]
-                
-                # Stelle sicher, dass das Frame die richtige Größe hat
-                if cropped_frame.shape[:2] != (roi_height, roi_width):
-                    cropped_frame = cv2.resize(cropped_frame, (roi_width, roi_height))
-                
-                # Schreibe Frame
-                out.write(cropped_frame)
-                
-                frame_idx += 1
-                pbar.update(1)
+        Die Skalierung folgt der Motivgröße (mit zoom_padding Rand), begrenzt
+        auf [min_scale, 1.0] des vollen Ziel-Crops. Interpolation zwischen den
+        Samples ist vektorisiert, nur das rekursive Smoothing läuft pro Frame.
+        """
+        width, height = frame_size
+        roi_width, roi_height = roi_size
+        
+        samples = np.asarray(crops, dtype=np.float64)
+        centers_x = samples[:, 0] + samples[:, 2] / 2
+        centers_y = samples[:, 1] + samples[:, 3] / 2
+        scales = np.maximum(samples[:, 2] / roi_width, samples[:, 3] / roi_height) * self.zoom_padding
+        scales = np.clip(scales, self.min_scale, 1.0)
+        
+        # Interpolation mit Easing zwischen den umliegenden Samples
+        sample_frames = np.asarray(frame_indices, dtype=np.float64)
+        frames = np.arange(total_frames, dtype=np.float64)
+        k = np.searchsorted(sample_frames, frames, side='right')
+        prev_idx = np.clip(k - 1, 0, len(samples) - 1)
+        next_idx = np.clip(k, 0, len(samples) - 1)
+        span = sample_frames[next_idx] - sample_frames[prev_idx]
+        t = np.divide(frames - sample_frames[prev_idx], span, out=np.zeros_like(frames), where=span > 0)
+        t = np.clip(t, 0.0, 1.0)
+        t = np.where(t < 0.5, 4 * t ** 3, 1 + (2 * t - 2) ** 3 / 2)
+        
+        def interpolate(values):
+            return values[prev_idx] + (values[next_idx] - values[prev_idx]) * t
+        
+        target_cx = interpolate(centers_x)
+        target_cy = interpolate(centers_y)
+        target_scale = interpolate(scales)
+        
+        # Rekursives Smoothing wie in _apply_smoothing, plus Skalierung
+        path = np.empty((total_frames, 4), dtype=np.float32)
+        max_move = self.max_movement_per_frame
+        max_zoom = self.max_zoom_change_per_frame
+        cx, cy, scale = target_cx[0], target_cy[0], target_scale[0]
+        
+        for i in range(total_frames):
+            if i > 0:
+                cx += max(-max_move, min(max_move, target_cx[i] - cx)) * self.smoothing_factor
+                cy += max(-max_move, min(max_move, target_cy[i] - cy)) * self.smoothing_factor
+                scale += max(-max_zoom, min(max_zoom, target_scale[i] - scale))
+            
+            w = roi_width * scale
+            h = roi_height * scale
+            path[i, 0] = min(max(cx - w / 2, 0.0), width - w)
+            path[i, 1] = min(max(cy - h / 2, 0.0), height - h)
+            path[i, 2] = w
+            path[i, 3] = h
+        
+        return path
+    
+    def reframe_video_parallel(self, video_path: str, saliency_data_path: str,
+                               output_path: str, target_aspect_ratio: Tuple[int, int] = (9, 16),
+                               max_workers: Optional[int] = None,
+                               scene_boundaries: Optional[List[float]] = None,
+                               progress=None):
+        """
+        Reframed Video segmentweise parallel über mehrere CPU-Kerne
         
-        cap.release()
-        out.release()
+        Der Crop-Pfad wird global berechnet, das Video an Szenengrenzen bzw.
+        Keyframes in Segmente geteilt, jedes Segment in einem eigenen Prozess
+        gerendert und die Segmente anschließend verlustfrei (-c copy) verbunden.
         
-        # Analysiere Crop-Bewegung
-        self._analyze_crop_movement(interpolated_crops)
+        Args:
+            max_workers: Anzahl Worker-Prozesse (Default: REFRAME_MAX_WORKERS bzw. CPU-Kerne)
+            scene_boundaries: Optionale Szenengrenzen in Sekunden als Schnittpunkte
+            progress: Optionaler ProgressReporter; die Worker zählen gerenderte Frames
+                in einen gemeinsamen Zähler, den der Hauptprozess laufend abfragt
+        """
+        print("🎬 Parallel Smooth Reframing...")
         
-        # Prüfe Ausgabedatei
+        with open(saliency_data_path, 'r') as f:
+            data = json.load(f)
+        
+        fps, width, height, total_frames = _read_video_props(video_path)
+        
+        roi_size = _target_crop_size(width, height, target_aspect_ratio)
+        crop_path = self.compute_crop_path(data, total_frames, (width, height), roi_size)
+        
+        if max_workers is None:
+            max_workers = int(os.getenv('REFRAME_MAX_WORKERS', '0')) or (os.cpu_count() or 1)
+        
+        # Schnittpunkte: Szenengrenzen bevorzugt, sonst Keyframes (GOP-Grenzen)
+        if scene_boundaries:
+            split_points = [int(round(t * fps)) for t in scene_boundaries]
+        else:
+            split_points = _probe_keyframe_indices(video_path, fps)
+        
+        segments = plan_segments(total_frames, max_workers, split_points)
+        print(f"   Segmente: {len(segments)} auf {min(max_workers, len(segments))} Prozessen")
+        
+        if len(segments) <= 1:
+            return self.reframe_video_smooth(video_path, saliency_data_path, output_path,
+                                             target_aspect_ratio, progress=progress)
+        
+        output = Path(output_path)
+        segment_dir = output.parent / f".segments_{output.stem}"
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            tasks = []
+            for index, (start, end) in enumerate(segments):
+                segment_path = str(segment_dir / f"segment_{index:04d}{output.suffix}")
+                tasks.append((video_path, segment_path, crop_path[start:end], start, end,
+                              fps, (width, height), roi_size))
+            
+            if progress is not None:
+                progress.set_stage("rendering", total_frames)
+            
+            ctx = mp.get_context("spawn")
+            # Gemeinsamer Frame-Zähler, geht per Initializer an die Worker
+            frame_counter = ctx.Value('q', 0) if progress is not None else None
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks)), mp_context=ctx,
+                                     initializer=_init_render_worker,
+                                     initargs=(frame_counter,)) as executor:
+                pending = {executor.submit(_render_segment_worker, task) for task in tasks}
+                while pending:
+                    done, pending = wait(pending, timeout=PROGRESS_POLL_SECONDS,
+                                         return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        future.result()
+                    if frame_counter is not None:
+                        progress.advance(frame_counter.value - progress.processed)
+            segment_paths = [task[1] for task in tasks]
+            
+            _concat_segments(segment_paths, output_path)
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+        
+        self._analyze_crop_movement(crop_path)
+        self._report_output(output_path, roi_size[0], roi_size[1])
+        
+        return output_path
+    
+    def _report_output(self, output_path: str, roi_width: int, roi_height: int):
+        """
+        Prüft die Ausgabedatei und gibt eine Zusammenfassung aus
+        """
         if Path(output_path).exists():
             file_size = Path(output_path).stat().st_size / (1024 * 1024)  # MB
             print(f"\\n✅ Smooth Reframed Video generiert: {output_path}")
@@ -291,36 +439,372 @@ class SmoothReframer:
                 print("⚠️  Video ist sehr klein - möglicherweise noch ein Problem")
         else:
             print(f"\\n❌ Fehler beim Generieren des Videos")
-        
-        return output_path
     
-    def _analyze_crop_movement(self, crops: List[Tuple[int, int, int, int]]):
+    def _analyze_crop_movement(self, crops) -> Dict[str, Any]:
         """
         Analysiert die Bewegung der Crops für Debugging
+        
+        Returns:
+            Bewegungsstatistiken (Pixel pro Frame)
         """
         if len(crops) < 2:
-            return
+            return {}
         
-        movements = []
-        for i in range(1, len(crops)):
-            prev_crop = crops[i-1]
-            curr_crop = crops[i]
-            
-            dx = curr_crop[0] - prev_crop[0]
-            dy = curr_crop[1] - prev_crop[1]
-            movement = math.sqrt(dx*dx + dy*dy)
-            movements.append(movement)
-        
-        if movements:
-            avg_movement = sum(movements) / len(movements)
-            max_movement = max(movements)
-            min_movement = min(movements)
+        stats = crop_movement_stats(crops)
+        
+        print("\\n📊 Crop-Bewegungsanalyse:")
+        print(f"   Durchschnittliche Bewegung: {stats['avg_movement']:.1f}px pro Frame")
+        print(f"   Maximale Bewegung: {stats['max_movement']:.1f}px")
+        print(f"   Minimale Bewegung: {stats['min_movement']:.1f}px")
+        print(f"   Frames mit Bewegung > 10px: {stats['frames_over_10px']}")
+        
+        return stats
+    
+    def export_crop_path(self, video_path: str, saliency_data_path: str,
+                         target_aspect_ratio: Tuple[int, int] = (9, 16),
+                         changes_only: bool = False) -> Dict[str, Any]:
+        """
+        Berechnet den Crop-Pfad ohne Video zu rendern
+        
+        Es werden nur die Video-Metadaten gelesen, keine Frames dekodiert.
+        
+        Args:
+            changes_only: Nur Frames ausgeben, in denen sich der Crop ändert
             
-            print(f"\\n📊 Crop-Bewegungsanalyse:")
-            print(f"   Durchschnittliche Bewegung: {avg_movement:.1f}px pro Frame")
-            print(f"   Maximale Bewegung: {max_movement:.1f}px")
-            print(f"   Minimale Bewegung: {min_movement:.1f}px")
-            print(f"   Frames mit Bewegung > 10px: {sum(1 for m in movements if m > 10)}")
+        Returns:
+            Kompakter Pfad als Zeilen [t_ms, x, y, w, h] plus Bewegungsstatistiken
+        """
+        with open(saliency_data_path, 'r') as f:
+            data = json.load(f)
+        
+        fps, width, height, total_frames = _read_video_props(video_path)
+        roi_width, roi_height = _target_crop_size(width, height, target_aspect_ratio)
+        crop_path = self.compute_crop_path(data, total_frames, (width, height),
+                                           (roi_width, roi_height))
+        
+        frames = np.arange(len(crop_path))
+        if changes_only and len(crop_path) > 1:
+            changed = np.any(crop_path[1:] != crop_path[:-1], axis=1)
+            frames = np.concatenate(([0], np.nonzero(changed)[0] + 1))
+        
+        times_ms = np.round(frames * 1000.0 / fps).astype(np.int64) if fps > 0 else frames
+        if np.issubdtype(crop_path.dtype, np.integer):
+            rows = np.column_stack((times_ms, crop_path[frames])).tolist()
+        else:
+            rows = [[t] + values for t, values in zip(times_ms.tolist(), np.round(crop_path[frames].astype(np.float64), 2).tolist())]
+        
+        return {
+            "fps": fps,
+            "frame_count": total_frames,
+            "width": width,
+            "height": height,
+            "output_width": roi_width,
+            "output_height": roi_height,
+            "fields": ["t_ms", "x", "y", "w", "h"],
+            "path": rows,
+            "stats": crop_movement_stats(crop_path)
+        }
+    
+    def render_preview(self, video_path: str, saliency_data_path: str, output_path: str,
+                       target_aspect_ratio: Tuple[int, int] = (9, 16),
+                       start_time: float = 0.0, end_time: Optional[float] = None,
+                       preview_height: int = 360) -> str:
+        """
+        Rendert eine niedrig aufgelöste Proxy-Vorschau für einen Zeitbereich
+        
+        Der Crop-Pfad wird wie beim vollen Rendern global berechnet, dekodiert
+        und kodiert wird aber nur der gewünschte Bereich in Vorschau-Auflösung.
+        """
+        with open(saliency_data_path, 'r') as f:
+            data = json.load(f)
+        
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        
+        fps, width, height, total_frames = _read_video_props(video_path)
+        
+        roi_width, roi_height = _target_crop_size(width, height, target_aspect_ratio)
+        scale = min(1.0, preview_height / roi_height)
+        # Gerade Maße für Encoder-Kompatibilität
+        preview_size = (max(2, int(roi_width * scale) // 2 * 2), max(2, int(roi_height * scale) // 2 * 2))
+        
+        crop_path = self.compute_crop_path(data, total_frames, (width, height),
+                                           (roi_width, roi_height))
+        
+        start_frame = max(0, min(total_frames, int(start_time * fps)))
+        end_frame = total_frames if end_time is None else max(start_frame, min(total_frames, int(end_time * fps)))
+        
+        if start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        
+        out = _open_video_writer(output_path, fps, preview_size)
+        try:
+            _render_frames(cap, out, crop_path[start_frame:end_frame], start_frame, end_frame,
+                           (width, height), preview_size)
+        finally:
+            cap.release()
+            out.release()
+        
+        return output_path
+
+def crop_movement_stats(crops) -> Dict[str, Any]:
+    """
+    Bewegungsstatistiken eines Crop-Pfads (Pixel pro Frame)
+    """
+    path = np.asarray(crops, dtype=np.float64).reshape(-1, 4)
+    if len(path) < 2:
+        return {}
+    
+    movements = np.hypot(np.diff(path[:, 0]), np.diff(path[:, 1]))
+    
+    return {
+        "avg_movement": float(movements.mean()),
+        "max_movement": float(movements.max()),
+        "min_movement": float(movements.min()),
+        "frames_over_10px": int(np.count_nonzero(movements > 10))
+    }
+
+def _read_video_props(video_path: str) -> Tuple[float, int, int, int]:
+    """
+    Liest fps, Breite, Höhe (angezeigt, Rotation berücksichtigt) und Frame-Anzahl
+    aus dem gecachten Probe, ohne Frames zu dekodieren
+    """
+    info = media_info.probe(video_path)
+    return info.fps, info.width, info.height, info.frame_count
+
+def _target_crop_size(width: int, height: int, target_aspect_ratio: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Berechnet die Crop-Größe für das Ziel-Seitenverhältnis
+    """
+    roi_width = int(height * target_aspect_ratio[0] / target_aspect_ratio[1])
+    roi_height = height
+    
+    if roi_width > width:
+        roi_width = width
+        roi_height = int(width * target_aspect_ratio[1] / target_aspect_ratio[0])
+    
+    return roi_width, roi_height
+
+def _open_video_writer(output_path: str, fps: float, size: Tuple[int, int]) -> cv2.VideoWriter:
+    """
+    Öffnet einen Video Writer (H.264 bevorzugt, mp4v als Fallback)
+    """
+    fourcc = cv2.VideoWriter_fourcc(*'H264')  # H.264 codec for browser compatibility
+    out = cv2.VideoWriter(output_path, fourcc, fps, size)
+    
+    if not out.isOpened():
+        print("⚠️  Could not open H.264 codec, trying mp4v...")
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(output_path, fourcc, fps, size)
+    
+    if not out.isOpened():
+        raise ValueError(f"Could not create video writer: {output_path}")
+    
+    return out
+
+def crop_affines(crops: np.ndarray, frame_size: Tuple[int, int],
+                 roi_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Berechnet für alle Frames die (inverse) affine Abbildung Ausgabe -> Quelle
+    
+    Crop und Skalierung werden so in einem einzigen warpAffine pro Frame
+    erledigt. Die Abbildung entspricht cv2.resize (Pixelmitten-Ausrichtung).
+    
+    Returns:
+        Array der Form (N, 2, 3) für cv2.warpAffine mit WARP_INVERSE_MAP
+    """
+    width, height = frame_size
+    roi_width, roi_height = roi_size
+    path = np.asarray(crops, dtype=np.float64).reshape(-1, 4)
+    
+    # Sicherheitsprüfung (vektorisiert)
+    w = np.clip(path[:, 2], 1, width)
+    h = np.clip(path[:, 3], 1, height)
+    x = np.clip(path[:, 0], 0, width - w)
+    y = np.clip(path[:, 1], 0, height - h)
+    
+    scale_x = w / roi_width
+    scale_y = h / roi_height
+    
+    affines = np.zeros((len(path), 2, 3), dtype=np.float64)
+    affines[:, 0, 0] = scale_x
+    affines[:, 0, 2] = x + 0.5 * scale_x - 0.5
+    affines[:, 1, 1] = scale_y
+    affines[:, 1, 2] = y + 0.5 * scale_y - 0.5
+    return affines
+
+def _render_frames(cap: cv2.VideoCapture, out: cv2.VideoWriter, crops: np.ndarray,
+                   start_frame: int, end_frame: int, frame_size: Tuple[int, int],
+                   roi_size: Tuple[int, int], on_frame=None) -> int:
+    """
+    Liest Frames [start_frame, end_frame) aus cap, croppt sie und schreibt sie nach out
+    
+    crops ist relativ zu start_frame indiziert. Gibt die Anzahl geschriebener Frames zurück.
+    Crops in Zielgröße werden direkt kopiert, alle anderen per warpAffine
+    skaliert; beides schreibt in einen einmal allokierten Ausgabepuffer.
+    """
+    roi_width, roi_height = roi_size
+    affines = crop_affines(crops, frame_size, roi_size)
+    last_index = len(affines) - 1
+    
+    # Reine Ausschnitte (Skalierung 1, ganzzahliger Offset) brauchen keine Interpolation
+    offsets = affines[:, :, 2]
+    direct = (np.all(affines[:, [0, 1], [0, 1]] == 1.0, axis=1) &
+              np.all(offsets == np.round(offsets), axis=1))
+    offsets = offsets.astype(np.int64)
+    
+    output_buffer = None
+    frame_idx = start_frame
+    
+    while frame_idx < end_frame:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        
+        if output_buffer is None:
+            output_buffer = np.empty((roi_height, roi_width) + frame.shape[2:], dtype=frame.dtype)
+        
+        # Verwende interpolierten Crop
+        index = min(frame_idx - start_frame, last_index)
+        if direct[index]:
+            x, y = offsets[index]
+            np.copyto(output_buffer, frame[y:y+roi_height, x:x+roi_width])
+        else:
+            cv2.warpAffine(frame, affines[index], (roi_width, roi_height), dst=output_buffer,
+                           flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                           borderMode=cv2.BORDER_REPLICATE)
+        
+        # Schreibe Frame
+        out.write(output_buffer)
+        
+        frame_idx += 1
+        if on_frame is not None:
+            on_frame(1)
+    
+    return frame_idx - start_frame
+
+# Abfrageintervall des Hauptprozesses für den Frame-Zähler (Sekunden)
+PROGRESS_POLL_SECONDS = 0.5
+# Worker schreiben gesammelt alle N Frames in den Zähler (spart Lock-Zugriffe)
+FRAME_COUNTER_BATCH = 10
+
+# Frame-Zähler des Worker-Prozesses, gesetzt von _init_render_worker
+_frame_counter = None
+
+def _init_render_worker(frame_counter):
+    """
+    Pool-Initializer: merkt sich den gemeinsamen Frame-Zähler (oder None)
+    
+    Ein mp.Value lässt sich nicht mit submit() übergeben, nur beim Start
+    des Prozesses.
+    """
+    global _frame_counter
+    _frame_counter = frame_counter
+
+def _add_rendered_frames(n: int):
+    """Erhöht den gemeinsamen Frame-Zähler um n"""
+    with _frame_counter.get_lock():
+        _frame_counter.value += n
+
+def _render_segment_worker(task) -> str:
+    """
+    Rendert ein Segment in einem Worker-Prozess (für ProcessPoolExecutor)
+    
+    Gerenderte Frames werden, falls gesetzt, in Blöcken von
+    FRAME_COUNTER_BATCH in den gemeinsamen Frame-Zähler geschrieben.
+    """
+    video_path, segment_path, crops, start_frame, end_frame, fps, frame_size, roi_size = task
+    
+    # Ein Thread pro Prozess, die Parallelität kommt aus den Segmenten
+    cv2.setNumThreads(1)
+    
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+    
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    
+    unreported = 0
+    
+    def count_frames(n):
+        nonlocal unreported
+        unreported += n
+        if unreported >= FRAME_COUNTER_BATCH:
+            _add_rendered_frames(unreported)
+            unreported = 0
+    
+    out = _open_video_writer(segment_path, fps, roi_size)
+    try:
+        _render_frames(cap, out, crops, start_frame, end_frame, frame_size, roi_size,
+                       on_frame=count_frames if _frame_counter is not None else None)
+    finally:
+        cap.release()
+        out.release()
+        if unreported:
+            _add_rendered_frames(unreported)
+    
+    return segment_path
+
+def plan_segments(total_frames: int, num_segments: int, split_points: List[int],
+                  min_segment_frames: int = 48) -> List[Tuple[int, int]]:
+    """
+    Teilt [0, total_frames) in bis zu num_segments Bereiche
+    
+    Für jede gleichmäßige Zielgrenze wird der nächstgelegene Schnittpunkt
+    (Szenengrenze oder Keyframe) gewählt, damit Worker exakt und ohne
+    Vor-Dekodierung einsteigen können. Ohne Schnittpunkte wird gleichmäßig geteilt.
+    
+    Returns:
+        Liste von (start_frame, end_frame) Bereichen
+    """
+    if num_segments <= 1 or total_frames < 2 * min_segment_frames:
+        return [(0, total_frames)]
+    
+    candidates = sorted({p for p in split_points if min_segment_frames <= p <= total_frames - min_segment_frames})
+    
+    boundaries = [0]
+    for i in range(1, num_segments):
+        target = total_frames * i / num_segments
+        best = min(candidates, key=lambda p: abs(p - target)) if candidates else int(target)
+        if best - boundaries[-1] >= min_segment_frames and total_frames - best >= min_segment_frames:
+            boundaries.append(best)
+    boundaries.append(total_frames)
+    
+    return [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)]
+
+def _probe_keyframe_indices(video_path: str, fps: float) -> List[int]:
+    """
+    Liest Keyframe-Positionen (Frame-Indizes) aus den Paket-Flags, ohne zu dekodieren
+    (gecachter Paket-Scan, geteilt mit der Szenenerkennung)
+    """
+    keyframes = {int(round(pts * fps)) for pts, _, key in media_info.packets(video_path) if key}
+    if not keyframes:
+        print(f"⚠️  Keyframe probe found no keyframes: {video_path}")
+    return sorted(keyframes)
+
+def _concat_segments(segment_paths: List[str], output_path: str):
+    """
+    Fügt gerenderte Segmente verlustfrei mit dem ffmpeg concat demuxer zusammen
+    """
+    list_path = Path(output_path).with_suffix('.segments.txt')
+    with open(list_path, 'w') as f:
+        for segment_path in segment_paths:
+            f.write(f"file '{Path(segment_path).resolve()}'\n")
+    
+    try:
+        subprocess.run([
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0",
+            "-i", str(list_path),
+            "-c", "copy",
+            output_path
+        ], check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Segment concatenation failed: {e.stderr}")
+    finally:
+        list_path.unlink(missing_ok=True)
 
 def main():
     """Teste Smooth Reframing"""
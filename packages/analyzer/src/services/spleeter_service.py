@@ -1,11 +1,23 @@
 import os
+import shutil
 import subprocess
+import threading
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
+
+from .audio_extractor import audio_extractor, write_wav
+from .demucs_engine import demucs_engine
 
 logger = logging.getLogger(__name__)
 
+# Zuordnung Stem-Typ -> Demucs-Quelle (Two-Stems: vocals / no_vocals)
+TWO_STEM_SOURCES = {
+    'vocals': 'vocals',
+    'music': 'no_vocals',
+    'accompaniment': 'no_vocals'
+}
+
 class SpleeterService:
     """Service für Audio-Stem-Separierung mit Spleeter (macOS-optimiert)"""
     
@@ -54,22 +66,19 @@ class SpleeterService:
         results = {}
         
         try:
-            # Extrahiere Audio-Segment zuerst
-            audio_segment_path = self._extract_audio_segment(
-                video_path, start_time, end_time, output_dir
-            )
-            
             # Generiere verschiedene Stems
-            for stem_type in stem_types:
-                if stem_type == 'original':
-                    # Original-Audio Segment
-                    results[stem_type] = audio_segment_path
-                else:
-                    # Separierte Stems mit Spleeter
-                    stem_path = self._separate_stem_with_spleeter(
-                        audio_segment_path, stem_type, output_dir, video_id, scene_id
-                    )
-                    results[stem_type] = stem_path
+            if 'original' in stem_types:
+                # Original-Audio Segment
+                results['original'] = self._extract_audio_segment(
+                    video_path, start_time, end_time, output_dir
+                )
+            
+            # Separierte Stems mit Demucs (alle aus einem Forward-Pass)
+            separated_stems = [stem_type for stem_type in stem_types if stem_type != 'original']
+            if separated_stems:
+                results.update(self._separate_stems_with_demucs(
+                    video_path, start_time, end_time, separated_stems, output_dir, video_id, scene_id
+                ))
                     
             logger.info(f"✅ Spleeter audio separation completed. Generated {len(results)} stems")
             return results
@@ -78,6 +87,80 @@ class SpleeterService:
             logger.error(f"❌ Spleeter audio separation failed: {e}")
             raise
             
+    def separate_track_by_scenes(
+        self,
+        video_path: str,
+        video_id: str,
+        scenes: List[Dict[str, Any]],
+        stem_types: List[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        on_progress=None
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Separiert die komplette Tonspur einmal und schneidet die Stems an Szenengrenzen
+        
+        Die Separierung läuft chunkweise mit Überblendung (Speicher unabhängig
+        von der Videolänge) und kann zwischen zwei Chunks über cancel_event
+        abgebrochen werden. Die Szenen-Dateien entsprechen denen des Szenen-Modus.
+        
+        Args:
+            video_path: Pfad zur Video-Datei
+            video_id: Video-ID
+            scenes: Szenen mit id, start_time und end_time
+            stem_types: Liste der zu generierenden Stem-Typen
+            cancel_event: Optionales Abbruch-Signal
+            on_progress: Optional callback(processed_frames, total_frames)
+            
+        Returns:
+            Dictionary Scene-ID -> {Stem-Typ: Dateipfad}
+        """
+        if stem_types is None:
+            stem_types = ['vocals', 'music', 'original']
+        
+        audio = audio_extractor.load(video_path)
+        separated_stems = [stem_type for stem_type in stem_types if stem_type != 'original']
+        sources = {stem_type: TWO_STEM_SOURCES.get(stem_type, 'vocals') for stem_type in separated_stems}
+        
+        # Rohe Stems der ganzen Tonspur, nach dem Schneiden wieder entfernt
+        track_dir = self.output_base_dir / video_id / ".track"
+        track_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            tracks = {}
+            if sources:
+                logger.info(f"🎵 Separating full track ({audio.duration:.1f}s) into {sorted(set(sources.values()))}")
+                tracks = demucs_engine.separate_track(
+                    audio.samples, audio.sample_rate,
+                    {source: str(track_dir / f"{source}.pcm") for source in sorted(set(sources.values()))},
+                    cancel_event=cancel_event,
+                    on_progress=on_progress
+                )
+            
+            results = {}
+            for scene in scenes:
+                scene_id = str(scene['id'])
+                start_time, end_time = scene['start_time'], scene['end_time']
+                output_dir = self.output_base_dir / video_id / scene_id
+                output_dir.mkdir(parents=True, exist_ok=True)
+                
+                start = min(audio.frame_count, max(0, int(round(start_time * audio.sample_rate))))
+                end = min(audio.frame_count, max(start, int(round(end_time * audio.sample_rate))))
+                
+                scene_stems = {}
+                if 'original' in stem_types:
+                    scene_stems['original'] = self._extract_audio_segment(video_path, start_time, end_time, output_dir)
+                for stem_type, source in sources.items():
+                    stem_path = output_dir / f"{video_id}_{scene_id}_{stem_type}.wav"
+                    scene_stems[stem_type] = write_wav(str(stem_path), tracks[source][start:end], audio.sample_rate)
+                
+                results[scene_id] = scene_stems
+            
+            logger.info(f"✅ Track separation completed for {len(results)} scenes")
+            return results
+        
+        finally:
+            shutil.rmtree(track_dir, ignore_errors=True)
+            
     def _extract_audio_segment(
         self, 
         video_path: str, 
@@ -85,94 +168,54 @@ class SpleeterService:
         end_time: float, 
         output_dir: Path
     ) -> str:
-        """Extrahiert Audio-Segment mit FFmpeg"""
+        """Schreibt Audio-Segment aus dem einmal dekodierten Audio des Videos"""
         
-        duration = end_time - start_time
         audio_segment_path = output_dir / f"segment_{start_time:.3f}_{end_time:.3f}.wav"
         
-        cmd = [
-            "ffmpeg", "-i", video_path,
-            "-ss", str(start_time),
-            "-t", str(duration),
-            "-vn", "-acodec", "pcm_s16le",
-            "-ar", "44100", "-ac", "2",
-            str(audio_segment_path), "-y"
-        ]
-        
-        logger.info(f"🎵 Extracting audio segment: {' '.join(cmd)}")
-        
-        try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            logger.info("✅ Audio segment extraction successful")
-            return str(audio_segment_path)
-        except subprocess.CalledProcessError as e:
-            logger.error(f"❌ FFmpeg error: {e.stderr}")
-            raise
+        audio_extractor.load(video_path).write_wav(str(audio_segment_path), start_time, end_time)
+        logger.info(f"✅ Audio segment extracted: {audio_segment_path}")
+        return str(audio_segment_path)
             
-    def _separate_stem_with_spleeter(
+    def _separate_stems_with_demucs(
         self, 
-        audio_path: str, 
-        stem_type: str, 
+        video_path: str, 
+        start_time: float, 
+        end_time: float, 
+        stem_types: List[str], 
         output_dir: Path,
         video_id: str,
         scene_id: Optional[str]
-    ) -> str:
-        """Separiert spezifischen Stem mit Demucs (moderne Alternative zu Spleeter)"""
+    ) -> Dict[str, str]:
+        """Separiert Stems mit Demucs (moderne Alternative zu Spleeter), Modell bleibt geladen"""
         
-        # Output-Pfad für diesen Stem
-        if scene_id:
-            stem_filename = f"{video_id}_{scene_id}_{stem_type}.wav"
-        else:
-            stem_filename = f"{video_id}_full_{stem_type}.wav"
-            
-        stem_path = output_dir / stem_filename
+        outputs = {}
+        for stem_type in stem_types:
+            # Output-Pfad für diesen Stem
+            if scene_id:
+                stem_filename = f"{video_id}_{scene_id}_{stem_type}.wav"
+            else:
+                stem_filename = f"{video_id}_full_{stem_type}.wav"
+            outputs[stem_type] = output_dir / stem_filename
+        
+        # Demucs liefert vocals und no_vocals (Summe der übrigen Quellen)
+        sources = {stem_type: TWO_STEM_SOURCES.get(stem_type, 'vocals') for stem_type in stem_types}
         
-        # Verwende Demucs für hochwertige Audio-Separierung
-        cmd = [
-            "python3", "-m", "demucs.separate",
-            "-n", "htdemucs",  # Hybrid Transformer Demucs Modell
-            "--two-stems", "vocals",  # Nur Vocals und Instrumentals trennen
-            "-o", str(output_dir),
-            audio_path
-        ]
+        audio = audio_extractor.load(video_path)
+        segment = audio.slice(start_time, end_time)
         
-        logger.info(f"🎵 Separating {stem_type} stem with Demucs: {' '.join(cmd)}")
+        logger.info(f"🎵 Separating {stem_types} with resident Demucs model ({demucs_engine.model_name})")
         
         try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            
-            # Demucs erstellt ein Unterverzeichnis mit dem Modellnamen
-            audio_filename = Path(audio_path).stem
-            demucs_output_dir = output_dir / "htdemucs" / audio_filename
+            separated = demucs_engine.separate(segment, audio.sample_rate, sorted(set(sources.values())))
             
-            if demucs_output_dir.exists():
-                # Demucs erstellt vocals.wav und no_vocals.wav
-                if stem_type == 'vocals':
-                    source_file = demucs_output_dir / "vocals.wav"
-                elif stem_type == 'music':
-                    source_file = demucs_output_dir / "no_vocals.wav"
-                else:
-                    # Für andere Stems, verwende vocals als Fallback
-                    source_file = demucs_output_dir / "vocals.wav"
+            stem_paths = {}
+            for stem_type, source in sources.items():
+                stem_paths[stem_type] = write_wav(str(outputs[stem_type]), separated[source], demucs_engine.sample_rate)
+                logger.info(f"✅ {stem_type} stem created: {stem_paths[stem_type]}")
+            return stem_paths
                 
-                if source_file.exists():
-                    # Kopiere die Datei an den gewünschten Ort
-                    import shutil
-                    shutil.copy2(source_file, stem_path)
-                    logger.info(f"✅ {stem_type} stem created: {stem_path}")
-                    return str(stem_path)
-                else:
-                    logger.error(f"❌ Demucs output file not found: {source_file}")
-                    raise FileNotFoundError(f"Demucs output file not found: {source_file}")
-            else:
-                logger.error(f"❌ Demucs output directory not found: {demucs_output_dir}")
-                raise FileNotFoundError(f"Demucs output directory not found: {demucs_output_dir}")
-                
-        except subprocess.CalledProcessError as e:
-            logger.error(f"❌ Demucs error: {e.stderr}")
-            raise
         except Exception as e:
-            logger.error(f"❌ Error processing Demucs output: {e}")
+            logger.error(f"❌ Demucs error: {e}")
             raise
             
     def test_spleeter_installation(self) -> bool:
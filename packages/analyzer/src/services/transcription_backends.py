@@ -0,0 +1,248 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Backend used when a request does not choose one
+DEFAULT_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'openai-whisper')
+
+# CTranslate2 settings for the faster-whisper backends
+COMPUTE_TYPE = os.getenv('FASTER_WHISPER_COMPUTE_TYPE', 'int8')
+CPU_THREADS = int(os.getenv('TRANSCRIPTION_CPU_THREADS', '0'))
+BATCH_SIZE = int(os.getenv('TRANSCRIPTION_BATCH_SIZE', '8'))
+
+# openai-whisper decodes the whole input before returning; it is fed windows
+# of about this length (seconds) in turn, so segments stream per window
+STREAM_WINDOW_SECONDS = float(os.getenv('TRANSCRIPTION_STREAM_WINDOW_SECONDS', '60'))
+
+# Window cuts go to the quietest 100 ms within this many seconds before the nominal cut
+WINDOW_CUT_SEARCH_SECONDS = 5.0
+
+# Sample rate of the audio every backend receives
+SAMPLE_RATE = 16000
+
+# Approximate resident memory per Whisper size (fp32), used for the memory
+# budget until the first load has been measured
+MODEL_SIZE_MB = {"tiny": 200, "base": 350, "small": 1000, "medium": 2600, "large": 5000, "turbo": 3000}
+
+SegmentCallback = Callable[[Dict[str, Any]], None]
+
+class TranscriptionBackend:
+    """
+    A Whisper implementation behind a common interface
+
+    Every backend returns segments in the openai-whisper schema (start, end,
+    text, words with start/end/probability, ...), which is what
+    db_client.create_transcription stores.
+    """
+
+    name = ""
+
+    def __init__(self, model_size: str = "base", device: str = "cpu"):
+        self.model_size = model_size
+        self.device = device
+        size_mb = next((mb for size, mb in MODEL_SIZE_MB.items() if model_size.startswith(size)), None)
+        model_registry.register(self.model_key, self._load, size_mb=size_mb)
+
+    @property
+    def model_key(self) -> str:
+        """Name of the model in the shared registry"""
+        return f"whisper:{self.name}:{self.model_size}:{self.device}"
+
+    @property
+    def load_time(self) -> Optional[float]:
+        return model_registry.stats_for(self.model_key).get("load_seconds")
+
+    def load(self):
+        """The model, loaded on first use (and again after an idle unload)"""
+        return model_registry.get(self.model_key, self._load)
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                   on_segment: Optional[SegmentCallback] = None) -> Dict[str, Any]:
+        """
+        Transcribe 16 kHz mono float32 audio with word timestamps
+
+        Args:
+            audio: Samples at 16 kHz
+            language: Optional language code (None = auto-detect)
+            on_segment: Called once per segment as it becomes available; the
+                        same dict object ends up in the returned segments
+
+        Returns:
+            dict with language and segments
+        """
+        raise NotImplementedError
+
+    def _load(self):
+        raise NotImplementedError
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Reference openai-whisper (PyTorch, fp32 on CPU); segments stream per window of STREAM_WINDOW_SECONDS"""
+
+    name = "openai-whisper"
+
+    def _load(self):
+        import whisper
+        return whisper.load_model(self.model_size, device=self.device)
+
+    def transcribe(self, audio, language=None, on_segment=None):
+        segments = []
+        prompt = None
+        with model_registry.use(self.model_key, self._load) as model:
+            for first, last in stream_windows(audio):
+                result = model.transcribe(audio[first:last], language=language, verbose=False,
+                                          word_timestamps=True, initial_prompt=prompt)
+                # The first window decides the language for the rest (like a single pass would)
+                language = language or result.get("language")
+                offset = first / SAMPLE_RATE
+                for segment in result["segments"]:
+                    shift_segment(segment, offset, len(segments))
+                    segments.append(segment)
+                    if on_segment is not None:
+                        on_segment(segment)
+                # Carry the text across the cut, as condition_on_previous_text does inside a window
+                prompt = "".join(segment["text"] for segment in segments[-3:]) or None
+        return {"language": language or "unknown", "segments": segments}
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2), int8 on CPU by default; segments stream while decoding"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = "base", device: str = "cpu", compute_type: str = COMPUTE_TYPE,
+                 cpu_threads: int = CPU_THREADS):
+        super().__init__(model_size, device)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+
+    def _load(self):
+        from faster_whisper import WhisperModel
+        return WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type,
+                            cpu_threads=self.cpu_threads)
+
+    def _transcribe_call(self, model, audio, language):
+        return model.transcribe(audio, language=language, word_timestamps=True, beam_size=5)
+
+    def transcribe(self, audio, language=None, on_segment=None):
+        # Segments are decoded lazily while iterating, so the model stays held until the last one
+        with model_registry.use(self.model_key, self._load) as model:
+            segment_iter, info = self._transcribe_call(model, np.asarray(audio, dtype=np.float32), language)
+
+            segments = []
+            for raw in segment_iter:
+                segment = segment_to_dict(raw, len(segments))
+                segments.append(segment)
+                if on_segment is not None:
+                    on_segment(segment)
+        return {"language": info.language, "segments": segments}
+
+class BatchedWhisperBackend(FasterWhisperBackend):
+    """
+    faster-whisper BatchedInferencePipeline (the whisperx approach)
+
+    Splits the audio at VAD boundaries and decodes the chunks in batches, so
+    segments are only conditioned on their own chunk.
+    """
+
+    name = "batched"
+
+    def __init__(self, model_size: str = "base", device: str = "cpu", compute_type: str = COMPUTE_TYPE,
+                 cpu_threads: int = CPU_THREADS, batch_size: int = BATCH_SIZE):
+        super().__init__(model_size, device, compute_type, cpu_threads)
+        self.batch_size = batch_size
+
+    def _load(self):
+        from faster_whisper import BatchedInferencePipeline
+        return BatchedInferencePipeline(model=super()._load())
+
+    def _transcribe_call(self, model, audio, language):
+        return model.transcribe(audio, language=language, word_timestamps=True, batch_size=self.batch_size)
+
+BACKENDS = {
+    backend.name: backend for backend in (OpenAIWhisperBackend, FasterWhisperBackend, BatchedWhisperBackend)
+}
+
+_instances: Dict[tuple, TranscriptionBackend] = {}
+_instances_lock = threading.Lock()
+
+def get_backend(name: Optional[str] = None, model_size: str = "base", device: str = "cpu") -> TranscriptionBackend:
+    """Shared backend instance (models stay loaded between requests)"""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}', choose from: {', '.join(BACKENDS)}")
+
+    key = (name, model_size, device)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = BACKENDS[name](model_size=model_size, device=device)
+        return _instances[key]
+
+def stream_windows(audio: np.ndarray, window_seconds: Optional[float] = None,
+                   sample_rate: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """Sample ranges of about window_seconds (None = STREAM_WINDOW_SECONDS) covering the audio, cut at quiet points"""
+    window = int((STREAM_WINDOW_SECONDS if window_seconds is None else window_seconds) * sample_rate)
+    if window <= 0 or len(audio) <= window:
+        return [(0, len(audio))]
+
+    frame = sample_rate // 10
+    search = int(WINDOW_CUT_SEARCH_SECONDS * sample_rate)
+    ranges = []
+    first = 0
+    while len(audio) - first > window:
+        nominal = first + window
+        lo = max(first + frame, nominal - search)
+        frames = np.asarray(audio[lo:nominal], dtype=np.float32)
+        count = len(frames) // frame
+        if count:
+            energy = np.square(frames[:count * frame].reshape(count, frame)).mean(axis=1)
+            # Ties (e.g. steady noise) go to the latest frame, keeping windows near their nominal length
+            quietest = count - 1 - int(np.argmin(energy[::-1]))
+            cut = lo + quietest * frame + frame // 2
+        else:
+            cut = nominal
+        ranges.append((first, cut))
+        first = cut
+    ranges.append((first, len(audio)))
+    return ranges
+
+def shift_segment(segment: Dict[str, Any], offset: float, index: int) -> Dict[str, Any]:
+    """Move a segment of a window (and its words) to the timeline of the whole input"""
+    segment["id"] = index
+    if offset:
+        segment["start"] = round(segment["start"] + offset, 3)
+        segment["end"] = round(segment["end"] + offset, 3)
+        for word in segment.get("words") or []:
+            word["start"] = round(word["start"] + offset, 3)
+            word["end"] = round(word["end"] + offset, 3)
+    return segment
+
+def segment_to_dict(segment, index: int) -> Dict[str, Any]:
+    """faster-whisper Segment -> openai-whisper segment dict"""
+    words = getattr(segment, "words", None) or []
+    return {
+        "id": index,
+        "seek": getattr(segment, "seek", 0),
+        "start": round(float(segment.start), 3),
+        "end": round(float(segment.end), 3),
+        "text": segment.text,
+        "tokens": list(getattr(segment, "tokens", None) or []),
+        "temperature": getattr(segment, "temperature", 0.0),
+        "avg_logprob": getattr(segment, "avg_logprob", 0.0),
+        "compression_ratio": getattr(segment, "compression_ratio", 0.0),
+        "no_speech_prob": getattr(segment, "no_speech_prob", 0.0),
+        "words": [
+            {
+                "word": word.word,
+                "start": round(float(word.start), 3),
+                "end": round(float(word.end), 3),
+                "probability": float(word.probability)
+            }
+            for word in words
+        ]
+    }
@@ -0,0 +1,178 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .audio_extractor import audio_extractor
+from ..utils.progress import progress_channel
+from ..utils.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Transcriptions running at the same time (each may use its own process pool)
+JOB_WORKERS = int(os.getenv('TRANSCRIPTION_JOB_WORKERS', '1'))
+
+# Finished jobs kept for status queries
+MAX_FINISHED_JOBS = 256
+
+# Decoded segments are appended to the database at most this often (seconds)
+PERSIST_INTERVAL = float(os.getenv('TRANSCRIPTION_PERSIST_INTERVAL', '2'))
+
+class TranscriptionJob:
+    """State of one transcription, updated by the worker thread as segments arrive"""
+
+    def __init__(self, video_id: str, video_path: str, options: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.video_id = video_id
+        self.video_path = video_path
+        self.options = options
+        self.status = "QUEUED"
+        self.language: Optional[str] = None
+        self.duration: Optional[float] = None
+        self.segments: List[Dict[str, Any]] = []
+        self.transcription_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def progress_key(self) -> str:
+        return f"transcribe:{self.id}"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("COMPLETED", "ERROR")
+
+    def snapshot(self, since: int = 0) -> Dict[str, Any]:
+        """Job state with the segments from index since on (for incremental polling)"""
+        segments = self.segments[since:]
+        return {
+            "jobId": self.id,
+            "videoId": self.video_id,
+            "status": self.status,
+            "language": self.language,
+            "duration": self.duration,
+            "segmentCount": since + len(segments),
+            "segments": segments,
+            "progress": progress_channel.get(self.progress_key),
+            "transcriptionId": self.transcription_id,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at
+        }
+
+class TranscriptionJobManager:
+    """
+    Runs transcriptions on a dedicated thread pool
+
+    Request handlers only submit and poll, so the event loop stays free while
+    Whisper runs. Segments become visible on the job as they are decoded.
+    """
+
+    def __init__(self, transcription_service, db_client, max_workers: int = JOB_WORKERS):
+        self.transcription_service = transcription_service
+        self.db_client = db_client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcription")
+        self._jobs: "OrderedDict[str, TranscriptionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, video_id: str, video_path: str, language: Optional[str] = None, vad: Optional[bool] = None,
+               backend: Optional[str] = None, workers: Optional[int] = None) -> TranscriptionJob:
+        """Queue a transcription and return its job immediately"""
+        job = TranscriptionJob(video_id, video_path, {
+            "language": language, "vad": vad, "backend": backend, "workers": workers
+        })
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        progress_channel.open(job.progress_key, total=0, stage="queued")
+        job.future = self._executor.submit(self._run, job)
+        logger.info(f"🎤 Transcription job {job.id} queued for video {video_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        return self._jobs.get(job_id)
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Number of known jobs per status (QUEUED is the queue depth)"""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("QUEUED", "RUNNING", "COMPLETED", "ERROR")}
+
+    def jobs_for_video(self, video_id: str) -> List[TranscriptionJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.video_id == video_id]
+
+    def _run(self, job: TranscriptionJob) -> TranscriptionJob:
+        with tracer.job("transcribe", job.id) as trace:
+            job.status = "RUNNING"
+            job.started_at = time.time()
+            progress = progress_channel.open(job.progress_key, total=0, stage="decoding")
+
+            persisted = 0
+            last_persist = time.monotonic()
+
+            def persist():
+                nonlocal persisted, last_persist
+                pending = job.segments[persisted:]
+                if pending:
+                    self.db_client.append_transcription_segments(job.transcription_id, pending)
+                    persisted += len(pending)
+                last_persist = time.monotonic()
+
+            try:
+                # Shared decode; transcribe_video reuses it
+                with tracer.span("decode_audio", "decode"):
+                    job.duration = audio_extractor.load(job.video_path).duration
+                progress.set_stage("transcribing", total=int(round(job.duration)))
+
+                # Row exists from the start and grows while decoding; it stays
+                # PROCESSING (skipped by readers) until the run is complete
+                job.transcription_id = self.db_client.start_transcription(job.video_id, job.options["language"])
+
+                def on_segment(segment: Dict[str, Any]):
+                    job.segments.append(segment)
+                    progress.advance(max(0, int(segment["end"]) - progress.processed))
+                    if time.monotonic() - last_persist >= PERSIST_INTERVAL:
+                        persist()
+
+                with tracer.span("transcribe", "inference", backend=job.options["backend"]):
+                    result = self.transcription_service.transcribe_video(
+                        job.video_path, language=job.options["language"], vad=job.options["vad"],
+                        backend=job.options["backend"], on_segment=on_segment, workers=job.options["workers"]
+                    )
+                job.language = result["language"]
+                persist()
+                self.db_client.complete_transcription(job.transcription_id, job.language)
+                self.db_client.update_video_status_sync(job.video_id, "TRANSCRIBED")
+
+                job.status = "COMPLETED"
+                progress.finish()
+                logger.info(f"✅ Transcription job {job.id} completed: {len(job.segments)} segments")
+            except Exception as e:
+                trace.fail(str(e))
+                job.status = "ERROR"
+                job.error = str(e)
+                progress.finish(error=str(e))
+                logger.error(f"❌ Transcription job {job.id} failed: {e}")
+                # No half transcriptions in the database
+                if job.transcription_id:
+                    self.db_client.delete_transcription(job.transcription_id)
+                    job.transcription_id = None
+            finally:
+                job.finished_at = time.time()
+
+        return job
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            self._jobs.pop(job_id, None)
+            progress_channel.discard(f"transcribe:{job_id}")
@@ -0,0 +1,166 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .transcription_worker import init_worker, transcribe_chunk
+
+logger = logging.getLogger(__name__)
+
+# Speech per chunk (seconds); long speech regions are split with overlap
+CHUNK_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_SECONDS', '300'))
+CHUNK_OVERLAP_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_OVERLAP_SECONDS', '5'))
+
+# Worker processes for chunked transcription (1 = transcribe in-process)
+WORKERS = int(os.getenv('TRANSCRIPTION_WORKERS', '1'))
+
+Region = Tuple[float, float]
+
+class Chunk:
+    """Speech regions transcribed together, and the time range whose segments it owns"""
+
+    def __init__(self, regions: List[Region], own_start: float, own_end: float):
+        self.regions = regions
+        self.own_start = own_start
+        self.own_end = own_end
+
+    @property
+    def speech_seconds(self) -> float:
+        return sum(end - start for start, end in self.regions)
+
+    def owns(self, segment: Dict[str, Any]) -> bool:
+        """Overlapping chunks transcribe the same speech twice; the segment midpoint decides"""
+        midpoint = (segment["start"] + segment["end"]) / 2
+        return self.own_start <= midpoint < self.own_end
+
+def plan_chunks(regions: List[Region], chunk_seconds: float = CHUNK_SECONDS,
+                overlap_seconds: float = CHUNK_OVERLAP_SECONDS) -> List[Chunk]:
+    """
+    Group speech regions into chunks of about chunk_seconds of speech
+
+    Cuts fall into the silence between regions. Regions longer than a chunk
+    are split into overlapping pieces; ownership boundaries sit in the middle
+    of each gap or overlap, so every point of the timeline has one owner.
+    """
+    step = max(1.0, chunk_seconds - overlap_seconds)
+    pieces: List[Region] = []
+    for start, end in regions:
+        while end - start > chunk_seconds:
+            pieces.append((start, start + chunk_seconds))
+            start += step
+        pieces.append((start, end))
+
+    groups: List[List[Region]] = []
+    speech = 0.0
+    for piece in pieces:
+        if not groups or speech >= chunk_seconds:
+            groups.append([])
+            speech = 0.0
+        groups[-1].append(piece)
+        speech += piece[1] - piece[0]
+
+    chunks = []
+    for i, group in enumerate(groups):
+        own_start = float("-inf") if i == 0 else (groups[i - 1][-1][1] + group[0][0]) / 2
+        own_end = float("inf") if i == len(groups) - 1 else (group[-1][1] + groups[i + 1][0][0]) / 2
+        chunks.append(Chunk(group, own_start, own_end))
+    return chunks
+
+def owned_segments(chunk: Chunk, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Segments of a chunk result that the chunk owns, sorted by start"""
+    return sorted((segment for segment in result["segments"] if chunk.owns(segment)), key=lambda segment: segment["start"])
+
+def merge_chunk_results(chunks: List[Chunk], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep each chunk's owned segments, in timeline order, with fresh ids"""
+    segments = []
+    for chunk, result in zip(chunks, results):
+        for segment in owned_segments(chunk, result):
+            segment["id"] = len(segments)
+            segments.append(segment)
+    return segments
+
+def majority_language(chunks: List[Chunk], results: List[Dict[str, Any]]) -> str:
+    """Language detected on the most speech"""
+    votes = Counter()
+    for chunk, result in zip(chunks, results):
+        votes[result.get("language", "unknown")] += chunk.speech_seconds
+    return votes.most_common(1)[0][0] if votes else "unknown"
+
+class TranscriptionPool:
+    """
+    Process pool that transcribes chunks of one audio file in parallel
+
+    Each worker loads its model once in the initializer and keeps it for all
+    later chunks and requests. Audio is not pickled: workers map the cached
+    16 kHz float32 file read-only.
+    """
+
+    def __init__(self, backend: Optional[str], model_size: str, device: str, workers: int):
+        self.backend = backend
+        self.workers = workers
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(backend, model_size, device, threads)
+        )
+
+    def transcribe(self, audio: np.memmap, regions: List[Region], language: Optional[str] = None,
+                   on_segment: Optional[Callable[[Dict[str, Any]], None]] = None,
+                   chunk_seconds: float = CHUNK_SECONDS) -> Dict[str, Any]:
+        """
+        Transcribe the speech regions of a memory-mapped 16 kHz track
+
+        Args:
+            audio: float32 memmap as returned by DecodedAudio.resampled
+            regions: Speech regions in seconds (whole track if VAD is off)
+            on_segment: Called per owned segment in timeline order, as soon as
+                        all earlier chunks are done
+
+        Returns:
+            dict with language and merged segments (original timeline)
+        """
+        chunks = plan_chunks(regions, chunk_seconds)
+        logger.info(f"🧩 Transcribing {len(chunks)} chunks on {self.workers} workers")
+
+        futures = [
+            self._executor.submit(transcribe_chunk, audio.filename, len(audio), chunk.regions, language)
+            for chunk in chunks
+        ]
+
+        # Ownership ranges are ordered, so chunk order is timeline order
+        results = []
+        segments = []
+        for chunk, future in zip(chunks, futures):
+            result = future.result()
+            results.append(result)
+            for segment in owned_segments(chunk, result):
+                segment["id"] = len(segments)
+                segments.append(segment)
+                if on_segment is not None:
+                    on_segment(segment)
+
+        return {
+            "language": language or majority_language(chunks, results),
+            "segments": segments
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+_pools: Dict[tuple, TranscriptionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(backend: Optional[str], model_size: str, device: str, workers: int) -> TranscriptionPool:
+    """Shared pool per backend/model/worker count, so workers keep their models between requests"""
+    key = (backend, model_size, device, workers)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = TranscriptionPool(backend, model_size, device, workers)
+        return _pools[key]
@@ -1,36 +1,59 @@
-import whisper
-import torch
 from pathlib import Path
 import logging
-import subprocess
 import os
 
+from .audio_extractor import audio_extractor
+from .transcription_backends import get_backend
+from .transcription_pool import CHUNK_SECONDS, WORKERS, get_pool
+from .vad import CondensedAudio, detect_speech
+
 logger = logging.getLogger(__name__)
 
+# Whisper expects 16 kHz mono float32
+WHISPER_SAMPLE_RATE = 16000
+
+# Transcribe only detected speech (set TRANSCRIPTION_VAD=0 to disable)
+USE_VAD = os.getenv('TRANSCRIPTION_VAD', '1') != '0'
+
+# Above this speech ratio, condensing saves too little to be worth it
+VAD_MAX_SPEECH_RATIO = 0.9
+
 class TranscriptionService:
     def __init__(self, model_size: str = "base", device: str = "cpu"):
         self.model_size = model_size
         self.device = device
-        self.model = None
+        # Registers the default model for warmup; loading happens on first use
+        self.get_backend()
+        
+    def get_backend(self, backend: str = None):
+        """Transcription backend (None = TRANSCRIPTION_BACKEND setting)"""
+        return get_backend(backend, model_size=self.model_size, device=self.device)
         
-    def load_model(self):
+    def load_model(self, backend: str = None):
         """Load Whisper model"""
-        if self.model is None:
-            try:
-                self.model = whisper.load_model(self.model_size, device=self.device)
-                logger.info(f"✅ Whisper model loaded: {self.model_size}")
-            except Exception as e:
-                logger.error(f"❌ Failed to load Whisper model: {e}")
-                raise
-        return self.model
+        try:
+            return self.get_backend(backend).load()
+        except Exception as e:
+            logger.error(f"❌ Failed to load Whisper model: {e}")
+            raise
     
-    def transcribe_video(self, video_path: str, language: str = None):
+    def transcribe_video(self, video_path: str, language: str = None, vad: bool = None,
+                         backend: str = None, on_segment=None, workers: int = None):
         """
         Transcribe video audio with sentence-level timestamps
         
+        With VAD, only detected speech regions are transcribed: they are joined
+        into one condensed signal, transcribed in a single pass and the segment
+        and word timestamps are mapped back to the original timeline.
+        
         Args:
             video_path: Path to video file
             language: Optional language code (None = auto-detect)
+            vad: Skip non-speech audio (None = TRANSCRIPTION_VAD setting)
+            backend: "openai-whisper", "faster-whisper" or "batched" (None = TRANSCRIPTION_BACKEND setting)
+            on_segment: Optional callback per finished segment (original timeline)
+            workers: Worker processes for chunked transcription of long audio
+                     (None = TRANSCRIPTION_WORKERS setting, 1 = in-process)
             
         Returns:
             dict with segments containing text and timestamps
@@ -38,65 +61,61 @@ class TranscriptionService:
         logger.info(f"🎤 Starting transcription for {video_path}")
         
         try:
-            # Extract audio from video using ffmpeg
-            audio_path = self._extract_audio(video_path)
-            logger.info(f"🎵 Audio extracted to: {audio_path}")
-            
-            # Load model
-            model = self.load_model()
-            
-            # Transcribe with Whisper
-            logger.info("🔄 Transcribing audio...")
-            result = model.transcribe(
-                audio_path,
-                language=language,
-                verbose=False,
-                word_timestamps=True
-            )
-            
-            logger.info(f"✅ Transcription completed: {len(result['segments'])} segments")
-            logger.info(f"🌍 Detected language: {result.get('language', 'unknown')}")
-            
-            # Clean up temporary audio file and directory
-            try:
-                os.remove(audio_path)
-                os.rmdir(os.path.dirname(audio_path))  # Remove temp directory
-                logger.info("🗑️ Temporary audio file and directory cleaned up")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not remove temporary audio file: {e}")
-            
-            logger.info(f"✅ Transcription completed: {len(result['segments'])} segments")
-            
-            return {
-                "language": result.get("language", "unknown"),
-                "segments": result["segments"],
-                "duration": result.get("duration", 0)
-            }
+            # Held until the end: chunk workers reopen the 16 kHz cache file by path
+            with audio_extractor.use(video_path) as decoded:
+                # 16 kHz mono view of the shared audio decode
+                audio = decoded.resampled(WHISPER_SAMPLE_RATE, mono=True)
+                duration = len(audio) / WHISPER_SAMPLE_RATE
+                logger.info(f"🎵 Audio ready: {duration:.1f}s")
+                
+                regions = None
+                use_vad = USE_VAD if vad is None else vad
+                if use_vad:
+                    regions = detect_speech(audio, WHISPER_SAMPLE_RATE)
+                    speech = sum(end - start for start, end in regions)
+                    logger.info(f"🗣️ Speech detected: {speech:.1f}s in {len(regions)} regions")
+                
+                    if not regions:
+                        return {"language": language or "unknown", "segments": [], "duration": duration}
+                
+                # Long audio: VAD-aligned chunks in parallel worker processes
+                workers = WORKERS if workers is None else workers
+                if workers > 1 and duration >= 2 * CHUNK_SECONDS:
+                    pool = get_pool(backend, self.model_size, self.device, workers)
+                    result = pool.transcribe(audio, regions or [(0.0, duration)], language=language, on_segment=on_segment)
+                    logger.info(f"✅ Transcription completed: {len(result['segments'])} segments")
+                    return {"language": result["language"], "segments": result["segments"], "duration": duration}
+                
+                condensed = None
+                if regions and sum(end - start for start, end in regions) < VAD_MAX_SPEECH_RATIO * duration:
+                    condensed = CondensedAudio(audio, regions, WHISPER_SAMPLE_RATE)
+                    audio = condensed.audio
+                
+                # Load model
+                transcriber = self.get_backend(backend)
+                self.load_model(backend)
+                
+                def emit(segment):
+                    # Every segment passes here exactly once, so it is remapped once
+                    if condensed is not None:
+                        condensed.remap_segments([segment])
+                    if on_segment is not None:
+                        on_segment(segment)
+                
+                # Transcribe with Whisper
+                logger.info(f"🔄 Transcribing audio ({transcriber.name})...")
+                result = transcriber.transcribe(audio, language=language, on_segment=emit)
+                segments = result["segments"]
+                
+                logger.info(f"✅ Transcription completed: {len(segments)} segments")
+                logger.info(f"🌍 Detected language: {result.get('language', 'unknown')}")
+                
+                return {
+                    "language": result.get("language", "unknown"),
+                    "segments": segments,
+                    "duration": duration
+                }
             
         except Exception as e:
             logger.error(f"❌ Transcription failed: {e}")
             raise
-    
-    def _extract_audio(self, video_path: str) -> str:
-        """Extract audio from video using ffmpeg"""
-        # Create audio file in a temporary directory to avoid conflicts
-        import tempfile
-        temp_dir = tempfile.mkdtemp()
-        audio_filename = os.path.basename(video_path).replace(".mp4", "_audio.wav").replace(".mov", "_audio.wav")
-        audio_path = os.path.join(temp_dir, audio_filename)
-        
-        cmd = [
-            "ffmpeg", "-i", video_path,
-            "-vn", "-acodec", "pcm_s16le",
-            "-ar", "16000", "-ac", "1",
-            audio_path, "-y"
-        ]
-        
-        try:
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            logger.info("✅ Audio extraction successful")
-            return audio_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"❌ FFmpeg audio extraction failed: {e}")
-            logger.error(f"FFmpeg stderr: {e.stderr}")
-            raise Exception(f"Audio extraction failed: {e.stderr}")
@@ -0,0 +1,43 @@
+"""
+Worker side of the transcription process pool
+
+Spawned workers import this module before anything else, when the pool
+unpickles the initializer. It must not import numpy, torch or the backends at
+module level: BLAS and OpenMP size their thread pools on first import, so the
+thread limits below only take effect if they are set before that.
+"""
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Read by OpenMP (torch, CTranslate2) and the BLAS builds numpy ships with
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+_worker_backend = None
+
+def init_worker(backend: Optional[str], model_size: str, device: str, threads: int):
+    """Pool initializer: limit the math libraries to this worker's share of the cores, then load the model"""
+    global _worker_backend
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    from .transcription_backends import get_backend
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    _worker_backend = get_backend(backend, model_size=model_size, device=device)
+    if hasattr(_worker_backend, "cpu_threads"):
+        _worker_backend.cpu_threads = threads
+    _worker_backend.load()
+
+def transcribe_chunk(audio_path: str, frame_count: int, regions: List[Tuple[float, float]],
+                     language: Optional[str]) -> Dict[str, Any]:
+    import numpy as np
+    from .vad import CondensedAudio
+
+    audio = np.memmap(audio_path, dtype=np.float32, mode="r", shape=(frame_count,))
+    condensed = CondensedAudio(audio, regions)
+    result = _worker_backend.transcribe(condensed.audio, language=language)
+    return {"language": result["language"], "segments": condensed.remap_segments(result["segments"])}
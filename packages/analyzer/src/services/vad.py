@@ -0,0 +1,167 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Speech regions closer than this are merged (seconds)
+MIN_SILENCE_SECONDS = 0.5
+
+# Padding added around each speech region (seconds)
+SPEECH_PAD_SECONDS = 0.2
+
+# Regions shorter than this are dropped (seconds)
+MIN_SPEECH_SECONDS = 0.25
+
+# Silence inserted between regions in the condensed audio, so Whisper sees a pause
+GAP_SECONDS = 0.3
+
+# VAD backend: "auto" (Silero via faster-whisper if installed, else energy), "silero" or "energy"
+VAD_BACKEND = os.getenv('VAD_BACKEND', 'auto')
+
+# Energy VAD: 30 ms frames, speech = louder than the noise floor by this margin,
+# with the threshold kept between ENERGY_MIN_DB and ENERGY_MAX_DB
+ENERGY_FRAME_SECONDS = 0.03
+ENERGY_MARGIN_DB = 15.0
+ENERGY_MIN_DB = -50.0
+ENERGY_MAX_DB = -35.0
+
+def detect_speech(audio: np.ndarray, sample_rate: int = 16000, backend: Optional[str] = None) -> List[Tuple[float, float]]:
+    """
+    Detect speech regions in mono audio
+
+    Args:
+        audio: float32 mono samples in [-1, 1]
+        sample_rate: Sample rate of audio (Silero needs 16 kHz)
+        backend: "auto", "silero" or "energy" (default: VAD_BACKEND)
+
+    Returns:
+        Sorted, non-overlapping (start, end) regions in seconds, padded and merged
+    """
+    backend = backend or VAD_BACKEND
+    duration = len(audio) / sample_rate
+
+    regions = None
+    if backend in ("auto", "silero") and sample_rate == 16000:
+        regions = _silero_regions(audio, strict=backend == "silero")
+    if regions is None:
+        regions = _energy_regions(audio, sample_rate)
+
+    return _postprocess(regions, duration)
+
+class CondensedAudio:
+    """
+    Speech regions of a track joined into one shorter signal
+
+    Keeps the piecewise mapping back to the original timeline, so results of
+    a single transcription pass over all regions can be placed correctly.
+    """
+
+    def __init__(self, audio: np.ndarray, regions: List[Tuple[float, float]], sample_rate: int = 16000,
+                 gap_seconds: float = GAP_SECONDS):
+        self.sample_rate = sample_rate
+        self.regions = regions
+        gap = np.zeros(int(gap_seconds * sample_rate), dtype=np.float32)
+
+        pieces = []
+        condensed_starts, original_starts, lengths = [], [], []
+        position = 0
+        for start, end in regions:
+            first = int(start * sample_rate)
+            last = min(len(audio), int(end * sample_rate))
+            if last <= first:
+                continue
+            if pieces:
+                pieces.append(gap)
+                position += len(gap)
+            condensed_starts.append(position / sample_rate)
+            original_starts.append(first / sample_rate)
+            lengths.append((last - first) / sample_rate)
+            pieces.append(np.asarray(audio[first:last], dtype=np.float32))
+            position += last - first
+
+        self.audio = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+        self._condensed_starts = np.asarray(condensed_starts)
+        self._original_starts = np.asarray(original_starts)
+        self._lengths = np.asarray(lengths)
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    def to_original(self, t: float) -> float:
+        """Map a time in the condensed audio to the original timeline (gaps snap to the region end)"""
+        if len(self._condensed_starts) == 0:
+            return t
+        k = max(0, int(np.searchsorted(self._condensed_starts, t, side="right")) - 1)
+        offset = min(max(0.0, t - self._condensed_starts[k]), self._lengths[k])
+        return round(float(self._original_starts[k] + offset), 3)
+
+    def remap_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Move Whisper segments and their word timestamps back to the original timeline"""
+        for segment in segments:
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"])
+            for word in segment.get("words") or []:
+                word["start"] = self.to_original(word["start"])
+                word["end"] = self.to_original(word["end"])
+        return segments
+
+def _silero_regions(audio: np.ndarray, strict: bool) -> Optional[List[Tuple[float, float]]]:
+    """Silero VAD as bundled with faster-whisper (ONNX, no torch needed)"""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        if strict:
+            raise
+        return None
+
+    # Padding and merging happen in _postprocess, as for the energy VAD
+    options = VadOptions(
+        min_speech_duration_ms=int(MIN_SPEECH_SECONDS * 1000),
+        min_silence_duration_ms=int(MIN_SILENCE_SECONDS * 1000),
+        speech_pad_ms=0
+    )
+    timestamps = get_speech_timestamps(np.asarray(audio, dtype=np.float32), options)
+    return [(ts["start"] / 16000, ts["end"] / 16000) for ts in timestamps]
+
+def _energy_regions(audio: np.ndarray, sample_rate: int) -> List[Tuple[float, float]]:
+    """
+    Frame energy against an adaptive noise floor
+
+    Cheap fallback without model; music beds count as speech, so it only
+    removes silence and room tone.
+    """
+    frame = max(1, int(ENERGY_FRAME_SECONDS * sample_rate))
+    count = len(audio) // frame
+    if count == 0:
+        return []
+
+    frames = np.asarray(audio[:count * frame], dtype=np.float32).reshape(count, frame)
+    rms = np.sqrt(np.mean(np.square(frames), axis=1) + 1e-12)
+    db = 20 * np.log10(rms)
+
+    noise_floor = np.percentile(db, 10)
+    threshold = min(ENERGY_MAX_DB, max(ENERGY_MIN_DB, noise_floor + ENERGY_MARGIN_DB))
+    active = db > threshold
+
+    # Rising/falling edges of the active mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+    frame_seconds = frame / sample_rate
+    return [(start * frame_seconds, end * frame_seconds) for start, end in zip(edges[::2], edges[1::2])]
+
+def _postprocess(regions: List[Tuple[float, float]], duration: float) -> List[Tuple[float, float]]:
+    """Pad, merge close regions and drop very short ones"""
+    merged: List[Tuple[float, float]] = []
+    for start, end in sorted(regions):
+        if end - start < MIN_SPEECH_SECONDS:
+            continue
+        start = max(0.0, start - SPEECH_PAD_SECONDS)
+        end = min(duration, end + SPEECH_PAD_SECONDS)
+        if merged and start - merged[-1][1] < MIN_SILENCE_SECONDS:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return [(round(start, 3), round(end, 3)) for start, end in merged]
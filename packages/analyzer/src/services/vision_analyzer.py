@@ -11,8 +11,14 @@ try:
 except ImportError:
     LOCAL_BACKEND_AVAILABLE = False
 
+from ..utils.model_registry import model_registry
+from ..utils.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
+# YOLOv8n, two MediaPipe graphs and EasyOCR together (MB), until measured
+LOCAL_BACKEND_SIZE_MB = 900
+
 class VisionAnalyzer:
     """
     Vision Analyzer using Local Python Backend (YOLO/MediaPipe/EasyOCR)
@@ -23,16 +29,26 @@ class VisionAnalyzer:
         self.use_local_backend = True
         
         if LOCAL_BACKEND_AVAILABLE:
-            try:
-                self.backend = LocalVisionBackend()
-                logger.info("VisionAnalyzer initialized with Local Python Backend")
-            except Exception as e:
-                logger.error(f"Failed to initialize Local Vision Backend: {e}")
-                self.use_local_backend = False
+            # Models are loaded on the first analysis (or via warmup), not at startup
+            model_registry.register("vision", LocalVisionBackend, unloader=lambda backend: LocalVisionBackend.reset(),
+                                    size_mb=LOCAL_BACKEND_SIZE_MB)
+            logger.info("VisionAnalyzer initialized with Local Python Backend")
         else:
             logger.warning("LocalVisionBackend module not found")
             self.use_local_backend = False
     
+    @property
+    def backend(self) -> Optional["LocalVisionBackend"]:
+        """The local backend, loaded on first access"""
+        if not self.use_local_backend:
+            return None
+        try:
+            return model_registry.get("vision")
+        except Exception as e:
+            logger.error(f"Failed to initialize Local Vision Backend: {e}")
+            self.use_local_backend = False
+            return None
+    
     def analyze_scene(self, keyframe_path: str, scene_id: str) -> Optional[Dict[str, Any]]:
         """
         Analyze scene keyframe locally
@@ -48,15 +64,17 @@ class VisionAnalyzer:
             logger.error(f"Keyframe not found: {keyframe_path}")
             return None
         
-        if not self.use_local_backend:
+        backend = self.backend
+        if backend is None:
             logger.warning("Local backend unavailable, skipping analysis")
             return None
             
         try:
             logger.info(f"Analyzing scene {scene_id} with keyframe: {keyframe_path}")
             
-            # Analyze using local backend
-            vision_data = self.backend.analyze_image(keyframe_path)
+            # Analyze using local backend (held, so an eviction cannot reset it mid-analysis)
+            with model_registry.use("vision") as backend, tracer.span("vision_analysis", "inference"):
+                vision_data = backend.analyze_image(keyframe_path)
             
             # Add scene metadata
             vision_data["sceneId"] = scene_id
@@ -1,6 +1,6 @@
 import logging
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 # Configure logging
 logging.basicConfig(
@@ -30,3 +30,15 @@ def log_error(video_id: str, error: str, details: Dict[str, Any] = None):
         'details': details or {}
     }
     logger.error(f"Analysis error: {error}", extra=log_data)
+
+def log_performance(subject: str, operation: Optional[str] = None, duration: Optional[float] = None,
+                    details: Dict[str, Any] = None):
+    """Log a timing measurement with structured data"""
+    log_data = {
+        'subject': subject,
+        'operation': operation,
+        'duration': duration,
+        'details': details or {}
+    }
+    timing = f" took {duration:.2f}s" if duration is not None else ""
+    logger.info(f"Performance: {subject}{f' {operation}' if operation else ''}{timing}", extra=log_data)
@@ -0,0 +1,225 @@
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import psutil
+
+# Histogram buckets (seconds)
+JOB_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+LOAD_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+LabelValues = Tuple[str, ...]
+MetricCallback = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric:
+    """Base of all metric types: name, help text and label names"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _series(self, key: LabelValues, extra: Optional[Dict[str, str]] = None, suffix: str = "") -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        labels = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return f"{self.name}{suffix}{{{labels}}}" if labels else f"{self.name}{suffix}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    """Monotonically increasing total (use rate() for per-second values)"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), callback: Optional[MetricCallback] = None):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return _callback_or_values(self)
+
+class Gauge(Metric):
+    """Current value; either set by the code or read from a callback at scrape time"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), callback: Optional[MetricCallback] = None):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return _callback_or_values(self)
+
+def _callback_or_values(metric) -> List[str]:
+    """Samples of a counter or gauge: read from its callback at scrape time, else the stored values"""
+    if metric.callback is not None:
+        result = metric.callback()
+        values = result if isinstance(result, dict) else {(): result}
+    else:
+        with metric._lock:
+            values = dict(metric._values)
+    return [f"{metric._series(tuple(key))} {_format_value(value)}" for key, value in sorted(values.items())]
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets, with sum and count"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = QUERY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def sum(self, **labels) -> float:
+        return self._sums.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            series = [(key, list(counts), self._sums[key]) for key, counts in sorted(self._counts.items())]
+        lines = []
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self._series(key, {'le': _format_value(bound)}, '_bucket')} {cumulative}")
+            lines.append(f"{self._series(key, suffix='_sum')} {_format_value(total)}")
+            lines.append(f"{self._series(key, suffix='_count')} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Process-wide metrics in the Prometheus text exposition format
+
+    Hot paths only bump pre-aggregated values under a per-metric lock; the
+    text is built on scrape, so scraping costs O(series) and never touches
+    the jobs themselves (callback gauges read counters the services keep).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = (), callback: Optional[MetricCallback] = None) -> Counter:
+        return self._register(Counter(name, help, labelnames, callback))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), callback: Optional[MetricCallback] = None) -> Gauge:
+        return self._register(Gauge(name, help, labelnames, callback))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = QUERY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines += metric.render()
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Metric:
+        """Register a metric; registering the same name again returns the existing one"""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered with another type or labels")
+                if getattr(metric, "callback", None) is not None:
+                    existing.callback = metric.callback
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+metrics = MetricsRegistry()
+
+_process = psutil.Process()
+_started = time.time()
+
+PROCESS_RSS = metrics.gauge("process_resident_memory_bytes", "Resident memory of the analyzer process",
+                            callback=lambda: _process.memory_info().rss)
+PROCESS_CPU = metrics.counter("process_cpu_seconds_total", "User and system CPU time of the analyzer process",
+                              callback=lambda: sum(_process.cpu_times()[:2]))
+PROCESS_UPTIME = metrics.gauge("process_uptime_seconds", "Seconds since the analyzer process started",
+                               callback=lambda: time.time() - _started)
+
+FRAMES = metrics.counter("analyzer_frames_total",
+                         "Work units processed per pipeline and stage (video frames; audio seconds or chunks for audio jobs)",
+                         ("pipeline", "stage"))
+STAGE_SECONDS = metrics.counter("analyzer_stage_seconds_total",
+                                "Time spent per pipeline stage (exclusive of nested spans)", ("pipeline", "stage"))
+STAGE_SPANS = metrics.counter("analyzer_stage_spans_total", "Spans recorded per pipeline stage", ("pipeline", "stage"))
+JOB_SECONDS = metrics.histogram("analyzer_job_duration_seconds", "Wall time of finished jobs",
+                                ("pipeline", "status"), buckets=JOB_BUCKETS)
+DB_QUERY_SECONDS = metrics.histogram("analyzer_db_query_duration_seconds", "Latency of database operations",
+                                     ("operation",), buckets=QUERY_BUCKETS)
+MODEL_LOAD_SECONDS = metrics.histogram("analyzer_model_load_duration_seconds", "Time to load a model",
+                                       ("model",), buckets=LOAD_BUCKETS)
@@ -0,0 +1,338 @@
+import ctypes
+import gc
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import psutil
+
+from .metrics import MODEL_LOAD_SECONDS
+from .tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Unload models that were not used for this many seconds (0 = keep forever)
+DEFAULT_IDLE_TTL = float(os.getenv('MODEL_IDLE_TTL', '0'))
+
+# How often the background reaper looks for idle models (seconds)
+REAP_INTERVAL = float(os.getenv('MODEL_REAP_INTERVAL', '60'))
+
+# Resident memory all loaded models may use together (MB, 0 = unlimited)
+MEMORY_BUDGET_MB = float(os.getenv('MODEL_MEMORY_BUDGET_MB', '0'))
+
+# How long a load waits for models in use to be released before giving up (seconds)
+MEMORY_WAIT_SECONDS = float(os.getenv('MODEL_MEMORY_WAIT_SECONDS', '300'))
+
+class ModelMemoryError(MemoryError):
+    """Raised when a model does not fit into the memory budget next to the models in use"""
+
+class ModelEntry:
+    """A registered model: how to load/unload it and its load statistics"""
+
+    def __init__(self, name: str, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]] = None,
+                 ttl: Optional[float] = None, size_mb: Optional[float] = None):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.ttl = DEFAULT_IDLE_TTL if ttl is None else ttl
+        self.size_mb = size_mb
+        self.memory_mb: Optional[float] = None
+        self.model: Any = None
+        self.loaded_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.use_tick = 0
+        self.load_seconds: Optional[float] = None
+        self.load_count = 0
+        self.in_use = 0
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    @property
+    def expected_mb(self) -> float:
+        """Memory the model needs: measured at its last load, else the registered estimate"""
+        return self.memory_mb or self.size_mb or 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "name": self.name,
+            "loaded": self.loaded,
+            "in_use": self.in_use,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "load_count": self.load_count,
+            "memory_mb": round(self.memory_mb, 1) if self.memory_mb is not None else None,
+            "size_mb": self.size_mb,
+            "loaded_at": self.loaded_at,
+            "idle_seconds": round(now - self.last_used, 1) if self.loaded and self.last_used else None,
+            "ttl": self.ttl,
+            "error": self.error
+        }
+
+class ModelRegistry:
+    """
+    Process-wide registry of lazily loaded models
+
+    Services register a loader instead of loading at construction; the model
+    is loaded on first get() (or via warmup) and unloaded again after ttl
+    seconds without use. Models held via use() are never unloaded.
+
+    With a memory budget, each load first evicts the least recently used
+    idle models until the new model fits. A model's size is the resident
+    memory its load added to the process (loads are serialised so the
+    measurements do not mix); before its first load the registered
+    size_mb estimate is used.
+    """
+
+    def __init__(self, reap_interval: float = REAP_INTERVAL, memory_budget_mb: float = MEMORY_BUDGET_MB,
+                 memory_wait_seconds: float = MEMORY_WAIT_SECONDS):
+        self.reap_interval = reap_interval
+        self.memory_budget_mb = memory_budget_mb
+        self.memory_wait_seconds = memory_wait_seconds
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._released = threading.Condition()
+        self._reaper: Optional[threading.Thread] = None
+        self._ticks = itertools.count(1)
+
+    def register(self, name: str, loader: Callable[[], Any], unloader: Optional[Callable[[Any], None]] = None,
+                 ttl: Optional[float] = None, size_mb: Optional[float] = None) -> ModelEntry:
+        """Register a model (no loading); re-registering keeps a loaded model"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = ModelEntry(name, loader, unloader, ttl, size_mb)
+            else:
+                entry.loader = loader
+                entry.unloader = unloader or entry.unloader
+                if ttl is not None:
+                    entry.ttl = ttl
+                if size_mb is not None:
+                    entry.size_mb = size_mb
+            return entry
+
+    def get(self, name: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """The model, loaded on first use; registers it when a loader is given"""
+        entry = self._entries.get(name)
+        if entry is None:
+            if loader is None:
+                raise KeyError(f"Unknown model '{name}'")
+            entry = self.register(name, loader)
+
+        entry.last_used = time.time()
+        entry.use_tick = next(self._ticks)
+        if entry.model is not None:
+            return entry.model
+
+        with entry.lock:
+            if entry.model is None:
+                self._load(entry)
+            entry.last_used = time.time()
+            return entry.model
+
+    @contextmanager
+    def use(self, name: str, loader: Optional[Callable[[], Any]] = None):
+        """Hold a model for the duration of a job; it cannot be unloaded meanwhile"""
+        if name not in self._entries:
+            if loader is None:
+                raise KeyError(f"Unknown model '{name}'")
+            self.register(name, loader)
+
+        entry = self._entries[name]
+        with entry.lock:
+            entry.in_use += 1
+        try:
+            yield self.get(name)
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+                entry.use_tick = next(self._ticks)
+            with self._released:
+                self._released.notify_all()
+
+    def warmup(self, names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Load the given (or all registered) models now; failures are reported, not raised"""
+        for name in names or list(self._entries):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"❌ Warmup of model {name} failed: {e}")
+        return [self._entries[name].stats() for name in (names or list(self._entries)) if name in self._entries]
+
+    def unload(self, name: str) -> bool:
+        """Unload a model unless it is in use"""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        with entry.lock:
+            if entry.model is None or entry.in_use:
+                return False
+            self._unload(entry)
+        _release_memory()
+        return True
+
+    def unload_idle(self, now: Optional[float] = None) -> List[str]:
+        """Unload models whose idle time exceeds their ttl"""
+        now = now or time.time()
+        unloaded = []
+        for entry in list(self._entries.values()):
+            if entry.ttl <= 0 or entry.model is None or entry.in_use:
+                continue
+            if entry.last_used is not None and now - entry.last_used >= entry.ttl and self.unload(entry.name):
+                unloaded.append(entry.name)
+        return unloaded
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [entry.stats() for entry in list(self._entries.values())]
+
+    def used_mb(self) -> float:
+        """Memory held by the loaded models"""
+        return sum(entry.expected_mb for entry in list(self._entries.values()) if entry.loaded)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        return {
+            "budget_mb": self.memory_budget_mb or None,
+            "used_mb": round(self.used_mb(), 1),
+            "process_rss_mb": round(_rss_mb(), 1),
+            "system_available_mb": round(psutil.virtual_memory().available / 1024 ** 2, 1)
+        }
+
+    def stats_for(self, name: str) -> Dict[str, Any]:
+        entry = self._entries.get(name)
+        return entry.stats() if entry is not None else {}
+
+    def is_registered(self, name: str) -> bool:
+        return name in self._entries
+
+    def is_loaded(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.loaded
+
+    def _load(self, entry: ModelEntry):
+        try:
+            self._make_room(entry)
+            with self._load_lock, tracer.span(f"model_load:{entry.name}", "model_load"):
+                start = time.time()
+                rss_before = _rss_mb()
+                entry.model = entry.loader()
+                measured = _rss_mb() - rss_before
+        except Exception as e:
+            entry.error = str(e)
+            raise
+        entry.error = None
+        entry.load_seconds = time.time() - start
+        # Memory the allocator did not return after an unload is reused by a reload
+        # without moving RSS, so reloads only ever raise the measured figure
+        if entry.load_count:
+            entry.memory_mb = max(measured, entry.memory_mb or 0.0)
+        else:
+            entry.memory_mb = measured if measured > 0 else entry.size_mb
+        entry.load_count += 1
+        entry.loaded_at = time.time()
+        MODEL_LOAD_SECONDS.observe(entry.load_seconds, model=entry.name)
+        logger.info(f"✅ Model {entry.name} loaded in {entry.load_seconds:.2f}s ({entry.expected_mb:.0f} MB)")
+
+        if entry.ttl > 0:
+            self._start_reaper()
+
+    def _make_room(self, entry: ModelEntry):
+        """Evict idle models (least recently used first) until entry fits into the budget"""
+        if self.memory_budget_mb <= 0:
+            return
+
+        needed = entry.expected_mb
+        if needed > self.memory_budget_mb:
+            logger.warning(f"Model {entry.name} ({needed:.0f} MB) exceeds the memory budget of "
+                           f"{self.memory_budget_mb:.0f} MB on its own")
+            needed = self.memory_budget_mb
+
+        deadline = time.time() + self.memory_wait_seconds
+        while self.used_mb() + needed > self.memory_budget_mb:
+            if self._evict_one(keep=entry):
+                continue
+
+            # Everything left is in use: wait until a job releases its model
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise ModelMemoryError(
+                    f"Model {entry.name} needs {needed:.0f} MB, but {self.used_mb():.0f} of "
+                    f"{self.memory_budget_mb:.0f} MB are held by models in use"
+                )
+            logger.info(f"⏳ Waiting for memory to load model {entry.name}")
+            with self._released:
+                self._released.wait(timeout=min(remaining, 5.0))
+
+    def _evict_one(self, keep: ModelEntry) -> bool:
+        """Unload the least recently used idle model; False if there is none"""
+        candidates = sorted(
+            (e for e in list(self._entries.values()) if e is not keep and e.loaded and not e.in_use),
+            key=lambda e: e.use_tick
+        )
+        for candidate in candidates:
+            # Never block on another model's lock (it may be loading and waiting for us)
+            if not candidate.lock.acquire(blocking=False):
+                continue
+            try:
+                if candidate.model is None or candidate.in_use:
+                    continue
+                logger.info(f"♻️ Evicting model {candidate.name} ({candidate.expected_mb:.0f} MB) to load {keep.name}")
+                self._unload(candidate)
+            finally:
+                candidate.lock.release()
+            _release_memory()
+            return True
+        return False
+
+    def _unload(self, entry: ModelEntry):
+        model, entry.model = entry.model, None
+        entry.loaded_at = None
+        if entry.unloader is not None:
+            try:
+                entry.unloader(model)
+            except Exception as e:
+                logger.warning(f"Unloader of model {entry.name} failed: {e}")
+        del model
+        logger.info(f"♻️ Model {entry.name} unloaded")
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        while True:
+            time.sleep(self.reap_interval)
+            try:
+                self.unload_idle()
+            except Exception as e:
+                logger.warning(f"Model reaper failed: {e}")
+
+def _rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+def _release_memory():
+    """Return freed model memory to the OS (and the GPU, if torch is in use)"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    # glibc keeps freed arenas mapped; without this RSS never shrinks after an unload
+    if sys.platform.startswith("linux"):
+        try:
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+model_registry = ModelRegistry()
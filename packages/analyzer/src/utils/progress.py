@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import FRAMES
+
+# Minimum seconds between two published snapshots of a job
+DEFAULT_PUBLISH_INTERVAL = 0.5
+
+# Weight of the newest throughput sample in the smoothed frames/sec
+FPS_SMOOTHING = 0.3
+
+class ProgressReporter:
+    """
+    Frame-level progress of a single job, written from the worker's inner loop
+
+    Each stage counts its own frames (processed/total, stage_progress). With
+    weighted stages, e.g. {"decoding": 0.2, "analyzing": 0.8} in pipeline
+    order, progress is the overall share of the job and never goes back when
+    a new stage starts; stages not listed weigh nothing. Without stages,
+    progress is that of the current stage.
+    """
+
+    def __init__(self, key: str, total: int, stage: str, min_interval: float = DEFAULT_PUBLISH_INTERVAL,
+                 stages: Optional[Dict[str, float]] = None):
+        self.key = key
+        self.pipeline = key.split(":", 1)[0]
+        self.min_interval = min_interval
+        weight_sum = sum(stages.values()) if stages else 0.0
+        self.stages = {name: weight / weight_sum for name, weight in stages.items()} if weight_sum > 0 else {}
+        self.stage_index = -1
+        self._stage_offset = 0.0
+        self._overall = 0.0
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._started = time.monotonic()
+        self._snapshot: Dict[str, Any] = {}
+        self._reset(stage, total)
+
+    def _reset(self, stage: str, total: int):
+        now = time.monotonic()
+        self.stage = stage
+        self.stage_index += 1
+        if stage in self.stages:
+            # Weight of the stages before this one (skipped stages count as done)
+            names = list(self.stages)
+            self._stage_offset = sum(self.stages[name] for name in names[:names.index(stage)])
+        self.total = max(0, int(total or 0))
+        self.processed = 0
+        self.status = "RUNNING"
+        self.error: Optional[str] = None
+        self._fps = 0.0
+        self._last_publish = now
+        self._last_processed = 0
+        self._publish(now)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """Register a callback invoked with every published snapshot"""
+        self._listeners.append(listener)
+
+    def advance(self, n: int = 1):
+        """Count n processed frames; publishes at most every min_interval seconds"""
+        self.processed += n
+        now = time.monotonic()
+        if now - self._last_publish >= self.min_interval:
+            self._publish(now)
+
+    def set_stage(self, stage: str, total: int):
+        """Start a new stage with its own frame total (e.g. decode, then inference)"""
+        self._count_frames()
+        self._reset(stage, total)
+
+    def finish(self, error: Optional[str] = None):
+        """Mark the job as completed (or failed) and publish a final snapshot"""
+        self.status = "ERROR" if error else "COMPLETED"
+        self.error = error
+        if not error and self.total:
+            self.processed = max(self.processed, self.total)
+        self._publish(time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Last published state; cheap to call from request handlers"""
+        return self._snapshot
+
+    def _count_frames(self):
+        """Add the frames processed since the last publish to the frame counter"""
+        pending = self.processed - self._last_processed
+        if pending > 0:
+            FRAMES.inc(pending, pipeline=self.pipeline, stage=self.stage)
+
+    def _publish(self, now: float):
+        self._count_frames()
+        elapsed = now - self._last_publish
+        if elapsed > 0 and self.processed >= self._last_processed:
+            sample = (self.processed - self._last_processed) / elapsed
+            self._fps = sample if self._fps == 0.0 else FPS_SMOOTHING * sample + (1 - FPS_SMOOTHING) * self._fps
+        self._last_publish = now
+        self._last_processed = self.processed
+
+        remaining = max(0, self.total - self.processed)
+        eta = remaining / self._fps if self._fps > 0 and self.status == "RUNNING" else None
+        stage_progress = min(1.0, self.processed / self.total) if self.total else 0.0
+        if not self.stages:
+            progress = stage_progress
+        elif self.status == "COMPLETED":
+            progress = self._overall = 1.0
+        else:
+            # A stage may be repeated (e.g. a fallback pass); never report less than before
+            self._overall = max(self._overall, self._stage_offset + self.stages.get(self.stage, 0.0) * stage_progress)
+            progress = self._overall
+        self._snapshot = {
+            "key": self.key,
+            "stage": self.stage,
+            "stage_index": self.stage_index,
+            "status": self.status,
+            "processed": self.processed,
+            "total": self.total,
+            "progress": round(progress, 4),
+            "stage_progress": stage_progress,
+            "fps": round(self._fps, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(now - self._started, 1),
+            "error": self.error,
+            "updated_at": time.time()
+        }
+
+        for listener in self._listeners:
+            try:
+                listener(self._snapshot)
+            except Exception:
+                pass
+
+class ProgressChannel:
+    """Process-wide registry of job progress, keyed e.g. by "reframe:<job_id>" """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._reporters: "OrderedDict[str, ProgressReporter]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, key: str, total: int, stage: str = "processing",
+             min_interval: float = DEFAULT_PUBLISH_INTERVAL,
+             stages: Optional[Dict[str, float]] = None) -> ProgressReporter:
+        """Create (or replace) the reporter for a job; stages weights its stages for the overall progress"""
+        reporter = ProgressReporter(key, total, stage, min_interval=min_interval, stages=stages)
+        with self._lock:
+            self._reporters.pop(key, None)
+            self._reporters[key] = reporter
+            while len(self._reporters) > self.max_entries:
+                self._reporters.popitem(last=False)
+        return reporter
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest snapshot for a job or None if unknown"""
+        reporter = self._reporters.get(key)
+        return reporter.snapshot() if reporter else None
+
+    def discard(self, key: str):
+        """Forget a job"""
+        with self._lock:
+            self._reporters.pop(key, None)
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Snapshots of all running jobs"""
+        with self._lock:
+            reporters = list(self._reporters.values())
+        return [r.snapshot() for r in reporters if r.status == "RUNNING"]
+
+progress_channel = ProgressChannel()
@@ -0,0 +1,275 @@
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .metrics import DB_QUERY_SECONDS, JOB_SECONDS, STAGE_SECONDS, STAGE_SPANS
+
+logger = logging.getLogger(__name__)
+
+# Stages a span can be attributed to; a job's time splits into these
+STAGES = ("decode", "inference", "encode", "db", "io", "model_load", "other")
+
+# Append every finished job trace as one JSON line to this file ('' = off)
+TRACE_EXPORT_PATH = os.getenv('TRACE_EXPORT_PATH', '')
+
+# Finished job traces kept for /traces
+MAX_TRACES = 256
+
+# Individual spans kept per job for its timeline; totals stay exact beyond that
+MAX_SPANS_PER_TRACE = 500
+
+class Span:
+    """One timed operation; self_seconds excludes the time of nested spans"""
+
+    __slots__ = ("name", "stage", "attrs", "start", "seconds", "child_seconds", "parent")
+
+    def __init__(self, name: str, stage: str, attrs: Dict[str, Any], parent: Optional["Span"]):
+        self.name = name
+        self.stage = stage
+        self.attrs = attrs
+        self.parent = parent
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.child_seconds = 0.0
+
+    @property
+    def self_seconds(self) -> float:
+        return max(0.0, self.seconds - self.child_seconds)
+
+class JobTrace:
+    """Spans of one job, aggregated per stage and per operation"""
+
+    def __init__(self, pipeline: str, job_id: str):
+        self.pipeline = pipeline
+        self.job_id = job_id
+        self.status = "RUNNING"
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._start = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.operations: Dict[str, Dict[str, Any]] = {}
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self.profile: Optional[str] = None  # path of the sampling profile, if the job was profiled
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> str:
+        return f"{self.pipeline}:{self.job_id}"
+
+    def add(self, span: Span):
+        with self._lock:
+            stage = self.stages.setdefault(span.stage, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += span.self_seconds
+
+            operation = self.operations.setdefault(span.name, {"stage": span.stage, "count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            operation["count"] += 1
+            operation["seconds"] += span.seconds
+            operation["max_seconds"] = max(operation["max_seconds"], span.seconds)
+
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append({
+                    "name": span.name,
+                    "stage": span.stage,
+                    "offset": round(span.start - self._start, 4),
+                    "seconds": round(span.seconds, 4),
+                    "parent": span.parent.name if span.parent is not None else None,
+                    **({"attrs": span.attrs} if span.attrs else {})
+                })
+            else:
+                self.dropped_spans += 1
+
+    def fail(self, error: str):
+        """Mark the job as failed when the error is handled inside the traced block"""
+        self.error = error
+
+    def finish(self, error: Optional[str] = None):
+        self.status = "ERROR" if error else "COMPLETED"
+        self.error = error
+        self.finished_at = time.time()
+        self.seconds = time.perf_counter() - self._start
+
+    @property
+    def bottleneck(self) -> Optional[str]:
+        """Stage the job spent most of its (self) time in"""
+        stages = {stage: totals["seconds"] for stage, totals in self.stages.items() if stage != "other"}
+        return max(stages, key=stages.get) if stages else None
+
+    def summary(self) -> Dict[str, Any]:
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self._start
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": totals["count"],
+                    "seconds": round(totals["seconds"], 4),
+                    "share": round(totals["seconds"] / seconds, 4) if seconds > 0 else 0.0
+                }
+                for stage, totals in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"])
+            }
+            traced = sum(totals["seconds"] for totals in self.stages.values())
+        return {
+            "pipeline": self.pipeline,
+            "jobId": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "seconds": round(seconds, 4),
+            "untracedSeconds": round(max(0.0, seconds - traced), 4),
+            "bottleneck": self.bottleneck,
+            "stages": stages,
+            "profile": self.profile
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            operations = {
+                name: {**totals, "seconds": round(totals["seconds"], 4), "max_seconds": round(totals["max_seconds"], 4)}
+                for name, totals in self.operations.items()
+            }
+            spans = list(self.spans)
+        return {**self.summary(), "operations": operations, "spans": spans, "droppedSpans": self.dropped_spans}
+
+class Tracer:
+    """
+    Per-stage timing of analyzer jobs
+
+    A job is traced with `with tracer.job(pipeline, job_id)`; code running
+    inside it (also in threads started via asyncio.to_thread or wrap())
+    opens spans with `with tracer.span(name, stage)`. Span time is attributed
+    to its stage exclusive of nested spans, so the stage totals of a job add
+    up to at most its wall time. Stage times, job durations and database
+    latencies also feed the process wide metrics (pipeline "none" for spans
+    outside a job).
+    """
+
+    def __init__(self, export_path: str = TRACE_EXPORT_PATH, max_traces: int = MAX_TRACES):
+        self.export_path = export_path
+        self.max_traces = max_traces
+        self._trace: contextvars.ContextVar[Optional[JobTrace]] = contextvars.ContextVar("trace", default=None)
+        self._span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+        self._traces: "OrderedDict[str, JobTrace]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    @contextmanager
+    def job(self, pipeline: str, job_id: str) -> Iterator[JobTrace]:
+        """Trace a job; it is listed under pipeline:job_id while running and afterwards"""
+        trace = JobTrace(pipeline, job_id)
+        with self._lock:
+            self._traces[trace.key] = trace
+            self._traces.move_to_end(trace.key)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+        trace_token = self._trace.set(trace)
+        span_token = self._span.set(None)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.finish(error=str(e) or type(e).__name__)
+            raise
+        else:
+            trace.finish(error=trace.error)
+        finally:
+            self._span.reset(span_token)
+            self._trace.reset(trace_token)
+            self._record_job(trace)
+
+    @contextmanager
+    def span(self, name: str, stage: str = "other", **attrs) -> Iterator[Span]:
+        """Time a block of work as one operation of the given stage"""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}', choose from: {', '.join(STAGES)}")
+        parent = self._span.get()
+        span = Span(name, stage, attrs, parent)
+        token = self._span.set(span)
+        try:
+            yield span
+        finally:
+            span.seconds = time.perf_counter() - span.start
+            self._span.reset(token)
+            if parent is not None:
+                parent.child_seconds += span.seconds
+            trace = self._trace.get()
+            if trace is not None:
+                trace.add(span)
+            self._record_span(trace.pipeline if trace is not None else "none", span)
+
+    def traced(self, stage: str, name: Optional[str] = None) -> Callable:
+        """Decorator: run the function inside a span (named after the function by default)"""
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or fn.__name__
+
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, stage):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def wrap(self, fn: Callable) -> Callable:
+        """Bind fn to the current job and span, for executors that do not copy the context"""
+        context = contextvars.copy_context()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return context.run(fn, *args, **kwargs)
+        return wrapper
+
+    def current(self) -> Optional[JobTrace]:
+        return self._trace.get()
+
+    def get(self, pipeline: str, job_id: str) -> Optional[JobTrace]:
+        return self._traces.get(f"{pipeline}:{job_id}")
+
+    def recent(self, pipeline: Optional[str] = None, limit: int = 50) -> List[JobTrace]:
+        """Most recent traces first"""
+        with self._lock:
+            traces = [trace for trace in reversed(self._traces.values()) if pipeline is None or trace.pipeline == pipeline]
+        return traces[:limit]
+
+    def _record_span(self, pipeline: str, span: Span):
+        STAGE_SECONDS.inc(span.self_seconds, pipeline=pipeline, stage=span.stage)
+        STAGE_SPANS.inc(pipeline=pipeline, stage=span.stage)
+        if span.stage == "db":
+            DB_QUERY_SECONDS.observe(span.seconds, operation=span.name)
+
+    def _record_job(self, trace: JobTrace):
+        JOB_SECONDS.observe(trace.seconds or 0.0, pipeline=trace.pipeline, status=trace.status)
+
+        summary = trace.summary()
+        stages = ", ".join(f"{stage} {totals['seconds']:.2f}s" for stage, totals in summary["stages"].items())
+        logger.info(f"⏱️ {trace.key} {trace.status.lower()} in {summary['seconds']:.2f}s, "
+                    f"bottleneck: {summary['bottleneck'] or 'n/a'} ({stages})")
+        if self.export_path:
+            self._export(trace)
+
+    def _export(self, trace: JobTrace):
+        try:
+            line = json.dumps(trace.to_dict(), default=str)
+            with self._export_lock:
+                with open(self.export_path, "a") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Could not export trace {trace.key}: {e}")
+
+tracer = Tracer()
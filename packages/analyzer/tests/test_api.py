@@ -10,6 +10,15 @@ def test_health_endpoint(client):
     assert data["status"] == "healthy"
     assert data["service"] == "prismvid-analyzer"
 
+@pytest.mark.unit
+def test_metrics_endpoint(client):
+    """Test that /metrics serves the registry in the Prometheus text format"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE analyzer_job_duration_seconds histogram" in response.text
+    assert "# TYPE analyzer_active_jobs gauge" in response.text
+
 @pytest.mark.unit
 def test_analyze_endpoint(client, sample_video_path):
     """Test video analysis endpoint"""
@@ -57,3 +66,43 @@ def test_analyze_invalid_request(client):
     
     response = client.post("/analyze", json=invalid_request)
     assert response.status_code == 422  # Validation error
+
+@pytest.mark.unit
+def test_cancelled_track_separation_is_not_marked_analyzed():
+    """Test that a separation cancelled via job control leaves the video in ERROR, not ANALYZED"""
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from src.api import server
+    from src.services.demucs_engine import SeparationCancelled
+
+    with patch.object(server, 'db_client') as db, \
+         patch.object(server, 'separate_track_by_scenes', AsyncMock(side_effect=SeparationCancelled("Separation cancelled at 12.0s"))):
+        db.get_scenes_by_video_id.return_value = [{"id": "scene-1", "start_time": 0.0, "end_time": 30.0}]
+        asyncio.run(server.process_spleeter_separation("video-1", "video.mp4", mode="track"))
+
+    statuses = [c[0][1] for c in db.update_video_status_sync.call_args_list]
+    assert statuses == ["SEPARATING", "ERROR"]
+    db.create_analysis_log_sync.assert_called_once_with("video-1", "WARNING", "Audio separation cancelled")
+
+@pytest.mark.unit
+def test_reframe_preview_is_deleted_after_it_was_served(client, tmp_path):
+    """Test that per-request preview files do not pile up in the previews directory"""
+    from unittest.mock import patch, AsyncMock
+    from src.api import server
+
+    video_path = tmp_path / "video.mp4"
+    saliency_path = tmp_path / "saliency_data.json"
+    preview_path = tmp_path / "video-1_preview_9_16_0123abcd.mp4"
+    for path in (video_path, saliency_path):
+        path.write_bytes(b"")
+    preview_path.write_bytes(b"preview")
+
+    with patch.object(server.reframing_service, 'render_preview', AsyncMock(return_value=str(preview_path))):
+        response = client.post("/reframe/preview", json={
+            "videoId": "video-1", "videoPath": str(video_path), "saliencyDataPath": str(saliency_path),
+            "aspectRatio": {"width": 9, "height": 16}
+        })
+
+    assert response.status_code == 200
+    assert response.content == b"preview"
+    assert not preview_path.exists()
@@ -0,0 +1,139 @@
+import pytest
+import numpy as np
+from unittest.mock import patch
+
+def _fake_ffmpeg(samples):
+    """subprocess.run replacement that writes raw PCM to the ffmpeg output path"""
+    def run(cmd, **kwargs):
+        output_path = cmd[cmd.index("-ac") + 2]
+        samples.astype(np.int16).tofile(output_path)
+    return run
+
+@pytest.mark.unit
+def test_audio_extractor_decodes_once(tmp_path):
+    """Test that the soundtrack is decoded once and served from the cache"""
+    from src.services.audio_extractor import AudioExtractor
+
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    samples = np.arange(44100 * 2 * 2).reshape(-1, 2) % 1000
+
+    extractor = AudioExtractor(cache_dir=str(tmp_path / "cache"))
+    with patch('src.services.audio_extractor.subprocess.run', side_effect=_fake_ffmpeg(samples)) as mock_run:
+        first = extractor.load(str(video_path))
+        second = extractor.load(str(video_path))
+        AudioExtractor(cache_dir=str(tmp_path / "cache")).load(str(video_path))
+
+    assert mock_run.call_count == 1
+    assert first is second
+    assert first.duration == 2.0
+    assert np.array_equal(first.slice(0.5, 1.0), samples[22050:44100])
+
+@pytest.mark.unit
+def test_audio_cache_is_bounded(tmp_path):
+    """Test size limit (least recently used first), ttl and the bound on open decodes"""
+    import os
+    import time
+    from src.services.audio_extractor import AudioExtractor
+
+    samples = np.zeros((44100 * 6, 2))  # ~1 MB of PCM per video
+    videos = []
+    for i in range(3):
+        video_path = tmp_path / f"video{i}.mp4"
+        video_path.write_bytes(b"video %d" % i)
+        videos.append(str(video_path))
+
+    cache_dir = tmp_path / "cache"
+    extractor = AudioExtractor(cache_dir=str(cache_dir), max_mb=2.5, ttl=0, max_open=2)
+    with patch('src.services.audio_extractor.subprocess.run', side_effect=_fake_ffmpeg(samples)):
+        first = extractor.load(videos[0])
+        extractor.load(videos[1])
+        past = time.time() - 60
+        os.utime(cache_dir / f"{extractor.cache_key(videos[1])}.pcm", (past, past))
+        extractor.load(videos[2])
+
+        # video1 was used least recently: its files and mapping are gone; video0 is
+        # no longer mapped (max_open) but its array handed out earlier stays readable
+        cached = sorted(path.name.split(".")[0] for path in cache_dir.iterdir())
+        assert cached == sorted(extractor.cache_key(v) for v in (videos[0], videos[2]))
+        assert list(extractor._decoded) == [extractor.cache_key(videos[2])]
+        assert first.slice(0, 1.0).shape == (44100, 2)
+
+        extractor.ttl = 30
+        os.utime(cache_dir / f"{extractor.cache_key(videos[0])}.pcm", (past, past))
+        assert extractor.prune() == 1
+        assert [path.name for path in cache_dir.iterdir()] == [f"{extractor.cache_key(videos[2])}.pcm"]
+
+@pytest.mark.unit
+def test_audio_cache_keeps_entries_in_use(tmp_path):
+    """Test that files of an entry held with use() survive pruning (workers reopen them by path)"""
+    import os
+    import time
+    import scipy.signal  # noqa: F401 (imported before subprocess.run is patched)
+    from src.services.audio_extractor import AudioExtractor
+
+    samples = np.zeros((44100 * 6, 2))
+    videos = []
+    for i in range(2):
+        video_path = tmp_path / f"video{i}.mp4"
+        video_path.write_bytes(b"video %d" % i)
+        videos.append(str(video_path))
+
+    cache_dir = tmp_path / "cache"
+    extractor = AudioExtractor(cache_dir=str(cache_dir), max_mb=1.5, ttl=0)
+    with patch('src.services.audio_extractor.subprocess.run', side_effect=_fake_ffmpeg(samples)):
+        with extractor.use(videos[0]) as decoded:
+            view_path = decoded.pcm_path.with_name(f"{decoded.key}_16000_mono.f32")
+            decoded.resampled(16000, mono=True)
+            past = time.time() - 60
+            for path in cache_dir.iterdir():
+                os.utime(path, (past, past))
+
+            # Another video's decode pushes the cache over its limit: the held entry stays
+            extractor.load(videos[1])
+            assert view_path.exists()
+
+        # Released: the least recently used entry goes now
+        assert extractor._pins == {}
+        assert extractor.prune() == 1
+        assert not view_path.exists()
+        assert [path.name for path in cache_dir.iterdir()] == [f"{extractor.cache_key(videos[1])}.pcm"]
+
+@pytest.mark.unit
+def test_audio_extractor_write_wav(tmp_path):
+    """Test writing a scene range as WAV without ffmpeg"""
+    import wave
+    from src.services.audio_extractor import AudioExtractor
+
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    samples = np.zeros((44100 * 3, 2))
+
+    extractor = AudioExtractor(cache_dir=str(tmp_path / "cache"))
+    with patch('src.services.audio_extractor.subprocess.run', side_effect=_fake_ffmpeg(samples)):
+        audio = extractor.load(str(video_path))
+
+    wav_path = audio.write_wav(str(tmp_path / "scene.wav"), 1.0, 2.5)
+
+    with wave.open(wav_path) as wav:
+        assert wav.getnchannels() == 2
+        assert wav.getframerate() == 44100
+        assert wav.getnframes() == 66150
+
+@pytest.mark.unit
+def test_resample_blocks_match_whole_signal():
+    """Test that blockwise resampling equals resampling the whole signal"""
+    from scipy.signal import resample_poly
+    from src.services import audio_extractor
+
+    signal = (np.random.RandomState(0).randn(44100 * 3, 2) * 3000).astype(np.int16)
+
+    with patch.object(audio_extractor, 'RESAMPLE_BLOCK_SECONDS', 1):
+        blocks = list(audio_extractor._resample_blocks(signal, 44100, 16000, mono=True))
+
+    expected = resample_poly(signal.astype(np.float32).mean(axis=1) / 32768.0, 160, 441)
+    result = np.concatenate(blocks)
+
+    assert len(blocks) == 3
+    assert result.shape == expected.shape
+    assert np.allclose(result, expected, atol=1e-5)
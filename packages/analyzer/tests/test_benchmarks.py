@@ -0,0 +1,81 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+@pytest.mark.unit
+def test_compare_direction_by_metric_unit():
+    """Test which metrics count as higher-is-better, lower-is-better or informational"""
+    from benchmarks.compare import direction
+
+    assert direction("fps") == 1
+    assert direction("realtime_speed") == 1
+    assert direction("ms") == -1
+    assert direction("ms_per_scene") == -1
+    assert direction("decode_seconds") == -1
+    assert direction("rtf") == -1
+    assert direction("wall_seconds") is None
+    assert direction("frames") is None
+    assert direction("recall") is None
+
+@pytest.mark.unit
+def test_compare_reports_flags_regressions_beyond_threshold():
+    """Test relative changes, status per direction and that skipped or one-sided metrics are left out"""
+    from benchmarks.compare import compare_reports
+
+    baseline = {"results": {
+        "saliency": {"hybrid": {"frames": 20, "fps": 100.0}, "sam": {"skipped": "unavailable"}},
+        "roi_search": {"9x16": {"ms": 2.0}, "1x1": {"ms": 2.0}},
+        "reframe": {"fps": 50.0, "wall_seconds": 10.0},
+        "heatmap": {"fps": 10.0}
+    }}
+    current = {"results": {
+        "saliency": {"hybrid": {"frames": 20, "fps": 80.0}, "sam": {"fps": 5.0}},
+        "roi_search": {"9x16": {"ms": 1.0}, "1x1": {"ms": 2.1}},
+        "reframe": {"fps": 50.0, "wall_seconds": 30.0},
+        "transcription": {"rtf": 0.1}
+    }}
+
+    rows = {row["metric"]: row for row in compare_reports(baseline, current, threshold=0.1)}
+
+    assert set(rows) == {"saliency/hybrid/fps", "roi_search/9x16/ms", "roi_search/1x1/ms", "reframe/fps"}
+    assert rows["saliency/hybrid/fps"]["change"] == -0.2
+    assert rows["saliency/hybrid/fps"]["status"] == "regression"
+    assert rows["roi_search/9x16/ms"]["status"] == "improvement"
+    assert rows["roi_search/1x1/ms"]["status"] == "unchanged"
+    assert rows["reframe/fps"]["status"] == "unchanged"
+
+@pytest.mark.unit
+def test_failing_benchmark_is_reported_as_skipped():
+    """Test that a benchmark raising e.g. OSError does not abort the run before the report"""
+    from benchmarks import run as bench
+
+    def missing_weights(ctx):
+        raise FileNotFoundError("models/sam_vit_b_01ec64.pth")
+
+    benchmarks = {"saliency": missing_weights, "roi_search": lambda ctx: {"9x16": {"ms": 1.5}}}
+    args = SimpleNamespace(workdir="unused", quiet=True, repeat=1)
+    with patch.dict(bench.BENCHMARKS, benchmarks, clear=True):
+        report = bench.run(args, ["saliency", "roi_search"])
+
+    assert report["results"]["saliency"]["skipped"].startswith("failed: FileNotFoundError")
+    assert report["results"]["roi_search"]["9x16"] == {"ms": 1.5}
+
+@pytest.mark.unit
+def test_saliency_benchmark_skips_detectors_that_fail_to_load():
+    """Test per-detector failures in the saliency benchmark"""
+    import numpy as np
+    from benchmarks import run as bench
+
+    class Detector:
+        def generate_saliency_map(self, frame):
+            return frame
+
+    def sam():
+        raise OSError("SAM checkpoint not found")
+
+    ctx = SimpleNamespace(frames=[np.zeros((4, 4, 3), dtype=np.uint8)] * 2, args=SimpleNamespace(repeat=1))
+    with patch.object(bench, '_saliency_detectors', return_value={"hybrid": Detector, "sam": sam}):
+        results = bench.bench_saliency(ctx)
+
+    assert results["hybrid"]["frames"] == 2
+    assert results["sam"] == {"skipped": "unavailable: OSError: SAM checkpoint not found"}
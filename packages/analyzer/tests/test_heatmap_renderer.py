@@ -0,0 +1,114 @@
+import pytest
+import numpy as np
+
+@pytest.mark.unit
+def test_saliency_map_store_interpolates_between_samples():
+    """Test compact map storage and interpolation between sampled frames"""
+    from src.services.heatmap_renderer import SaliencyMapStore
+
+    frames = [
+        {"frame_number": 0, "saliency_data": np.zeros((360, 640), dtype=np.uint8)},
+        {"frame_number": 10, "saliency_data": np.full((360, 640), 200, dtype=np.uint8)},
+        {"frame_number": 5, "saliency_data": []}
+    ]
+
+    store = SaliencyMapStore.from_frames(frames, (640, 360), max_side=64)
+
+    assert len(store) == 2
+    assert store.map_size == (64, 36)
+
+    middle, key = store.map_for_frame(5)
+    assert int(middle[0, 0]) == 100
+    assert key == (0, 1, 16)
+
+    assert store.map_for_frame(10)[1] == (1, 1, 0)
+    assert store.map_for_frame(11) == (None, None)
+
+@pytest.mark.unit
+def test_saliency_map_store_roundtrip(tmp_path):
+    """Test saving and loading the compact map file"""
+    from src.services.heatmap_renderer import SaliencyMapStore, load_saliency_maps
+
+    maps = np.random.RandomState(0).randint(0, 255, (3, 9, 16), dtype=np.uint8)
+    SaliencyMapStore(np.array([30, 0, 15]), maps).save(str(tmp_path / "saliency_maps.npz"))
+
+    store = load_saliency_maps(tmp_path)
+
+    assert store.frame_numbers.tolist() == [0, 15, 30]
+    assert np.array_equal(store.maps[0], maps[1])
+    assert load_saliency_maps(tmp_path / "missing") is None
+
+@pytest.mark.unit
+def test_heatmap_renderer_matches_colormap():
+    """Test LUT colorization against cv2.applyColorMap and overlay passthrough"""
+    import cv2
+    from src.services.heatmap_renderer import HeatmapRenderer
+
+    renderer = HeatmapRenderer((16, 9), cv2.COLORMAP_JET, opacity=1.0)
+    saliency_map = np.random.RandomState(1).randint(0, 255, (9, 16), dtype=np.uint8)
+    frame = np.zeros((9, 16, 3), dtype=np.uint8)
+
+    output = renderer.render(frame, saliency_map, key=(0, 0, 0))
+
+    assert np.array_equal(output, cv2.applyColorMap(saliency_map, cv2.COLORMAP_JET))
+    assert renderer.render(frame, None) is frame
+
+@pytest.mark.unit
+def test_render_to_sinks_decodes_once(tmp_path):
+    """Test that every sink receives each decoded frame exactly once"""
+    from unittest.mock import MagicMock
+    from src.services.heatmap_renderer import VideoSink, render_to_sinks
+
+    frames = [np.full((36, 64, 3), i, dtype=np.uint8) for i in range(5)]
+    cap = MagicMock()
+    cap.read.side_effect = [(True, frame) for frame in frames] + [(False, None)]
+
+    seen = []
+    sinks = [
+        VideoSink("full", str(tmp_path / "full.mp4"), 25, (64, 36), lambda f, n: f),
+        VideoSink("half", str(tmp_path / "half.mp4"), 25, (32, 36),
+                  lambda f, n: seen.append(n) or np.ascontiguousarray(f[:, :32]))
+    ]
+
+    assert render_to_sinks(cap, sinks) == 5
+    assert cap.read.call_count == 6
+    assert seen == [0, 1, 2, 3, 4]
+    assert [sink.frames_written for sink in sinks] == [5, 5]
+
+@pytest.mark.unit
+def test_render_visualizations_rejects_unknown_outputs(tmp_path):
+    """Test validation of requested visualization outputs"""
+    from src.services.heatmap_generator import HeatmapGenerator
+
+    generator = HeatmapGenerator(storage_dir=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        generator.render_visualizations("missing.mp4", {"frames": []}, {"roi_0x9": str(tmp_path / "x.mp4")})
+
+@pytest.mark.unit
+def test_roi_preview_renders_any_aspect_ratio(tmp_path):
+    """Test ROI previews for aspect ratios outside the preset outputs"""
+    import cv2
+    from src.services.heatmap_generator import HeatmapGenerator
+
+    video_path = str(tmp_path / "input.mp4")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), 25, (320, 180))
+    for i in range(10):
+        writer.write(np.full((180, 320, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+    saliency_data = {"frames": [{
+        "frame_number": 0,
+        "saliency_data": np.zeros((18, 32), dtype=np.uint8),
+        "roi_suggestions": [{"x": 40, "y": 10, "width": 120, "height": 150, "score": 1.0}]
+    }]}
+    generator = HeatmapGenerator(storage_dir=str(tmp_path))
+
+    for aspect_ratio in ((4, 5), (21, 9)):
+        output_path = str(tmp_path / f"roi_{aspect_ratio[0]}x{aspect_ratio[1]}.mp4")
+        generator.create_roi_preview_video(video_path, saliency_data, output_path, aspect_ratio=aspect_ratio)
+
+        cap = cv2.VideoCapture(output_path)
+        width, height = cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        cap.release()
+        assert width / height == pytest.approx(aspect_ratio[0] / aspect_ratio[1], rel=0.05)
@@ -0,0 +1,57 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+
+PROBE = {
+    'format': {'duration': '12.0', 'format_name': 'mov,mp4,m4a,3gp,3g2,mj2', 'bit_rate': '800000'},
+    'streams': [
+        {
+            'codec_type': 'video',
+            'codec_name': 'h264',
+            'width': 1920,
+            'height': 1080,
+            'avg_frame_rate': '30000/1001',
+            'r_frame_rate': '30/1',
+            'nb_frames': '360',
+            'pix_fmt': 'yuv420p',
+            'side_data_list': [{'side_data_type': 'Display Matrix', 'rotation': -90}]
+        },
+        {'codec_type': 'audio', 'codec_name': 'aac', 'sample_rate': '48000', 'channels': 2, 'duration': '11.98'}
+    ]
+}
+
+@pytest.mark.unit
+def test_parse_probe_applies_rotation_and_frame_rate():
+    """Test display size, fractional frame rate, frame count and audio from ffprobe JSON"""
+    from src.services.media_info import parse_probe
+
+    info = parse_probe('video.mp4', PROBE)
+
+    assert info.fps == pytest.approx(29.97, abs=0.01)
+    assert info.frame_count == 360
+    assert info.duration == 12.0
+    assert info.rotation == 90
+    assert (info.width, info.height) == (1080, 1920)
+    assert (info.coded_width, info.coded_height) == (1920, 1080)
+    assert info.has_audio and info.audio.sample_rate == 48000
+
+@pytest.mark.unit
+def test_probe_is_cached_until_file_changes(sample_video_path):
+    """Test that a file is probed once and again after it was modified"""
+    from src.services.media_info import MediaInfoService
+
+    service = MediaInfoService()
+    prober = MagicMock(return_value=PROBE)
+
+    first = service.probe(sample_video_path, prober=prober)
+    assert service.probe(sample_video_path, prober=prober) is first
+    prober.assert_called_once()
+
+    stat = os.stat(sample_video_path)
+    os.utime(sample_video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    service.probe(sample_video_path, prober=prober)
+    assert prober.call_count == 2
+
+    service.invalidate(sample_video_path)
+    service.probe(sample_video_path, prober=prober)
+    assert prober.call_count == 3
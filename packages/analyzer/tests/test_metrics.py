@@ -0,0 +1,44 @@
+import pytest
+
+@pytest.mark.unit
+def test_metrics_render_prometheus_text():
+    """Test counter, callback gauge and cumulative histogram output"""
+    from src.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    frames = registry.counter("frames_total", "Frames", ("stage",))
+    registry.gauge("active_jobs", "Active jobs", callback=lambda: 3)
+    latency = registry.histogram("query_seconds", "Query latency", ("operation",), buckets=(0.1, 1))
+
+    frames.inc(5, stage="decode")
+    frames.inc(2, stage="decode")
+    for value in (0.05, 0.1, 0.5, 2):
+        latency.observe(value, operation="get_video")
+
+    text = registry.render()
+    assert '# TYPE frames_total counter' in text
+    assert 'frames_total{stage="decode"} 7' in text
+    assert 'active_jobs 3' in text
+    assert 'query_seconds_bucket{operation="get_video",le="0.1"} 2' in text
+    assert 'query_seconds_bucket{operation="get_video",le="1"} 3' in text
+    assert 'query_seconds_bucket{operation="get_video",le="+Inf"} 4' in text
+    assert 'query_seconds_count{operation="get_video"} 4' in text
+
+    assert registry.counter("frames_total", "Frames", ("stage",)) is frames
+    with pytest.raises(ValueError):
+        frames.inc(1, pipeline="saliency")
+
+@pytest.mark.unit
+def test_progress_counts_frames_per_stage():
+    """Test that frames reach the counter on publish and on stage changes"""
+    from src.utils.metrics import FRAMES
+    from src.utils.progress import ProgressReporter
+
+    reporter = ProgressReporter("metricstest:1", total=10, stage="decoding", min_interval=3600)
+    reporter.advance(4)
+    reporter.set_stage("analyzing", 2)
+    reporter.advance(2)
+    reporter.finish()
+
+    assert FRAMES.value(pipeline="metricstest", stage="decoding") == 4
+    assert FRAMES.value(pipeline="metricstest", stage="analyzing") == 2
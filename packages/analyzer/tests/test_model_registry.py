@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+@pytest.mark.unit
+def test_models_load_lazily_once():
+    """Test that registering does not load and repeated gets reuse the model"""
+    from src.utils.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    loader = MagicMock(return_value="model")
+    registry.register("whisper", loader)
+
+    assert not registry.is_loaded("whisper")
+    loader.assert_not_called()
+
+    assert registry.get("whisper") == "model"
+    assert registry.get("whisper") == "model"
+    loader.assert_called_once()
+
+    stats = registry.stats()[0]
+    assert stats["loaded"] and stats["load_count"] == 1 and stats["load_seconds"] is not None
+
+@pytest.mark.unit
+def test_idle_models_are_unloaded_unless_in_use():
+    """Test TTL unloading, pinning via use() and reloading after unload"""
+    from src.utils.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    unloader = MagicMock()
+    loader = MagicMock(side_effect=lambda: object())
+    registry.register("sam", loader, unloader=unloader, ttl=0)
+    registry.register("vision", MagicMock(return_value="vision"), ttl=10)
+    registry._start_reaper = MagicMock()
+
+    registry.get("sam")
+    with registry.use("vision"):
+        later = registry._entries["vision"].last_used + 60
+        assert registry.unload_idle(now=later) == []
+    assert registry.unload_idle(now=registry._entries["vision"].last_used + 60) == ["vision"]
+    assert not registry.is_loaded("vision")
+    assert registry.is_loaded("sam")
+
+    assert registry.unload("sam")
+    unloader.assert_called_once()
+    registry.get("sam")
+    assert loader.call_count == 2
+
+@pytest.mark.unit
+def test_warmup_reports_failures():
+    """Test that warmup loads models and reports errors instead of raising"""
+    from src.utils.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    registry.register("ok", MagicMock(return_value="model"))
+    registry.register("broken", MagicMock(side_effect=RuntimeError("no weights")))
+
+    stats = {entry["name"]: entry for entry in registry.warmup()}
+
+    assert stats["ok"]["loaded"]
+    assert not stats["broken"]["loaded"]
+    assert stats["broken"]["error"] == "no weights"
+
+@pytest.mark.unit
+def test_memory_budget_evicts_least_recently_used():
+    """Test LRU eviction of idle models when a new model does not fit the budget"""
+    from src.utils.model_registry import ModelMemoryError, ModelRegistry
+
+    registry = ModelRegistry(memory_budget_mb=1000, memory_wait_seconds=0)
+    for name in ("sam", "vision", "whisper"):
+        registry.register(name, MagicMock(return_value=name), size_mb=400)
+
+    with patch('src.utils.model_registry._rss_mb', return_value=0.0):
+        registry.get("sam")
+        registry.get("vision")
+        registry.get("sam")  # vision is now least recently used
+        registry.get("whisper")
+
+        assert [registry.is_loaded(name) for name in ("sam", "vision", "whisper")] == [True, False, True]
+        assert registry.used_mb() == 800
+
+        # Models in use are never evicted
+        with registry.use("sam"), registry.use("whisper"):
+            with pytest.raises(ModelMemoryError):
+                registry.get("vision")
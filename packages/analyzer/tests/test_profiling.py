@@ -0,0 +1,49 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+@pytest.mark.unit
+def test_profile_job_writes_folded_stacks_of_job_threads(tmp_path):
+    """Test that sampled worker threads are profiled, unrelated threads are not, and the path lands on the trace"""
+    from src.utils.profiling import profile_job, sampled
+    from src.utils.tracing import Tracer
+
+    tracer = Tracer()
+    profile_path = tmp_path / "job.profile.folded"
+
+    def unrelated_work():
+        busy_loop(0.3)
+
+    with patch('src.utils.profiling.tracer', tracer):
+        with tracer.job("reframe-test", "job-1") as trace, profile_job(str(profile_path)):
+            other = threading.Thread(target=unrelated_work)
+            other.start()
+            worker = threading.Thread(target=tracer.wrap(sampled(busy_loop)), args=(0.3,), name="render-worker")
+            worker.start()
+            worker.join()
+            other.join()
+
+    lines = profile_path.read_text().splitlines()
+    assert lines
+    stacks = dict(line.rsplit(" ", 1) for line in lines)
+    assert all(int(count) > 0 for count in stacks.values())
+    assert any(stack.startswith("render-worker;") and "busy_loop" in stack for stack in stacks)
+    assert not any("unrelated_work" in stack for stack in stacks)
+    assert trace.summary()["profile"] == str(profile_path)
+
+@pytest.mark.unit
+def test_profile_job_disabled_is_a_no_op(tmp_path):
+    """Test that nothing is sampled or written without the flag"""
+    from src.utils.profiling import _profiler, profile_job
+
+    profile_path = tmp_path / "job.profile.folded"
+    with profile_job(str(profile_path), enabled=False) as profiler:
+        assert profiler is None
+        assert _profiler.get() is None
+    assert not profile_path.exists()
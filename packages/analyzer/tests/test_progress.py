@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import patch
+
+@pytest.mark.unit
+def test_progress_reporter_throughput_and_eta():
+    """Test frames/sec and ETA computed from advance() calls"""
+    from src.utils.progress import ProgressChannel
+
+    channel = ProgressChannel()
+    with patch('src.utils.progress.time.monotonic') as mock_monotonic:
+        mock_monotonic.return_value = 100.0
+        reporter = channel.open("reframe:job-1", total=100, stage="rendering", min_interval=0.5)
+
+        mock_monotonic.return_value = 101.0
+        reporter.advance(25)
+
+    snapshot = channel.get("reframe:job-1")
+    assert snapshot["processed"] == 25
+    assert snapshot["progress"] == 0.25
+    assert snapshot["fps"] == 25.0
+    assert snapshot["eta_seconds"] == 3.0
+    assert snapshot["status"] == "RUNNING"
+
+@pytest.mark.unit
+def test_progress_reporter_throttles_publishing():
+    """Test that snapshots are only refreshed every min_interval seconds"""
+    from src.utils.progress import ProgressChannel
+
+    channel = ProgressChannel()
+    published = []
+    reporter = channel.open("heatmap:video-1", total=1000, min_interval=60.0)
+    reporter.add_listener(published.append)
+
+    for _ in range(500):
+        reporter.advance()
+
+    assert published == []
+    assert channel.get("heatmap:video-1")["processed"] == 0
+
+    reporter.finish()
+    assert published[-1]["status"] == "COMPLETED"
+    assert channel.get("heatmap:video-1")["progress"] == 1.0
+
+@pytest.mark.unit
+def test_progress_channel_error_and_unknown_job():
+    """Test failed jobs and lookups of unknown keys"""
+    from src.utils.progress import ProgressChannel
+
+    channel = ProgressChannel()
+    reporter = channel.open("saliency:video-2", total=10)
+    reporter.finish(error="decode failed")
+
+    assert channel.get("saliency:video-2")["status"] == "ERROR"
+    assert channel.get("saliency:video-2")["error"] == "decode failed"
+    assert channel.get("saliency:unknown") is None
+    assert channel.active() == []
+
+@pytest.mark.unit
+def test_weighted_stages_report_monotonic_overall_progress():
+    """Test that progress spans all stages and does not drop when a stage starts or repeats"""
+    from src.utils.progress import ProgressChannel
+
+    channel = ProgressChannel()
+    reporter = channel.open("saliency:video-3", total=0, stage="starting", min_interval=0.0,
+                            stages={"decoding": 1, "analyzing": 3})
+    assert channel.get("saliency:video-3")["progress"] == 0.0
+
+    reporter.set_stage("decoding", 100)
+    reporter.advance(100)
+    assert channel.get("saliency:video-3")["progress"] == 0.25
+
+    reporter.set_stage("analyzing", 20)
+    snapshot = channel.get("saliency:video-3")
+    assert (snapshot["progress"], snapshot["stage_progress"], snapshot["stage_index"]) == (0.25, 0.0, 2)
+
+    reporter.advance(10)
+    assert channel.get("saliency:video-3")["progress"] == 0.625
+
+    # Fallback pass restarts the stage: stage progress resets, overall progress holds
+    reporter.set_stage("analyzing", 20)
+    reporter.advance(5)
+    snapshot = channel.get("saliency:video-3")
+    assert (snapshot["progress"], snapshot["stage_progress"]) == (0.625, 0.25)
+
+    reporter.advance(15)
+    assert channel.get("saliency:video-3")["progress"] == 1.0
+    reporter.finish()
+    assert channel.get("saliency:video-3")["progress"] == 1.0
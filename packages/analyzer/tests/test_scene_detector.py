@@ -59,3 +59,59 @@ def test_get_scene_count(sample_video_path):
         
         count = detector.get_scene_count(sample_video_path)
         assert count == 2
+
+@pytest.mark.unit
+def test_fast_mode_refines_cuts_between_sampled_frames(sample_video_path):
+    """Test that fast mode moves a cut found at a sampled frame to the exact frame"""
+    import numpy as np
+    from src.services.scene_detector import SceneDetector
+
+    frames = [np.full((18, 32, 3), 30, dtype=np.uint8)] * 21 + [np.full((18, 32, 3), 220, dtype=np.uint8)] * 19
+
+    detector = SceneDetector(mode="fast", frame_skip=3, workers=1)
+    with patch.object(detector, '_video_properties', return_value=(10.0, 40, 64, 36)), \
+         patch.object(detector, '_read_frames', return_value=iter(frames)) as mock_read:
+        scenes = detector.detect_scenes(sample_video_path)
+
+    assert mock_read.call_args[0][1:3] == (64, 36)
+    assert scenes == [(0.0, 2.1), (2.1, 4.0)]
+
+@pytest.mark.unit
+def test_segment_cuts_are_merged_by_ownership():
+    """Test segment planning and deduplication of cuts detected in overlaps"""
+    from src.services.scene_detector import merge_segment_cuts, plan_segments
+
+    segments = plan_segments(1000, segment_frames=300, workers=2)
+    assert segments == [(0, 250), (250, 500), (500, 750), (750, None)]
+
+    cuts = merge_segment_cuts(segments, [[100, 255], [255, 260, 490], [490, 620], [760, 1010]])
+
+    # 255 is owned by the second segment, 490 by the second, 260 is too close to 255
+    assert cuts == [100, 255, 490, 620, 760, 1010]
+
+@pytest.mark.unit
+def test_hinted_mode_decodes_only_around_packet_candidates(sample_video_path):
+    """Test cut candidates from GOP cadence and packet sizes, and windowed decoding"""
+    import numpy as np
+    from src.services.scene_detector import SceneDetector, candidate_frames
+
+    # 10 fps, GOP of 50 frames restarted by a scene-cut keyframe at 73, size spike at 130
+    keyframes = {0, 50, 73, 123, 173}
+    packets = [(i / 10, 20000 if i in keyframes else 500, i in keyframes) for i in range(200)]
+    packets[130] = (13.0, 9000, False)
+    assert candidate_frames(packets, fps=10.0) == [73, 130]
+
+    frames = [np.full((18, 32, 3), 30 if i < 130 else 220, dtype=np.uint8) for i in range(200)]
+
+    def read_frames(video_path, width, height, start_frame=0, frame_count=None, fps=None, threads=0):
+        return iter(frames[start_frame:None if frame_count is None else start_frame + frame_count])
+
+    detector = SceneDetector(mode="hinted", workers=1)
+    with patch.object(detector, '_video_properties', return_value=(10.0, 200, 64, 36)), \
+         patch.object(detector, '_probe_packets', return_value=packets), \
+         patch.object(detector, '_read_frames', side_effect=read_frames) as mock_read:
+        scenes = detector.detect_scenes(sample_video_path)
+
+    assert scenes == [(0.0, 13.0), (13.0, 20.0)]
+    decoded = sum(call[0][4] for call in mock_read.call_args_list)
+    assert decoded < len(frames)
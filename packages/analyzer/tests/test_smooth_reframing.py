@@ -0,0 +1,158 @@
+import pytest
+
+@pytest.mark.unit
+def test_plan_segments_snaps_to_split_points():
+    """Test that segment boundaries snap to the nearest keyframe / scene cut"""
+    from src.services.smooth_reframing import plan_segments
+
+    segments = plan_segments(1000, 4, [0, 240, 260, 490, 760, 990])
+
+    assert segments == [(0, 240), (240, 490), (490, 760), (760, 1000)]
+
+@pytest.mark.unit
+def test_plan_segments_without_split_points():
+    """Test even splitting when no keyframe information is available"""
+    from src.services.smooth_reframing import plan_segments
+
+    segments = plan_segments(1000, 4, [])
+
+    assert segments == [(0, 250), (250, 500), (500, 750), (750, 1000)]
+
+@pytest.mark.unit
+def test_plan_segments_short_video():
+    """Test that short videos are not split"""
+    from src.services.smooth_reframing import plan_segments
+
+    assert plan_segments(60, 8, [30]) == [(0, 60)]
+    assert plan_segments(1000, 1, [500]) == [(0, 1000)]
+
+@pytest.mark.unit
+def test_compute_crop_path():
+    """Test global crop path computation"""
+    from src.services.smooth_reframing import SmoothReframer
+
+    data = {
+        "frames": [
+            {"frame_number": 0, "roi_suggestions": [{"x": 0, "y": 0, "width": 100, "height": 200, "score": 0.9}]},
+            {"frame_number": 50, "roi_suggestions": [{"x": 300, "y": 0, "width": 100, "height": 200, "score": 0.8}]}
+        ]
+    }
+
+    reframer = SmoothReframer(smoothing_factor=1.0, max_movement_per_frame=1000.0)
+    path = reframer.compute_crop_path(data, 100)
+
+    assert path.shape == (100, 4)
+    assert tuple(path[0]) == (0, 0, 100, 200)
+    assert tuple(path[-1]) == (300, 0, 100, 200)
+
+@pytest.mark.unit
+def test_crop_movement_stats():
+    """Test vectorized movement statistics of a crop path"""
+    from src.services.smooth_reframing import crop_movement_stats
+
+    stats = crop_movement_stats([[0, 0, 100, 200], [3, 4, 100, 200], [3, 4, 100, 200], [15, 20, 100, 200]])
+
+    assert stats["avg_movement"] == pytest.approx(25.0 / 3)
+    assert stats["max_movement"] == 20.0
+    assert stats["min_movement"] == 0.0
+    assert stats["frames_over_10px"] == 1
+    assert crop_movement_stats([[0, 0, 100, 200]]) == {}
+
+@pytest.mark.unit
+def test_zoom_path_follows_subject_size():
+    """Test that the zoom-aware path keeps the target aspect ratio and clamps the scale"""
+    from src.services.smooth_reframing import SmoothReframer
+
+    data = {
+        "frames": [
+            {"frame_number": 0, "roi_suggestions": [{"x": 600, "y": 300, "width": 80, "height": 80, "score": 0.9}]},
+            {"frame_number": 99, "roi_suggestions": [{"x": 400, "y": 0, "width": 405, "height": 720, "score": 0.9}]}
+        ]
+    }
+
+    reframer = SmoothReframer(zoom=True, min_scale=0.5, max_zoom_change_per_frame=1.0)
+    path = reframer.compute_crop_path(data, 100, (1280, 720), (405, 720))
+
+    assert path.shape == (100, 4)
+    assert path[0, 2] == pytest.approx(405 * 0.5)
+    assert path[-1, 2] == pytest.approx(405)
+    assert (path[:, 2] / path[:, 3]) == pytest.approx([405 / 720] * 100)
+    assert (path[:, 0] >= 0).all() and (path[:, 0] + path[:, 2] <= 1280 + 1e-3).all()
+
+@pytest.mark.unit
+def test_crop_affines_scale_and_clamp():
+    """Test per-frame affine maps for cropping and scaling"""
+    from src.services.smooth_reframing import crop_affines
+
+    affines = crop_affines([[100, 50, 200, 400], [1200, 0, 400, 720]], (1280, 720), (200, 400))
+
+    assert affines.shape == (2, 2, 3)
+    assert affines[0].tolist() == [[1.0, 0.0, 100.0], [0.0, 1.0, 50.0]]
+    # Out of bounds on the right: shifted to the frame edge and scaled to the output size
+    assert affines[1, 0, 0] == pytest.approx(2.0)
+    assert affines[1, 0, 2] == pytest.approx(880 + 0.5)
+
+def _write_test_video(path, frames, size=(64, 48), fps=24.0):
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i % 256, dtype=np.uint8))
+    writer.release()
+
+@pytest.mark.unit
+def test_render_worker_reports_frames_to_shared_counter(tmp_path):
+    """Test that a render worker counts every rendered frame in the shared counter"""
+    import multiprocessing as mp
+    import numpy as np
+    from src.services import smooth_reframing
+
+    video = tmp_path / "input.mp4"
+    _write_test_video(video, 25)
+    crops = np.tile(np.array([[0, 0, 24, 48]], dtype=np.int32), (25, 1))
+    counter = mp.get_context("spawn").Value('q', 0)
+
+    smooth_reframing._init_render_worker(counter)
+    try:
+        smooth_reframing._render_segment_worker(
+            (str(video), str(tmp_path / "segment.mp4"), crops, 0, 25, 24.0, (64, 48), (24, 48)))
+    finally:
+        smooth_reframing._init_render_worker(None)
+
+    assert counter.value == 25
+
+@pytest.mark.unit
+def test_parallel_reframing_polls_frame_progress(tmp_path):
+    """Test that parallel reframing advances progress from the workers' frame counter"""
+    import json
+    from src.services.smooth_reframing import SmoothReframer
+
+    video = tmp_path / "input.mp4"
+    _write_test_video(video, 120)
+    saliency = tmp_path / "saliency.json"
+    saliency.write_text(json.dumps({"frames": [
+        {"frame_number": 0, "roi_suggestions": [{"x": 0, "y": 0, "width": 24, "height": 48, "score": 1.0}]}
+    ]}))
+
+    class RecordingProgress:
+        def __init__(self):
+            self.processed = 0
+            self.advances = []
+
+        def set_stage(self, stage, total):
+            self.processed = 0
+
+        def advance(self, n):
+            self.processed += n
+            self.advances.append(n)
+
+    progress = RecordingProgress()
+    output = tmp_path / "output.mp4"
+    SmoothReframer().reframe_video_parallel(str(video), str(saliency), str(output),
+                                            max_workers=2, scene_boundaries=[2.5],
+                                            progress=progress)
+
+    assert output.exists()
+    assert progress.processed == 120
+    assert all(n >= 0 for n in progress.advances)
@@ -0,0 +1,133 @@
+import pytest
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+@pytest.mark.unit
+def test_scene_stems_from_single_separation(tmp_path):
+    """Test that all stems of a scene come from one in-process Demucs pass"""
+    from src.services.spleeter_service import SpleeterService
+
+    audio = MagicMock()
+    audio.sample_rate = 44100
+    audio.slice.return_value = np.zeros((44100, 2), dtype=np.int16)
+
+    with patch('src.services.spleeter_service.audio_extractor') as mock_extractor, \
+         patch('src.services.spleeter_service.demucs_engine') as mock_engine:
+        mock_extractor.load.return_value = audio
+        mock_engine.sample_rate = 44100
+        mock_engine.separate.return_value = {
+            "vocals": np.zeros((44100, 2), dtype=np.float32),
+            "no_vocals": np.zeros((44100, 2), dtype=np.float32)
+        }
+
+        service = SpleeterService(output_base_dir=str(tmp_path))
+        stems = service.separate_audio_for_timerange(
+            "video.mp4", 10.0, 11.0, "video-1", scene_id="scene-1",
+            stem_types=["vocals", "accompaniment", "original"]
+        )
+
+    mock_engine.separate.assert_called_once()
+    assert mock_engine.separate.call_args[0][2] == ["no_vocals", "vocals"]
+    audio.slice.assert_called_with(10.0, 11.0)
+    assert set(stems) == {"vocals", "accompaniment", "original"}
+    assert stems["accompaniment"].endswith("video-1_scene-1_accompaniment.wav")
+    assert (tmp_path / "video-1" / "scene-1" / "video-1_scene-1_vocals.wav").exists()
+
+@pytest.mark.unit
+def test_track_separation_overlap_add_is_seamless(tmp_path):
+    """Test that batched, crossfaded windows reassemble the full track without seams"""
+    from src.services.demucs_engine import DemucsEngine
+    from src.utils.model_registry import model_registry
+
+    engine = DemucsEngine(model_name="test-ola", window_seconds=4, window_overlap_seconds=1, batch_size=3)
+    model = MagicMock(samplerate=100, audio_channels=2, sources=["drums", "bass", "other", "vocals"])
+    model_registry.register(engine.model_key, lambda: model)
+    samples = np.random.RandomState(0).randint(-20000, 20000, (1050, 2)).astype(np.int16)
+
+    # Identity "model": every stem equals its input window
+    def fake_infer(mix, mean, std, stems, num_threads=None):
+        return {stem: np.ascontiguousarray(mix.transpose(0, 2, 1)) for stem in stems}
+
+    progress = []
+    with patch.object(engine, '_infer', side_effect=fake_infer) as mock_infer:
+        tracks = engine.separate_track(
+            samples, 100, {"vocals": str(tmp_path / "vocals.pcm")},
+            on_progress=lambda done, total: progress.append(done)
+        )
+        wav_paths = engine.separate_track_to_wav(samples, 100, {"drums": str(tmp_path / "drums.wav")}, batch_size=1)
+
+    assert [call[0][0].shape for call in mock_infer.call_args_list[:2]] == [(3, 2, 400), (1, 2, 400)]
+    assert mock_infer.call_count == 6
+    assert progress == [300, 600, 900, 1050]
+    assert np.abs(tracks["vocals"].astype(np.int32) - samples).max() <= 2
+
+    import wave
+    with wave.open(wav_paths["drums"]) as wav:
+        written = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16).reshape(-1, 2)
+    assert np.array_equal(written, tracks["vocals"])
+
+@pytest.mark.unit
+def test_track_separation_sliced_per_scene(tmp_path):
+    """Test whole-track mode: one separation, stems cut at scene boundaries"""
+    import threading
+    from src.services.demucs_engine import SeparationCancelled
+    from src.services.spleeter_service import SpleeterService
+
+    audio = MagicMock()
+    audio.sample_rate = 100
+    audio.frame_count = 1000
+    audio.duration = 10.0
+    audio.samples = np.zeros((1000, 2), dtype=np.int16)
+    track = np.arange(2000, dtype=np.int16).reshape(1000, 2)
+    scenes = [{"id": "s1", "start_time": 0.0, "end_time": 4.0}, {"id": "s2", "start_time": 4.0, "end_time": 10.0}]
+
+    with patch('src.services.spleeter_service.audio_extractor') as mock_extractor, \
+         patch('src.services.spleeter_service.demucs_engine') as mock_engine:
+        mock_extractor.load.return_value = audio
+        mock_engine.separate_track.return_value = {"vocals": track, "no_vocals": track}
+
+        service = SpleeterService(output_base_dir=str(tmp_path))
+        stems = service.separate_track_by_scenes("video.mp4", "video-1", scenes, stem_types=["vocals", "music"])
+
+        mock_engine.separate_track.side_effect = SeparationCancelled("cancelled")
+        with pytest.raises(SeparationCancelled):
+            service.separate_track_by_scenes("video.mp4", "video-1", scenes, cancel_event=threading.Event())
+
+    mock_engine.separate_track.assert_called()
+    assert sorted(mock_engine.separate_track.call_args_list[0][0][2]) == ["no_vocals", "vocals"]
+    assert set(stems) == {"s1", "s2"}
+    assert stems["s2"]["music"].endswith("video-1_s2_music.wav")
+
+    import wave
+    with wave.open(stems["s2"]["vocals"]) as wav:
+        assert wav.getnframes() == 600
+        assert np.frombuffer(wav.readframes(1), dtype=np.int16).tolist() == [800, 801]
+    assert not (tmp_path / "video-1" / ".track").exists()
+
+@pytest.mark.unit
+def test_demucs_engines_are_shared_and_threads_set_per_call(tmp_path):
+    """Test one engine per model and a thread count that applies to one separation only"""
+    from src.services import demucs_engine as engines
+
+    engine = engines.get_engine("test-threads")
+    assert engines.get_engine("test-threads") is engine
+    assert engines.get_engine() is engines.demucs_engine
+
+    model = MagicMock(samplerate=100, audio_channels=2, sources=["vocals"])
+    threads_used = []
+
+    def fake_infer(mix, mean, std, stems, num_threads=None):
+        threads_used.append(num_threads)
+        return {stem: np.ascontiguousarray(mix.transpose(0, 2, 1)) for stem in stems}
+
+    with patch('src.services.demucs_engine.model_registry') as registry, \
+         patch.object(engine, '_infer', side_effect=fake_infer):
+        registry.use.return_value.__enter__.return_value = model
+        registry.get.return_value = model
+        engine.separate_track_to_wav(np.zeros((500, 2), dtype=np.int16), 100, {"vocals": str(tmp_path / "v.wav")},
+                                     window_seconds=2, num_threads=2)
+        engine.separate_track_to_wav(np.zeros((500, 2), dtype=np.int16), 100, {"vocals": str(tmp_path / "v.wav")},
+                                     window_seconds=2)
+
+    assert threads_used == [2, None]
+    assert engine.num_threads == engines.NUM_THREADS
@@ -0,0 +1,62 @@
+import json
+import threading
+import pytest
+from unittest.mock import patch
+
+@pytest.mark.unit
+def test_job_trace_splits_time_into_stages(tmp_path):
+    """Test exclusive stage times for nested spans, failure marking and the JSON lines export"""
+    from src.utils.metrics import JOB_SECONDS, STAGE_SECONDS
+    from src.utils.tracing import Tracer
+
+    export_path = tmp_path / "traces.jsonl"
+    tracer = Tracer(export_path=str(export_path))
+    clock = iter(range(100))
+
+    with patch('src.utils.tracing.time.perf_counter', side_effect=lambda: float(next(clock))):
+        with tracer.job("reframe-test", "job-1") as trace:
+            with tracer.span("render", "encode"):
+                with tracer.span("read_frame", "decode"):
+                    pass
+                with tracer.span("update", "db"):
+                    pass
+            trace.fail("output missing")
+
+    summary = trace.summary()
+    assert summary["status"] == "ERROR" and summary["error"] == "output missing"
+    # render spans 5 ticks, 2 of them inside the nested spans
+    assert summary["stages"]["encode"]["seconds"] == 3.0
+    assert summary["stages"]["decode"]["seconds"] == 1.0
+    assert summary["bottleneck"] == "encode"
+    assert tracer.get("reframe-test", "job-1") is trace
+
+    exported = json.loads(export_path.read_text().splitlines()[0])
+    assert exported["jobId"] == "job-1"
+    assert exported["operations"]["render"]["seconds"] == 5.0
+    assert STAGE_SECONDS.value(pipeline="reframe-test", stage="encode") == 3.0
+    assert JOB_SECONDS.count(pipeline="reframe-test", status="ERROR") == 1
+
+@pytest.mark.unit
+def test_spans_in_wrapped_threads_belong_to_the_job():
+    """Test that wrap() carries the job into executor threads"""
+    from src.utils.tracing import Tracer
+
+    tracer = Tracer()
+
+    def work():
+        with tracer.span("infer", "inference"):
+            pass
+
+    with tracer.job("saliency", "video-1") as trace:
+        worker = threading.Thread(target=tracer.wrap(work))
+        worker.start()
+        worker.join()
+        # Without wrap() the thread starts with an empty context
+        unbound = threading.Thread(target=work)
+        unbound.start()
+        unbound.join()
+
+    assert trace.stages["inference"]["count"] == 1
+    with pytest.raises(ValueError):
+        with tracer.span("oops", "rendering"):
+            pass
@@ -0,0 +1,186 @@
+import pytest
+import numpy as np
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+@pytest.mark.unit
+def test_faster_whisper_segments_use_openai_schema():
+    """Test conversion of faster-whisper segments to the stored segment schema"""
+    from src.services.transcription_backends import FasterWhisperBackend
+    from src.utils.model_registry import ModelRegistry
+
+    raw = SimpleNamespace(
+        id=1, seek=0, start=1.23456, end=2.5, text=" Hallo Welt", tokens=[50364, 123],
+        temperature=0.0, avg_logprob=-0.2, compression_ratio=1.1, no_speech_prob=0.01,
+        words=[SimpleNamespace(word=" Hallo", start=1.23456, end=1.8, probability=0.9)]
+    )
+    model = MagicMock()
+    model.transcribe.return_value = (iter([raw]), SimpleNamespace(language="de"))
+
+    registry = ModelRegistry()
+    streamed = []
+    with patch('src.services.transcription_backends.model_registry', registry):
+        backend = FasterWhisperBackend()
+        registry.register(backend.model_key, lambda: model)
+        result = backend.transcribe(np.zeros(16000, dtype=np.float32), on_segment=streamed.append)
+
+    assert result["language"] == "de"
+    assert streamed == result["segments"]
+    segment = result["segments"][0]
+    assert (segment["id"], segment["start"], segment["end"], segment["text"]) == (0, 1.235, 2.5, " Hallo Welt")
+    assert segment["words"] == [{"word": " Hallo", "start": 1.235, "end": 1.8, "probability": 0.9}]
+
+@pytest.mark.unit
+def test_model_is_held_while_segments_are_decoded():
+    """Test that eviction and idle unloading skip the model until the lazy segment iterator is exhausted"""
+    from src.services.transcription_backends import FasterWhisperBackend
+    from src.utils.model_registry import ModelRegistry
+
+    registry = ModelRegistry()
+    unloader = MagicMock()
+    held = []
+
+    def segments():
+        entry = registry._entries[backend.model_key]
+        held.append(entry.in_use)
+        # A budget eviction (unload) or the TTL reaper runs while decoding
+        held.append(registry.unload(backend.model_key))
+        held.append(registry.unload_idle(now=entry.last_used + 3600))
+        yield from ()
+
+    model = MagicMock()
+    model.transcribe.side_effect = lambda *args, **kwargs: (segments(), SimpleNamespace(language="en"))
+
+    with patch('src.services.transcription_backends.model_registry', registry):
+        backend = FasterWhisperBackend()
+        registry.register(backend.model_key, lambda: model, unloader=unloader, ttl=1)
+        registry._start_reaper = MagicMock()
+        backend.transcribe(np.zeros(16000, dtype=np.float32))
+
+    assert held == [1, False, []]
+    unloader.assert_not_called()
+    assert registry.unload(backend.model_key)
+
+@pytest.mark.unit
+def test_get_backend_rejects_unknown_name():
+    """Test backend lookup by name and caching of instances"""
+    from src.services.transcription_backends import get_backend
+
+    assert get_backend("batched", "tiny") is get_backend("batched", "tiny")
+    with pytest.raises(ValueError):
+        get_backend("whisper-cpp")
+
+@pytest.mark.unit
+def test_transcribe_video_streams_remapped_segments():
+    """Test that streamed segments already carry original-timeline timestamps"""
+    from src.services.transcription_service import TranscriptionService
+
+    def fake_transcribe(audio, language=None, on_segment=None):
+        segments = [{"start": 0.5, "end": 1.0, "words": []}]
+        for segment in segments:
+            on_segment(segment)
+        return {"language": "en", "segments": segments}
+
+    backend = MagicMock()
+    backend.transcribe.side_effect = fake_transcribe
+
+    with patch('src.services.transcription_service.audio_extractor') as mock_extractor, \
+         patch('src.services.transcription_service.get_backend', return_value=backend), \
+         patch('src.services.transcription_service.detect_speech', return_value=[(10.0, 12.0)]):
+        mock_extractor.use.return_value.__enter__.return_value.resampled.return_value = np.zeros(16000 * 60, dtype=np.float32)
+
+        streamed = []
+        result = TranscriptionService().transcribe_video("video.mp4", vad=True, backend="faster-whisper", on_segment=streamed.append)
+
+    assert len(backend.transcribe.call_args[0][0]) == 16000 * 2
+    assert streamed[0]["start"] == 10.5
+    assert result["segments"][0]["end"] == 11.0
+    assert result["duration"] == 60.0
+
+@pytest.mark.unit
+def test_plan_chunks_cuts_in_gaps_and_splits_long_speech():
+    """Test VAD-aligned chunk planning and ownership boundaries"""
+    from src.services.transcription_pool import plan_chunks
+
+    chunks = plan_chunks([(0.0, 40.0), (50.0, 70.0), (80.0, 200.0)], chunk_seconds=60, overlap_seconds=10)
+
+    assert [chunk.regions for chunk in chunks] == [
+        [(0.0, 40.0), (50.0, 70.0)], [(80.0, 140.0)], [(130.0, 190.0)], [(180.0, 200.0)]
+    ]
+    assert chunks[0].own_start == float("-inf")
+    assert chunks[0].own_end == 75.0
+    assert (chunks[1].own_end, chunks[2].own_end) == (135.0, 185.0)
+    assert chunks[-1].own_end == float("inf")
+
+@pytest.mark.unit
+def test_merge_chunk_results_deduplicates_overlap():
+    """Test that overlapping chunks contribute each segment once, by midpoint"""
+    from src.services.transcription_pool import Chunk, majority_language, merge_chunk_results
+
+    chunks = [Chunk([(0.0, 60.0)], float("-inf"), 55.0), Chunk([(50.0, 100.0)], 55.0, float("inf"))]
+    results = [
+        {"language": "de", "segments": [{"id": 0, "start": 1.0, "end": 5.0}, {"id": 1, "start": 52.0, "end": 57.0}]},
+        {"language": "en", "segments": [{"id": 0, "start": 51.8, "end": 57.0}, {"id": 1, "start": 60.0, "end": 64.0}]}
+    ]
+
+    segments = merge_chunk_results(chunks, results)
+
+    assert [(s["id"], s["start"]) for s in segments] == [(0, 1.0), (1, 52.0), (2, 60.0)]
+    assert majority_language(chunks, results) == "de"
+
+@pytest.mark.unit
+def test_pool_worker_sets_thread_limits_before_numpy_is_imported():
+    """Test that a spawned worker can set OMP_NUM_THREADS while BLAS is not loaded yet"""
+    import os
+    import subprocess
+    import sys
+
+    script = (
+        "import sys\n"
+        "from unittest.mock import patch, MagicMock\n"
+        "import src.services.transcription_worker as worker\n"
+        "assert 'numpy' not in sys.modules, 'numpy imported with the worker module'\n"
+        "with patch('src.services.transcription_backends.get_backend', return_value=MagicMock()):\n"
+        "    worker.init_worker(None, 'base', 'cpu', 3)\n"
+        "import os\n"
+        "print(os.environ['OMP_NUM_THREADS'], os.environ['OPENBLAS_NUM_THREADS'])\n"
+    )
+    env = {key: value for key, value in os.environ.items() if not key.endswith("_NUM_THREADS")}
+    result = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.dirname(__file__)),
+                            env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["3", "3"]
+
+@pytest.mark.unit
+def test_openai_whisper_streams_segments_per_window():
+    """Test that openai-whisper segments are emitted after each window, on the timeline of the whole input"""
+    from src.services.transcription_backends import OpenAIWhisperBackend, stream_windows
+    from src.utils.model_registry import ModelRegistry
+
+    audio = np.full(16000 * 25, 0.5, dtype=np.float32)
+    audio[16000 * 9:16000 * 9 + 1600] = 0.0  # pause just before the first nominal cut at 10s
+    calls = []
+
+    def fake_transcribe(window, language=None, initial_prompt=None, **kwargs):
+        calls.append((len(window), language, initial_prompt))
+        return {"language": "de", "segments": [
+            {"id": 0, "start": 0.5, "end": 1.5, "text": f" Teil {len(calls)}", "words": [{"word": " Teil", "start": 0.5, "end": 1.0}]}
+        ]}
+
+    model = MagicMock()
+    model.transcribe.side_effect = fake_transcribe
+    streamed = []
+    registry = ModelRegistry()
+    with patch('src.services.transcription_backends.model_registry', registry), \
+         patch('src.services.transcription_backends.STREAM_WINDOW_SECONDS', 10.0):
+        backend = OpenAIWhisperBackend()
+        registry.register(backend.model_key, lambda: model)
+        result = backend.transcribe(audio, on_segment=lambda segment: streamed.append((len(calls), segment["start"])))
+
+    assert stream_windows(audio, 10.0)[0] == (0, 16000 * 9 + 800)
+    # Each segment went out as soon as its window was decoded
+    assert streamed == [(1, 0.5), (2, 9.55), (3, 19.5)]
+    assert [call[1:] for call in calls] == [(None, None), ("de", " Teil 1"), ("de", " Teil 1 Teil 2")]
+    assert [segment["id"] for segment in result["segments"]] == [0, 1, 2]
+    assert result["segments"][1]["words"][0] == {"word": " Teil", "start": 9.55, "end": 10.05}
+    assert result["language"] == "de"
@@ -0,0 +1,69 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+@pytest.mark.unit
+def test_transcription_job_collects_partial_segments():
+    """Test that a job exposes streamed segments, progress and the stored result"""
+    from src.services.transcription_jobs import TranscriptionJobManager
+
+    seen_while_running = []
+
+    def fake_transcribe(video_path, on_segment=None, **options):
+        segments = [{"start": 0.0, "end": 4.0, "text": "a"}, {"start": 4.0, "end": 9.0, "text": "b"}]
+        for segment in segments:
+            on_segment(segment)
+            seen_while_running.append(len(job_ref[0].segments))
+        return {"language": "de", "segments": segments, "duration": 10.0}
+
+    service = MagicMock()
+    service.transcribe_video.side_effect = fake_transcribe
+    db = MagicMock()
+    db.start_transcription.return_value = "tr-1"
+    manager = TranscriptionJobManager(service, db, max_workers=1)
+
+    job_ref = []
+    with patch('src.services.transcription_jobs.audio_extractor') as mock_extractor, \
+         patch('src.services.transcription_jobs.PERSIST_INTERVAL', 0):
+        mock_extractor.load.return_value.duration = 10.0
+        with patch.object(manager._executor, 'submit', side_effect=lambda fn, job: job_ref.append(job) or MagicMock()):
+            job = manager.submit("video-1", "video.mp4", language="de")
+        manager._run(job)
+
+    assert seen_while_running == [1, 2]
+    assert job.status == "COMPLETED"
+    assert job.transcription_id == "tr-1"
+    db.start_transcription.assert_called_once_with("video-1", "de")
+    appended = [c[0][1] for c in db.append_transcription_segments.call_args_list]
+    assert [[s["text"] for s in segments] for segments in appended] == [["a"], ["b"]]
+    db.complete_transcription.assert_called_once_with("tr-1", "de")
+    db.create_transcription.assert_not_called()
+    db.update_video_status_sync.assert_called_once_with("video-1", "TRANSCRIBED")
+
+    snapshot = job.snapshot(since=1)
+    assert snapshot["segmentCount"] == 2
+    assert [s["text"] for s in snapshot["segments"]] == ["b"]
+    assert snapshot["progress"]["status"] == "COMPLETED"
+    assert manager.get(job.id) is job
+
+@pytest.mark.unit
+def test_transcription_job_records_errors():
+    """Test failed transcriptions end in ERROR and leave no partial transcription behind"""
+    from src.services.transcription_jobs import TranscriptionJobManager
+
+    service = MagicMock()
+    service.transcribe_video.side_effect = RuntimeError("model missing")
+    db = MagicMock()
+    db.start_transcription.return_value = "tr-2"
+    manager = TranscriptionJobManager(service, db, max_workers=1)
+
+    with patch('src.services.transcription_jobs.audio_extractor') as mock_extractor:
+        mock_extractor.load.return_value.duration = 10.0
+        job = manager.submit("video-2", "video.mp4")
+        job.future.result(timeout=5)
+
+    assert job.status == "ERROR"
+    assert job.error == "model missing"
+    assert job.transcription_id is None
+    db.delete_transcription.assert_called_once_with("tr-2")
+    db.complete_transcription.assert_not_called()
+    db.update_video_status_sync.assert_not_called()
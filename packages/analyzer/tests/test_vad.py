@@ -0,0 +1,41 @@
+import pytest
+import numpy as np
+
+@pytest.mark.unit
+def test_energy_vad_finds_speech_regions():
+    """Test energy VAD on bursts separated by near-silence"""
+    from src.services.vad import detect_speech
+
+    rng = np.random.RandomState(0)
+    audio = rng.normal(0, 0.0005, 16000 * 10).astype(np.float32)
+    audio[16000 * 2:16000 * 4] += rng.normal(0, 0.1, 16000 * 2).astype(np.float32)
+    audio[16000 * 7:int(16000 * 7.1)] += 0.1  # too short to count as speech
+
+    regions = detect_speech(audio, 16000, backend="energy")
+
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert 1.7 <= start <= 2.0
+    assert 4.0 <= end <= 4.3
+    assert detect_speech(np.zeros(16000, dtype=np.float32), 16000, backend="energy") == []
+
+@pytest.mark.unit
+def test_condensed_audio_remaps_segments_and_words():
+    """Test stitching of condensed-audio timestamps back to the original timeline"""
+    from src.services.vad import CondensedAudio
+
+    audio = np.arange(16000 * 20, dtype=np.float32)
+    condensed = CondensedAudio(audio, [(2.0, 4.0), (10.0, 11.5)], 16000, gap_seconds=0.5)
+
+    assert condensed.duration == pytest.approx(4.0)
+    assert condensed.audio[0] == 32000
+    assert condensed.audio[int(2.5 * 16000)] == 160000
+
+    segments = condensed.remap_segments([
+        {"start": 0.5, "end": 2.2, "words": [{"word": "a", "start": 0.5, "end": 1.0}, {"word": "b", "start": 1.9, "end": 2.1}]},
+        {"start": 2.6, "end": 3.9, "words": []}
+    ])
+
+    assert (segments[0]["start"], segments[0]["end"]) == (2.5, 4.0)
+    assert segments[0]["words"][1] == {"word": "b", "start": 3.9, "end": 4.0}
+    assert (segments[1]["start"], segments[1]["end"]) == (10.1, 11.4)
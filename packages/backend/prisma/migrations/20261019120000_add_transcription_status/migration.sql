@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "transcriptions" ADD COLUMN "status" TEXT NOT NULL DEFAULT 'COMPLETED';
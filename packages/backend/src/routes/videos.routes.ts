@@ -349,7 +349,7 @@ router.get('/:id/transcription', async (req: any, res: any) => {
     console.log(`🔍 Loading transcription for video: ${id}`);
 
     const transcription = await prisma.transcription.findFirst({
-      where: { videoId: id },
+      where: { videoId: id, status: 'COMPLETED' }, // Laufende Transkriptionen überspringen
       orderBy: { createdAt: 'desc' } // Hol die neueste Transcription
     });
 
@@ -214,7 +214,10 @@ Respond in this exact JSON format:
               visionAnalysis: true,
               video: {
                 include: {
-                  transcriptions: true
+                  transcriptions: {
+                    where: { status: 'COMPLETED' },
+                    orderBy: { createdAt: 'desc' }
+                  }
                 }
               }
             }
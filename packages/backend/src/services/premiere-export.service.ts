@@ -89,7 +89,10 @@ export class PremiereExportService {
         where: { id: videoId },
         include: {
           scenes: true,
-          transcriptions: true
+          transcriptions: {
+            where: { status: 'COMPLETED' },
+            orderBy: { createdAt: 'desc' }
+          }
         }
       });
       
@@ -142,6 +145,7 @@ export class PremiereExportService {
               video: {
                 include: {
                   transcriptions: {
+                    where: { status: 'COMPLETED' },
                     take: 1,
                     orderBy: { createdAt: 'desc' }
                   }
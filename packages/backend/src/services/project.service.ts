@@ -238,7 +238,10 @@ export class ProjectService {
           include: {
             video: {
               include: {
-                transcriptions: true
+                transcriptions: {
+                  where: { status: 'COMPLETED' },
+                  orderBy: { createdAt: 'desc' }
+                }
               }
             }
           },
@@ -17,7 +17,10 @@ export class SearchIndexService {
     const video = await prisma.video.findUnique({
       where: { id: videoId },
       include: {
-        transcriptions: true,
+        transcriptions: {
+          where: { status: 'COMPLETED' },
+          orderBy: { createdAt: 'desc' }
+        },
         scenes: {
           include: { visionAnalysis: true }
         }
@@ -29,7 +29,7 @@ export class VoiceSegmentService {
         where: { id: audioStemId },
         include: { 
           video: { 
-            include: { transcriptions: true } 
+            include: { transcriptions: { where: { status: 'COMPLETED' }, orderBy: { createdAt: 'desc' } } } 
           } 
         }
       });